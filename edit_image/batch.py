@@ -0,0 +1,190 @@
+"""
+batch.py
+--------
+Runs one pipeline config over many input images.
+
+The config's operations are validated once in the parent process. Images are then
+spread across a pool of worker processes, each of which builds the filter instances
+once and reuses them for every image it receives. Within a worker, decoding, filtering
+and encoding of successive images overlap (see 'edit_image.stages'). The directory
+layout of the inputs is mirrored under the output directory.
+
+Usage:
+    edit-image batch --config configs/boost.json --inputs 'photos/**/*.png' --output-dir out --jobs 8
+
+Batch configs only need an 'operations' list; 'input', 'output' and 'display'
+are ignored.
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from edit_image.pipeline import (
+    OPERATIONS, OUTPUT_SIZE, MAX_DIMENSION, log, read_config, validate_operations, build_filters,
+    resolve_output_path
+)
+from edit_image.planner import optimize_plan
+from edit_image.stages import run_staged, DEFAULT_PREFETCH, DEFAULT_ENCODERS
+from filters.base.buffers import BufferPool
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.webp', '.ppm'}
+
+# Per-process state, set up once by '_init_worker'
+_worker_filters = None
+_worker_instances = None
+_worker_options = {}
+
+
+def collect_inputs(pattern: str):
+    """
+    Expand a directory or glob pattern into a sorted list of image files.
+
+    Parameters:
+        pattern (str): Directory (searched recursively) or glob pattern, '**' allowed
+
+    Returns:
+        tuple: (input root directory, list of image paths)
+
+    Raises:
+        FileNotFoundError if nothing matches
+    """
+    if os.path.isdir(pattern):
+        root = pattern
+        pattern = os.path.join(pattern, '**', '*')
+    else:
+        root = None
+
+    paths = sorted(
+        path for path in glob.glob(pattern, recursive=True)
+        if os.path.isfile(path) and os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+    )
+
+    if not paths:
+        raise FileNotFoundError(f"No input images match '{pattern}'")
+
+    if root is None:
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+
+    return root, paths
+
+
+def mirror_path(path: str, input_root: str, output_dir: str) -> str:
+    """
+    Map an input path to the same relative location under 'output_dir'.
+    """
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(input_root))
+    return os.path.join(output_dir, relative)
+
+
+def _init_worker(filters, options):
+    """
+    Build the filter instances and the buffer pool once per worker process.
+    """
+    global _worker_filters, _worker_instances, _worker_options
+    _worker_filters = filters
+    _worker_instances = build_filters(filters)
+    _worker_options = dict(options)
+
+    buffer_bytes = _worker_options.pop('buffer_bytes', None)
+    _worker_options['buffers'] = None if buffer_bytes == 0 else BufferPool(buffer_bytes)
+
+
+def _process_chunk(jobs):
+    """
+    Decode, filter and encode a chunk of images inside a worker.
+
+    Returns:
+        list: (input path, output path, seconds taken, error message or None) per image
+    """
+    return list(run_staged(jobs, _worker_filters, _worker_instances, **_worker_options))
+
+
+def run_batch(config_path: str, inputs: str, output_dir: str, jobs=None, overwrite=False, verbose=False,
+              tile_size=None, result_cache=None, prefetch=DEFAULT_PREFETCH, encoders=DEFAULT_ENCODERS,
+              precision='uint8', buffer_bytes=None, optimize=True, unclamped=False):
+    """
+    Apply the operations of one config to every image matched by 'inputs'.
+
+    Parameters:
+        config_path (str): Path to config file
+        inputs (str): Input directory or glob pattern
+        output_dir (str): Directory that mirrors the input tree
+        jobs (int or None): Number of worker processes (default: CPU count)
+        overwrite (bool): Overwrite existing outputs instead of appending _1, _2, ...
+        verbose (bool): Enable logging
+        tile_size (int or None): Tile size for tiled execution (None = whole frame)
+        result_cache (ResultCache or None): On-disk cache shared by all workers
+        prefetch (int): Decoded images each worker keeps ready ahead of filtering
+        encoders (int): Encoder threads per worker
+        precision (str): Intermediate precision policy, see 'apply_filters()'
+        buffer_bytes (int or None): Bytes of idle buffers each worker keeps for reuse
+            across images (None = default cap, 0 disables pooling)
+        optimize (bool): Rewrite the plan into a cheaper equivalent first
+        unclamped (bool): Let the optimiser compose linear kernels, dropping intermediate clipping
+
+    Returns:
+        list: Output paths that were written
+
+    Raises:
+        RuntimeError if any image failed
+    """
+    config = read_config(config_path)
+    if OPERATIONS not in config:
+        raise ValueError(f"Missing required config field: '{OPERATIONS}'")
+    if OUTPUT_SIZE in config or MAX_DIMENSION in config:
+        # The plan is built once for every image, whatever its size
+        raise ValueError(f"'{OUTPUT_SIZE}' / '{MAX_DIMENSION}' are not supported in batch mode")
+
+    filters = validate_operations(config[OPERATIONS], verbose)
+    if optimize:
+        filters = optimize_plan(filters, verbose, precision, unclamped)
+
+    input_root, paths = collect_inputs(inputs)
+    jobs = jobs or os.cpu_count() or 1
+    log(f"Processing {len(paths)} images from '{input_root}' with {jobs} workers", verbose)
+
+    work = []
+    for path in paths:
+        dst = mirror_path(path, input_root, output_dir)
+        work.append((path, dst if overwrite else resolve_output_path(dst)))
+
+    options = dict(tile_size=tile_size, result_cache=result_cache, prefetch=prefetch, encoders=encoders,
+                   precision=precision, buffer_bytes=buffer_bytes)
+
+    if jobs == 1:
+        _init_worker(filters, options)
+        results = run_staged(work, _worker_filters, _worker_instances, **_worker_options)
+        return _collect_results(results, len(work), verbose)
+
+    # Chunks are large enough for the decode / encode stages to overlap inside each worker
+    size = max(1, len(work) // (jobs * 4))
+    chunks = [work[i:i + size] for i in range(0, len(work), size)]
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(filters, options)) as pool:
+        results = (result for chunk in pool.map(_process_chunk, chunks) for result in chunk)
+        return _collect_results(results, len(work), verbose)
+
+
+def _collect_results(results, total, verbose=False):
+    """
+    Log per-image results and raise if any of them failed.
+    """
+    written, failed = [], []
+    t0 = time.time()
+
+    for idx, (src, dst, seconds, error) in enumerate(results):
+        if error is not None:
+            failed.append(src)
+            log(f"[{idx + 1}/{total}] {src} failed: {error}", verbose=True)
+        else:
+            written.append(dst)
+            log(f"[{idx + 1}/{total}] {src} -> {dst} ({seconds:.3f} seconds)", verbose)
+
+    log(f"Batch took {time.time() - t0:.3f} seconds!", verbose)
+
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {total} images failed")
+
+    return written
@@ -0,0 +1,162 @@
+"""
+cache.py
+--------
+Content-addressed on-disk cache of pipeline results.
+
+Each entry is an image array stored as '.npy', keyed by a hash of the input pixels
+chained with the canonicalised (filter class, params) of every operation applied so
+far. The key of a pipeline prefix therefore only depends on what produced it, so
+re-runs, retries and overlapping configs can resume from the longest prefix that
+is already cached.
+
+The cache is bounded by a byte budget. Reading an entry refreshes its modification
+time, and once the budget is exceeded the least recently used entries are deleted.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Bump when filter semantics change, to invalidate existing entries
+CACHE_VERSION = 1
+
+
+def image_key(image_np: np.ndarray) -> str:
+    """
+    Hash of an image's pixels, shape and dtype.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"v{CACHE_VERSION}:{image_np.shape}:{image_np.dtype.str}".encode())
+    digest.update(np.ascontiguousarray(image_np).data)
+    return digest.hexdigest()
+
+
+def operation_key(cls, params: dict) -> str:
+    """
+    Canonical text form of one operation.
+    """
+    return json.dumps(
+        {'filter': f"{cls.__module__}.{cls.__qualname__}", 'params': params},
+        sort_keys=True,
+        default=str
+    )
+
+
+def prefix_keys(input_key: str, filters):
+    """
+    Keys of every non-empty prefix of the operation list.
+
+    Parameters:
+        input_key (str): 'image_key()' of the decoded input
+        filters (list): (filter class, params) tuples
+
+    Returns:
+        list: keys[i] identifies the result after filters[:i + 1]
+    """
+    keys = []
+    key = input_key
+
+    for cls, params in filters:
+        key = hashlib.blake2b((key + operation_key(cls, params)).encode(), digest_size=20).hexdigest()
+        keys.append(key)
+
+    return keys
+
+
+class ResultCache:
+    """
+    Size-bounded LRU store of arrays on disk.
+
+    Parameters:
+        directory (str): Cache directory, created if missing
+        max_bytes (int): Total size the cache is trimmed back to after each write
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.npy")
+
+    def get(self, key: str):
+        """
+        Return the cached array for 'key', or None, marking it as recently used.
+        """
+        path = self._path(key)
+        try:
+            array = np.load(path)
+            os.utime(path)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+        return array
+
+    def put(self, key: str, array: np.ndarray):
+        """
+        Store an array, then evict old entries if the budget is exceeded.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first, so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def longest_prefix(self, keys):
+        """
+        Find the longest cached prefix.
+
+        Parameters:
+            keys (list): Output of 'prefix_keys()'
+
+        Returns:
+            tuple: (number of operations covered, array), or (0, None) if nothing is cached
+        """
+        for length in range(len(keys), 0, -1):
+            array = self.get(keys[length - 1])
+            if array is not None:
+                return length, array
+
+        return 0, None
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits its budget.
+        """
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.npy'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -4,7 +4,16 @@ cli.py
 Command-line interface for running image filter pipelines.
 
 Usage:
-    python cli.py --config path/to/config.json [--verbose]
+    python cli.py --config path/to/config.json [--verbose] [--tile N] [--threads N] [--processes N]
+                         [--depth-first [--cache-kb N]] [--precision uint8|float32|float64] [--buffer-mb N]
+                         [--no-optimize] [--unclamped-fusion [--fusion-report]] [--result-cache DIR [--result-cache-mb N]]
+    python cli.py --config path/to/config.json --stream [--strip-rows N]
+    python cli.py batch --config path/to/config.json --inputs 'dir/**/*.png' --output-dir out [--jobs N]
+    python cli.py watch --config path/to/config.json [--interval SECONDS]
+    python cli.py serve [--socket PATH] [--workers N]
+
+While 'serve' is running, single-image runs of linear configs are forwarded to it (disable with
+--no-daemon). Graph configs ('nodes', see 'edit_image.graph') always run in this process.
 
 ChatGPT Usage:
 I used it to for argument parsers
@@ -16,7 +25,82 @@ Also, speaking in general, throughout the project I've used it for documentation
 """
 
 import argparse
-from edit_image.pipeline import run_from_config
+from edit_image.client import default_socket_path, daemon_available, forward_config
+from edit_image.common import is_graph_config
+
+# Pipeline modules import NumPy and Pillow, so they are imported only when a job
+# runs in this process. Forwarding to the daemon stays a standard-library-only path.
+
+def _add_result_cache_arguments(parser):
+    parser.add_argument(
+        '--result-cache',
+        default=None,
+        help='Directory of an on-disk cache of intermediate and final results'
+    )
+    parser.add_argument(
+        '--result-cache-mb',
+        type=int,
+        default=None,
+        help='Size budget of --result-cache in MiB (default 2048); least recently used entries are evicted'
+    )
+
+def _result_cache_option(args):
+    """
+    (directory, max bytes) for --result-cache, or None.
+    """
+    if args.result_cache is None:
+        return None
+
+    from edit_image.cache import DEFAULT_MAX_BYTES
+    max_bytes = args.result_cache_mb * 1024 ** 2 if args.result_cache_mb else DEFAULT_MAX_BYTES
+    return args.result_cache, max_bytes
+
+def _add_precision_argument(parser):
+    parser.add_argument(
+        '--precision',
+        choices=['uint8', 'float32', 'float64'],
+        default='uint8',
+        help='Intermediate precision: uint8 clips after every filter, float keeps '
+             'unclipped intermediates and quantises once at the end'
+    )
+
+def _add_buffer_argument(parser):
+    parser.add_argument(
+        '--buffer-mb',
+        type=int,
+        help='Idle working buffers kept for reuse across filters and images, in MiB '
+             '(default: 1024, 0 disables buffer reuse)'
+    )
+
+def _buffer_bytes(args):
+    """
+    '--buffer-mb' in bytes, or None for the default cap.
+    """
+    return None if args.buffer_mb is None else args.buffer_mb * 1024 ** 2
+
+def _add_optimize_argument(parser):
+    parser.add_argument(
+        '--no-optimize',
+        action='store_true',
+        help='Run the operations exactly as listed instead of an equivalent optimised plan'
+    )
+    parser.add_argument(
+        '--unclamped-fusion',
+        action='store_true',
+        help='Let the optimiser compose consecutive linear kernels (Box, Sharpen, ...) into one; '
+             'faster, but intermediate results are no longer clipped, so the image can change'
+    )
+
+def _inherit_global_options(parser, subparser):
+    """
+    Keep values of options the subcommand shares with 'parser' when they are given
+    before the subcommand ('--verbose batch ...'); argparse would otherwise reset
+    them to the subcommand's defaults.
+    """
+    shared = {action.dest for action in parser._actions if action.option_strings}
+    for action in subparser._actions:
+        if action.dest in shared and action.option_strings and not action.required:
+            action.default = argparse.SUPPRESS
 
 def main():
     parser = argparse.ArgumentParser(
@@ -24,7 +108,6 @@ def main():
     )
     parser.add_argument(
         '--config',
-        required=True,
         help='Path to the JSON configuration file'
     )
     parser.add_argument(
@@ -32,9 +115,234 @@ def main():
         action='store_true',
         help='Enable detailed logging'
     )
+    parser.add_argument(
+        '--tile',
+        type=int,
+        default=None,
+        help='Run local filters in tiles of this many pixels to bound memory use'
+    )
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=1,
+        help='Process independent tiles of each filter chain on this many threads'
+    )
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=1,
+        help='Process tiles of each filter chain in this many worker processes (frames shared via shared memory)'
+    )
+    parser.add_argument(
+        '--depth-first',
+        action='store_true',
+        help='Run each chain of local filters strip by strip, with strips sized to fit in cache'
+    )
+    parser.add_argument(
+        '--cache-kb',
+        type=int,
+        default=None,
+        help='Cache budget per strip in --depth-first mode, in KiB (default 1024)'
+    )
+    _add_result_cache_arguments(parser)
+    _add_precision_argument(parser)
+    _add_buffer_argument(parser)
+    _add_optimize_argument(parser)
+    parser.add_argument(
+        '--fusion-report',
+        action='store_true',
+        help='With --unclamped-fusion, also run the exact plan and report how much the image changed (runs in this process, not the daemon)'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Read, filter and write the image in strips (for images larger than RAM)'
+    )
+    parser.add_argument(
+        '--strip-rows',
+        type=int,
+        default=None,
+        help='Rows per strip in --stream mode (default 256)'
+    )
+    parser.add_argument(
+        '--socket',
+        default=None,
+        help='Daemon socket to forward to (default: $EDIT_IMAGE_SOCKET, else edit-image.sock in $XDG_RUNTIME_DIR or a private per-user temp directory)'
+    )
+    parser.add_argument(
+        '--no-daemon',
+        action='store_true',
+        help='Run in this process even if a daemon is running'
+    )
+
+    subparsers = parser.add_subparsers(dest='command')
+
+    batch_parser = subparsers.add_parser(
+        'batch',
+        help='Apply one config to every image in a directory or glob'
+    )
+    batch_parser.add_argument(
+        '--config',
+        required=True,
+        help='Path to the JSON configuration file'
+    )
+    batch_parser.add_argument(
+        '--inputs',
+        required=True,
+        help="Input directory or glob pattern, e.g. 'dir/**/*.png'"
+    )
+    batch_parser.add_argument(
+        '--output-dir',
+        required=True,
+        help='Directory that mirrors the input tree'
+    )
+    batch_parser.add_argument(
+        '--jobs',
+        type=int,
+        default=None,
+        help='Number of worker processes (default: CPU count)'
+    )
+    batch_parser.add_argument(
+        '--tile',
+        type=int,
+        default=None,
+        help='Run local filters in tiles of this many pixels to bound memory use'
+    )
+    _add_result_cache_arguments(batch_parser)
+    _add_precision_argument(batch_parser)
+    _add_buffer_argument(batch_parser)
+    _add_optimize_argument(batch_parser)
+    batch_parser.add_argument(
+        '--prefetch',
+        type=int,
+        default=2,
+        help='Decoded images each worker keeps ready ahead of filtering'
+    )
+    batch_parser.add_argument(
+        '--encoders',
+        type=int,
+        default=2,
+        help='Encoder threads per worker, so filtering never waits on saving'
+    )
+    batch_parser.add_argument(
+        '--overwrite',
+        action='store_true',
+        help='Overwrite existing outputs instead of appending _1, _2, ...'
+    )
+    batch_parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Enable detailed logging'
+    )
+
+    watch_parser = subparsers.add_parser(
+        'watch',
+        help='Re-run a config incrementally whenever it or its input changes'
+    )
+    watch_parser.add_argument(
+        '--config',
+        required=True,
+        help='Path to the JSON configuration file'
+    )
+    watch_parser.add_argument(
+        '--interval',
+        type=float,
+        default=None,
+        help='Seconds between checks for changes (default 0.5)'
+    )
+    watch_parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Enable detailed logging'
+    )
+
+    serve_parser = subparsers.add_parser(
+        'serve',
+        help='Run a daemon that keeps filters warm and accepts jobs over a Unix socket'
+    )
+    serve_parser.add_argument(
+        '--socket',
+        default=None,
+        help='Socket path (default: $EDIT_IMAGE_SOCKET, else edit-image.sock in $XDG_RUNTIME_DIR or a private per-user temp directory)'
+    )
+    serve_parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of worker processes (default: CPU count)'
+    )
+    serve_parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Enable detailed logging'
+    )
+
+    for subparser in (batch_parser, watch_parser, serve_parser):
+        _inherit_global_options(parser, subparser)
 
     args = parser.parse_args()
-    run_from_config(args.config, verbose=args.verbose)
+    result_cache = _result_cache_option(args) if args.command in (None, 'batch') else None
+
+    if args.command == 'batch':
+        from edit_image.batch import run_batch
+        from edit_image.cache import ResultCache
+        run_batch(args.config, args.inputs, args.output_dir,
+                  jobs=args.jobs, overwrite=args.overwrite, verbose=args.verbose,
+                  tile_size=args.tile, result_cache=result_cache and ResultCache(*result_cache),
+                  prefetch=args.prefetch, encoders=args.encoders, precision=args.precision,
+                  buffer_bytes=_buffer_bytes(args), optimize=not args.no_optimize,
+                  unclamped=args.unclamped_fusion)
+        return
+
+    if args.command == 'watch':
+        from edit_image.watch import watch_config, DEFAULT_INTERVAL
+        watch_config(args.config, interval=args.interval or DEFAULT_INTERVAL, verbose=args.verbose)
+        return
+
+    socket_path = args.socket or default_socket_path()
+
+    if args.command == 'serve':
+        from edit_image.server import serve
+        serve(socket_path, workers=args.workers, verbose=args.verbose)
+        return
+
+    if args.config is None:
+        parser.error('--config is required')
+    if args.fusion_report and not args.unclamped_fusion:
+        parser.error('--fusion-report requires --unclamped-fusion')
+
+    if args.stream:
+        from edit_image.streaming import stream_from_config, DEFAULT_STRIP_ROWS
+        stream_from_config(args.config, verbose=args.verbose, strip_rows=args.strip_rows or DEFAULT_STRIP_ROWS,
+                           optimize=not args.no_optimize)
+        return
+
+    cache_bytes = None
+    if args.depth_first:
+        from edit_image.tiling import DEFAULT_CACHE_BYTES
+        cache_bytes = args.cache_kb * 1024 if args.cache_kb else DEFAULT_CACHE_BYTES
+
+    # The daemon runs linear configs only, does not send fusion reports back and
+    # computes tiles in its own warm workers rather than in '--processes' pools
+    if (not args.no_daemon and not args.fusion_report and args.processes == 1
+            and not is_graph_config(args.config) and daemon_available(socket_path)):
+        options = {'tile_size': args.tile, 'threads': args.threads, 'cache_bytes': cache_bytes,
+                   'result_cache': result_cache, 'precision': args.precision,
+                   'buffer_bytes': _buffer_bytes(args), 'optimize': not args.no_optimize,
+                   'unclamped': args.unclamped_fusion}
+        forward_config(args.config, socket_path, options, verbose=args.verbose)
+        return
+
+    from edit_image.pipeline import run_from_config
+    from edit_image.cache import ResultCache
+    from filters.base.buffers import BufferPool
+    buffer_bytes = _buffer_bytes(args)
+    run_from_config(args.config, verbose=args.verbose, tile_size=args.tile, threads=args.threads,
+                    cache_bytes=cache_bytes, result_cache=result_cache and ResultCache(*result_cache),
+                    processes=args.processes, precision=args.precision,
+                    buffers=None if buffer_bytes == 0 else BufferPool(buffer_bytes),
+                    optimize=not args.no_optimize, unclamped=args.unclamped_fusion,
+                    fusion_report=args.fusion_report)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+client.py
+---------
+Thin client for the 'edit-image serve' daemon, plus the wire format shared with it.
+
+Every message is a 4-byte big-endian header length, a UTF-8 JSON header, and
+'header["size"]' bytes of payload:
+
+    request:  {"operations": [...], "extension": ".png", "options": {...}, "size": n}
+              followed by the encoded input image
+    response: {"ok": true, "size": n} followed by the encoded output image, or
+              {"ok": false, "error": "...", "size": 0}
+
+Only uses the standard library, so forwarding a job costs no NumPy / Pillow import.
+"""
+
+import io
+import json
+import os
+import socket
+import stat
+import struct
+import tempfile
+
+from edit_image.common import (
+    INPUT, OUTPUT, OPERATIONS, DISPLAY, OUTPUT_SIZE, MAX_DIMENSION, REQUIRED_KEYS, AT_LEAST_ONE,
+    log, resolve_output_path
+)
+
+SOCKET_ENV = 'EDIT_IMAGE_SOCKET'
+
+_HEADER_LENGTH = struct.Struct('>I')
+
+
+def default_socket_path() -> str:
+    """
+    Daemon socket path: $EDIT_IMAGE_SOCKET, or 'edit-image.sock' in $XDG_RUNTIME_DIR,
+    or in a per-user 0700 directory under the temp directory.
+
+    Raises:
+        RuntimeError if the per-user directory exists but is not private to the user
+    """
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+
+    if os.environ.get('XDG_RUNTIME_DIR'):
+        return os.path.join(os.environ['XDG_RUNTIME_DIR'], 'edit-image.sock')
+
+    user = os.getuid() if hasattr(os, 'getuid') else os.getlogin()
+    directory = os.path.join(tempfile.gettempdir(), f"edit-image-{user}")
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+
+    # Someone else may have created it first in the shared temp directory
+    info = os.lstat(directory)
+    if (not stat.S_ISDIR(info.st_mode) or info.st_mode & 0o077
+            or (hasattr(os, 'getuid') and info.st_uid != os.getuid())):
+        raise RuntimeError(f"'{directory}' is not a private directory of the current user")
+
+    return os.path.join(directory, 'edit-image.sock')
+
+
+def _read_exact(stream, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ConnectionError(f"Connection closed after {len(data)} of {size} bytes")
+    return data
+
+
+def send_message(stream, header: dict, payload: bytes = b''):
+    """
+    Write one framed message to a binary file-like object.
+    """
+    header = dict(header, size=len(payload))
+    encoded = json.dumps(header).encode('utf-8')
+    stream.write(_HEADER_LENGTH.pack(len(encoded)) + encoded)
+    if payload:
+        stream.write(payload)
+    stream.flush()
+
+
+def recv_message(stream):
+    """
+    Read one framed message from a binary file-like object.
+
+    Returns:
+        tuple: (header dict, payload bytes)
+    """
+    (length,) = _HEADER_LENGTH.unpack(_read_exact(stream, _HEADER_LENGTH.size))
+    header = json.loads(_read_exact(stream, length).decode('utf-8'))
+    return header, _read_exact(stream, header.get('size', 0))
+
+
+def request(socket_path: str, operations, image_bytes: bytes, extension='.png', options=None) -> bytes:
+    """
+    Send one job to the daemon and wait for the encoded result.
+
+    Parameters:
+        socket_path (str): Daemon socket
+        operations (list): Config 'operations' list (validated by the daemon)
+        image_bytes (bytes): Encoded input image
+        extension (str): Output file extension, selects the output format
+        options (dict or None): Execution options forwarded to 'apply_filters()'
+
+    Returns:
+        bytes: Encoded output image
+
+    Raises:
+        ConnectionError if the daemon is not reachable, RuntimeError if the job failed
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile('rwb') as stream:
+            send_message(stream, {OPERATIONS: operations, 'extension': extension, 'options': options or {}},
+                         image_bytes)
+            header, payload = recv_message(stream)
+
+    if not header.get('ok'):
+        raise RuntimeError(f"Daemon failed to process the job: {header.get('error')}")
+
+    return payload
+
+
+def socket_owned(socket_path: str) -> bool:
+    """
+    Whether 'socket_path' is a socket (not a link to one) owned by the current user.
+    """
+    try:
+        info = os.lstat(socket_path)
+    except OSError:
+        return False
+
+    return stat.S_ISSOCK(info.st_mode) and (not hasattr(os, 'getuid') or info.st_uid == os.getuid())
+
+
+def daemon_available(socket_path: str) -> bool:
+    """
+    Whether a daemon of the current user is listening on 'socket_path'. Sockets owned
+    by other users are never used, so images are not sent to their processes.
+    """
+    if not hasattr(socket, 'AF_UNIX') or not socket_owned(socket_path):
+        return False
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+
+    return True
+
+
+def forward_config(config_path: str, socket_path: str, options=None, verbose=False):
+    """
+    Run a config through the daemon: send the input, save / display the result.
+
+    Parameters:
+        config_path (str): Path to config file
+        socket_path (str): Daemon socket
+        options (dict or None): Execution options forwarded to the daemon
+        verbose (bool): Enable logging
+
+    Raises:
+        FileNotFoundError, ValueError, RuntimeError
+    """
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"Config file '{config_path}' not found")
+
+    with open(config_path, "r") as f:
+        config = json.load(f)
+
+    if not REQUIRED_KEYS.issubset(set(config)):
+        raise ValueError(f"Missing required config fields: {REQUIRED_KEYS - set(config)}")
+    if not (AT_LEAST_ONE & set(config)):
+        raise ValueError(f"Missing one of the following fields: {AT_LEAST_ONE}")
+
+    if not os.path.exists(config[INPUT]):
+        raise FileNotFoundError(f"Input image '{config[INPUT]}' not found")
+
+    with open(config[INPUT], 'rb') as f:
+        image_bytes = f.read()
+
+    extension = os.path.splitext(config[OUTPUT])[1] if OUTPUT in config else '.png'
+
+    # The daemon resolves the output size against the decoded input
+    options = dict(options or {})
+    options.update({key: config[key] for key in (OUTPUT_SIZE, MAX_DIMENSION) if key in config})
+    if options.get('result_cache'):
+        # The daemon runs in another working directory
+        directory, max_bytes = options['result_cache']
+        options['result_cache'] = (os.path.abspath(directory), max_bytes)
+
+    log(f"Forwarding {config[INPUT]} to daemon at {socket_path}", verbose)
+    output = request(socket_path, config[OPERATIONS], image_bytes, extension or '.png', options)
+
+    if OUTPUT in config:
+        output_path = resolve_output_path(config[OUTPUT])
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        log(f"Saving output to: {output_path}", verbose)
+        with open(output_path, 'wb') as f:
+            f.write(output)
+
+    if DISPLAY in config:
+        # Only pay for Pillow when the result is actually displayed
+        from PIL import Image
+        Image.open(io.BytesIO(output)).show()
@@ -0,0 +1,74 @@
+"""
+common.py
+---------
+Config key names and small helpers shared by the pipeline, the CLI and the daemon
+client.
+
+Only uses the standard library, so the thin client path of the CLI can run without
+importing NumPy or Pillow.
+"""
+
+import json
+import os
+
+# JSON key names
+INPUT = 'input'
+OUTPUT = 'output'
+OPERATIONS = 'operations'
+DISPLAY = 'display'
+TYPE = 'type'
+OUTPUT_SIZE = 'output_size'
+MAX_DIMENSION = 'max_dimension'
+
+# Graph configs (see 'edit_image.graph')
+INPUTS = 'inputs'
+NODES = 'nodes'
+OUTPUTS = 'outputs'
+NAME = 'name'
+FROM = 'from'
+
+REQUIRED_KEYS = {INPUT, OPERATIONS}
+AT_LEAST_ONE = {OUTPUT, DISPLAY}
+
+def log(msg, verbose=False):
+    """
+    Print a message if verbose mode is True.
+    """
+    if verbose:
+        print(msg)
+
+def is_graph_config(config_path: str) -> bool:
+    """
+    Whether a config file uses the graph form ('nodes' instead of 'operations').
+    Unreadable files count as linear configs, which report the problem.
+    """
+    try:
+        with open(config_path, "r") as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    return isinstance(config, dict) and NODES in config
+
+def resolve_output_path(path):
+    """
+    Return a safe output path. If the file already exists, appends _1, _2, ...
+
+    Parameters:
+        path (str): Desired path to output file
+
+    Returns:
+        str: non-conflicting output path
+    """
+    if not os.path.exists(path):
+        return path
+
+    log(f'File already exists! {path}', verbose=True)
+
+    base, ext = os.path.splitext(path)
+    i = 1
+    while True:
+        candidate = f"{base}_{i}{ext}"
+        if not os.path.exists(candidate):
+            return candidate
+        i += 1
@@ -0,0 +1,494 @@
+"""
+graph.py
+--------
+Graph-shaped configs: named nodes, several inputs and outputs, blend nodes.
+
+Expected JSON format:
+{
+    "inputs": {"photo": "photo.png", "paper": "paper.png"},
+    "nodes": [
+        {"name": "soft", "from": "photo", "type": "box", "width": 5, "height": 5},
+        {"name": "crisp", "from": "photo", "type": "sharpen", "alpha": 1.5},
+        {"name": "printed", "from": ["crisp", "paper"], "type": "blend", "mode": "multiply"}
+    ],
+    "outputs": {"soft": "out/soft.png", "printed": "out/printed.png"},
+    "display": ["printed"]          # optional, or true for every output
+}
+
+A single "input": "photo.png" may replace "inputs"; it is then named "input". A node
+without "from" reads the node listed before it (the input, for the first node), so a
+plain chain needs no wiring. Nodes can only read inputs and earlier nodes, which
+keeps the graph acyclic.
+
+Before running, the graph is simplified:
+    - nodes nothing is saved or displayed from are dropped
+    - common subexpressions are eliminated: nodes applying the same operation (same
+      filter class and params, defaults included) to the same sources run once
+    - under float precision, a Sharpen whose blur is also computed by a Box node on
+      the same source reuses that result ('Unsharp'); this is exact only there, as
+      uint8 runs truncate the Box node but not Sharpen's own blur
+
+Chains of filter nodes that nothing else reads in between run as one linear plan
+through 'apply_filters()', so they are optimised, tiled and cached like a linear
+config. Float precision keeps float results between nodes and quantises the outputs.
+
+Usage:
+    edit-image --config configs/variants.json [--precision float32] [--verbose]
+"""
+
+import inspect
+import os
+import time
+from collections import namedtuple, Counter
+from PIL import Image
+import numpy as np
+
+from edit_image.common import (
+    INPUT, INPUTS, NODES, OUTPUTS, DISPLAY, TYPE, NAME, FROM, log, resolve_output_path
+)
+from edit_image.pipeline import (
+    PRECISIONS, read_config, validate_filter_config, build_filters, load_image, save_image,
+    apply_filters, quantise_image
+)
+from edit_image.cache import operation_key
+from edit_image.planner import optimize_plan, describe_operation, propagate_value_ranges
+from filters.base import BaseFilter
+from filters.base.buffers import empty, release, use_pool
+from filters.catalog import Box, Sharpen
+
+BLEND = 'blend'
+BLEND_MODES = ('mix', 'multiply', 'screen', 'lighten', 'darken', 'difference')
+
+# One node of the graph: 'op' is a filter class, 'Blend' or 'Unsharp' (built with
+# 'params' and applied to the results of the 'sources' nodes), or None for an input
+# image, whose path is params['path']
+Node = namedtuple('Node', ['op', 'params', 'sources'])
+
+
+class Blend:
+    """
+    Merge node combining the images of its sources pixel by pixel.
+
+    Parameters:
+        mode (str): 'mix' (weighted sum), 'multiply', 'screen', 'lighten' (maximum),
+            'darken' (minimum) or 'difference' (absolute difference of two images)
+        weights (list or None): 'mix' weights, one per source (default: equal
+            weights summing to 1)
+    """
+
+    def __init__(self, mode: str = 'mix', weights: list = None):
+        if mode not in BLEND_MODES:
+            raise ValueError(f"Blend mode must be one of {list(BLEND_MODES)}, got {mode}")
+        if weights is not None:
+            if mode != 'mix':
+                raise ValueError(f"Weights only apply to the 'mix' mode, got mode {mode}")
+            if not (isinstance(weights, list) and all(isinstance(w, (int, float)) for w in weights)):
+                raise ValueError(f"Weights must be a list of numbers, got {weights}")
+
+        self.mode = mode
+        self.weights = weights
+
+    def check_sources(self, count: int):
+        """
+        Raises:
+            ValueError if the node cannot blend 'count' images
+        """
+        if count < 2:
+            raise ValueError(f"A blend needs at least 2 sources, got {count}")
+        if self.mode == 'difference' and count != 2:
+            raise ValueError(f"The 'difference' mode blends exactly 2 sources, got {count}")
+        if self.weights is not None and len(self.weights) != count:
+            raise ValueError(f"Expected {count} weights, one per source, got {len(self.weights)}")
+
+    def _weights(self, count: int):
+        return self.weights if self.weights is not None else [1 / count] * count
+
+    def apply(self, images) -> np.ndarray:
+        """
+        Blend equally shaped images. Integer images are blended in float32, then
+        clipped and truncated back to uint8; float images keep their precision.
+        """
+        if len({image.shape for image in images}) != 1:
+            raise ValueError(f"Blended images must have the same shape, got {[image.shape for image in images]}")
+
+        dtype = images[0].dtype if images[0].dtype.kind == 'f' else np.float32
+        out = empty(images[0].shape, dtype)
+
+        if self.mode == 'mix':
+            weights = self._weights(len(images))
+            np.multiply(images[0].astype(dtype, copy=False), weights[0], out=out)
+            for weight, image in zip(weights[1:], images[1:]):
+                out += weight * image.astype(dtype, copy=False)
+        elif self.mode == 'multiply':
+            np.copyto(out, images[0])
+            for image in images[1:]:
+                out *= image.astype(dtype, copy=False) / 255
+        elif self.mode == 'screen':
+            np.subtract(255, images[0], out=out)
+            for image in images[1:]:
+                out *= (255 - image.astype(dtype, copy=False)) / 255
+            np.subtract(255, out, out=out)
+        elif self.mode == 'lighten':
+            np.copyto(out, images[0])
+            for image in images[1:]:
+                np.maximum(out, image, out=out)
+        elif self.mode == 'darken':
+            np.copyto(out, images[0])
+            for image in images[1:]:
+                np.minimum(out, image, out=out)
+        else:
+            np.subtract(images[0], images[1], out=out)
+            np.abs(out, out=out)
+
+        if images[0].dtype.kind == 'f':
+            return out
+
+        result = empty(out.shape, images[0].dtype)
+        np.copyto(result, np.clip(out, 0, 255, out=out), casting='unsafe')
+        release(out)
+        return result
+
+    def value_range(self, ranges):
+        """
+        Bounds on the (unclipped) result for sources within 'ranges', or None if unknown.
+        """
+        if any(value_range is None for value_range in ranges):
+            return None
+
+        lows, highs = zip(*ranges)
+        if self.mode == 'mix':
+            bounds = [sorted((weight * low, weight * high))
+                      for weight, low, high in zip(self._weights(len(ranges)), lows, highs)]
+            return sum(b[0] for b in bounds), sum(b[1] for b in bounds)
+        if self.mode == 'lighten':
+            return max(lows), max(highs)
+        if self.mode == 'darken':
+            return min(lows), min(highs)
+        if min(lows) >= 0 and max(highs) <= 255:
+            # Products of [0, 1] factors and differences of [0, 255] values
+            return 0, 255
+
+        return None
+
+
+class Unsharp:
+    """
+    Second half of 'Sharpen', given the blurred image: image + alpha * (image - blurred).
+
+    Parameters:
+        alpha (float): Sharpening strength
+    """
+
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+
+    def apply(self, images) -> np.ndarray:
+        image, blurred = images
+
+        # Same operations, in the same order and precision, as 'Sharpen._unsharp()'
+        mask = np.subtract(image, blurred, out=empty(image.shape, np.result_type(image, blurred)))
+        mask *= self.alpha
+        mask += image
+        return mask
+
+    def value_range(self, ranges):
+        if any(value_range is None for value_range in ranges):
+            return None
+
+        (low, high), blur_range = ranges
+        return ((1 + self.alpha) * low - self.alpha * blur_range[1],
+                (1 + self.alpha) * high - self.alpha * blur_range[0])
+
+
+def canonical_params(cls, params: dict) -> dict:
+    """
+    Params without those set to their default value, so equivalent operations compare equal.
+    """
+    defaults = {
+        name: parameter.default
+        for name, parameter in inspect.signature(cls.__init__).parameters.items()
+        if parameter.default is not inspect.Parameter.empty
+    }
+    return {key: value for key, value in params.items() if key not in defaults or defaults[key] != value}
+
+
+def _is_filter(node: Node) -> bool:
+    return isinstance(node.op, type) and issubclass(node.op, BaseFilter)
+
+
+def parse_graph(config: dict, verbose=False):
+    """
+    Validate a graph config.
+
+    Parameters:
+        config (dict): Parsed config with a 'nodes' list
+        verbose (bool): Enable logging
+
+    Returns:
+        tuple: (dict of name -> Node in config order, dict of name -> output path,
+        list of names to display)
+
+    Raises:
+        FileNotFoundError, ImportError, ValueError, TypeError
+    """
+    if INPUTS in config and INPUT in config:
+        raise ValueError(f"Use either '{INPUTS}' or '{INPUT}', not both")
+    inputs = config.get(INPUTS, {INPUT: config[INPUT]} if INPUT in config else None)
+    if not isinstance(inputs, dict) or not inputs:
+        raise ValueError(f"Graph configs need '{INPUTS}', a dict of input name -> image path")
+
+    graph = {}
+    for name, path in inputs.items():
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Input image '{path}' not found")
+        graph[name] = Node(None, {'path': path}, ())
+
+    nodes = config[NODES]
+    if not isinstance(nodes, list) or not nodes:
+        raise TypeError(f"'{NODES}' must be a non-empty list")
+
+    previous = next(iter(inputs)) if len(inputs) == 1 else None
+    for node in nodes:
+        if not isinstance(node, dict) or TYPE not in node or NAME not in node:
+            raise ValueError(f"Each node must be a dict with '{NAME}' and '{TYPE}' fields")
+
+        name = node[NAME]
+        if not isinstance(name, str) or name in graph:
+            raise ValueError(f"Node names must be unique strings, got {name!r}")
+
+        sources = node.get(FROM, previous)
+        if sources is None:
+            raise ValueError(f"Node '{name}' needs a '{FROM}' field (there are several inputs)")
+        sources = (sources,) if isinstance(sources, str) else tuple(sources)
+        for source in sources:
+            if source not in graph:
+                raise ValueError(f"Node '{name}' reads '{source}', which is not an input or an earlier node")
+
+        op_type = node[TYPE]
+        params = {k: v for k, v in node.items() if k not in (TYPE, NAME, FROM)}
+
+        if op_type == BLEND:
+            if not isinstance(node.get(FROM), list):
+                raise ValueError(f"Blend node '{name}' needs a '{FROM}' list of sources")
+            try:
+                Blend(**params).check_sources(len(sources))
+            except TypeError:
+                raise ValueError(f"Invalid parameters for blend node '{name}': {set(params)}")
+            graph[name] = Node(Blend, canonical_params(Blend, params), sources)
+            log(f"Validated node: {name} = blend of {', '.join(sources)} with params: {params}", verbose)
+        else:
+            if len(sources) != 1:
+                raise ValueError(f"Filter node '{name}' reads exactly one source, got {len(sources)}")
+            cls = validate_filter_config(op_type, params, verbose)
+            graph[name] = Node(cls, canonical_params(cls, params), sources)
+
+        previous = name
+
+    outputs = config.get(OUTPUTS, {})
+    if not isinstance(outputs, dict):
+        raise TypeError(f"'{OUTPUTS}' must be a dict of node name -> output path")
+
+    display = config.get(DISPLAY, [])
+    if display is True:
+        display = list(outputs)
+    elif not isinstance(display, list):
+        raise TypeError(f"'{DISPLAY}' must be true or a list of node names")
+
+    if not (outputs or display):
+        raise ValueError(f"Graph configs need '{OUTPUTS}' or '{DISPLAY}'")
+    for name in list(outputs) + display:
+        if name not in graph:
+            raise ValueError(f"Unknown node '{name}' in '{OUTPUTS}' / '{DISPLAY}'")
+
+    return graph, outputs, display
+
+
+def _topological_order(graph: dict, targets) -> list:
+    """
+    Names of the nodes the targets depend on (targets included), sources first.
+    """
+    order, seen = [], set()
+
+    def visit(name):
+        if name in seen:
+            return
+        seen.add(name)
+        for source in graph[name].sources:
+            visit(source)
+        order.append(name)
+
+    for target in targets:
+        visit(target)
+
+    return order
+
+
+def plan_graph(graph: dict, targets, precision='uint8', verbose=False):
+    """
+    Simplify a graph: drop unused nodes, merge common subexpressions and, under
+    float precision, let Sharpen nodes reuse an equivalent Box node.
+
+    Parameters:
+        graph (dict): name -> Node, as returned by 'parse_graph()'
+        targets (list): Names of the nodes whose results are needed
+        precision (str): Precision policy the graph will run with
+        verbose (bool): Enable logging
+
+    Returns:
+        tuple: (dict of name -> Node, dict of target name -> name of the node computing it)
+    """
+    order = _topological_order(graph, targets)
+
+    # Operation + canonical sources -> first node computing it
+    computed = {}
+    alias = {}
+    simplified = {}
+    for name in order:
+        node = graph[name]
+        sources = tuple(alias[source] for source in node.sources)
+        op = 'input' if node.op is None else operation_key(node.op, node.params)
+        key = (op, node.params['path'] if node.op is None else None, sources)
+
+        if key in computed:
+            alias[name] = computed[key]
+            log(f"Node '{name}' is the same as '{computed[key]}', computed once", verbose)
+            continue
+
+        computed[key] = alias[name] = name
+        simplified[name] = node._replace(sources=sources)
+
+    if precision != 'uint8':
+        for name, node in simplified.items():
+            if node.op is not Sharpen or not set(node.params) <= {'alpha', 'blur_size'}:
+                continue
+
+            size = node.params.get('blur_size', 5)
+            blur = operation_key(Box, canonical_params(Box, {'width': size, 'height': size}))
+            box = computed.get((blur, None, node.sources))
+            if box is not None:
+                simplified[name] = Node(Unsharp, {'alpha': node.params.get('alpha', 1.0)}, node.sources + (box,))
+                log(f"Node '{name}' reuses the blur of '{box}'", verbose)
+
+    # Reorder: a reused Box may come after the Sharpen reading it
+    canonical_targets = [alias[target] for target in targets]
+    graph = {name: simplified[name] for name in _topological_order(simplified, canonical_targets)}
+
+    return graph, {target: alias[target] for target in targets}
+
+
+def run_graph(graph: dict, targets, verbose=False, precision='uint8', optimize=True, unclamped=False,
+              buffers=None, **options) -> dict:
+    """
+    Compute the targets of a graph.
+
+    Parameters:
+        graph (dict): name -> Node, as returned by 'parse_graph()'
+        targets (list): Names of the nodes whose results are needed
+        verbose (bool): Enable logging
+        precision (str): 'uint8', 'float32' or 'float64' (see 'apply_filters()')
+        optimize (bool): Simplify the graph and optimise each chain of filters
+        unclamped (bool): Let the optimiser compose linear kernels
+        buffers (BufferPool or None): Pool of reusable working / output arrays
+        **options: Passed to 'apply_filters()' (tile_size, threads, ...)
+
+    Returns:
+        dict: target name -> uint8 image
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {list(PRECISIONS)}, got {precision}")
+
+    if optimize:
+        graph, alias = plan_graph(graph, targets, precision, verbose)
+    else:
+        graph = {name: graph[name] for name in _topological_order(graph, targets)}
+        alias = {target: target for target in targets}
+
+    keep = set(alias.values())
+    consumers = Counter(source for node in graph.values() for source in node.sources)
+
+    # Filter nodes whose only consumer is a filter node continue into it, as one chain
+    continued = {
+        node.sources[0] for node in graph.values()
+        if _is_filter(node) and _is_filter(graph[node.sources[0]])
+        and consumers[node.sources[0]] == 1 and node.sources[0] not in keep
+    }
+
+    results, ranges, chains = {}, {}, {}
+    for name, node in graph.items():
+        if _is_filter(node):
+            chain = chains.pop(node.sources[0], []) + [name]
+            if name in continued:
+                chains[name] = chain
+                continue
+            sources = graph[chain[0]].sources
+        else:
+            sources = node.sources
+
+        t0 = time.time()
+        if node.op is None:
+            log(f"Loading image: {node.params['path']}", verbose)
+            image_np = load_image(node.params['path'])
+            if PRECISIONS[precision] is not None:
+                image_np = image_np.astype(PRECISIONS[precision])
+            value_range = (0, 255)
+        elif _is_filter(node):
+            filters = [(graph[step].op, graph[step].params) for step in chain]
+            log(f"Node '{name}': {' -> '.join(describe_operation(*op) for op in filters)}", verbose)
+            if optimize:
+                filters = optimize_plan(filters, verbose, precision, unclamped)
+
+            instances = build_filters(filters)
+            value_range = propagate_value_ranges(instances, precision, ranges[sources[0]])
+            image_np = apply_filters(results[sources[0]], filters, instances, verbose=verbose, precision=precision,
+                                     buffers=buffers, input_range=ranges[sources[0]], quantise=False, **options)
+        else:
+            log(f"Node '{name}': {describe_operation(node.op, node.params)} of {', '.join(sources)}", verbose)
+            op = node.op(**node.params)
+            with use_pool(buffers):
+                image_np = op.apply([results[source] for source in sources])
+            value_range = (0, 255) if precision == 'uint8' else op.value_range([ranges[s] for s in sources])
+        log(f"node took {time.time() - t0:.3f} seconds!", verbose)
+
+        results[name], ranges[name] = image_np, value_range
+
+        # Hand back results nothing reads any more
+        for source in sources:
+            consumers[source] -= 1
+            if consumers[source] == 0 and source not in keep:
+                finished = results.pop(source)
+                with use_pool(buffers):
+                    release(finished, *results.values())
+
+    outputs = {}
+    for target, name in alias.items():
+        image_np = results[name]
+        if image_np.dtype != np.uint8:
+            with use_pool(buffers):
+                image_np = quantise_image(image_np, ranges[name])
+        outputs[target] = image_np
+
+    return outputs
+
+
+def run_graph_from_config(config_path: str, verbose=False, **options):
+    """
+    Execute a graph config: load its inputs, compute every saved or displayed node,
+    save and / or display them.
+
+    Parameters:
+        config_path (str): Path to config file
+        verbose (bool): Enable logging
+        **options: Passed to 'run_graph()' (precision, optimize, tile_size, ...)
+    """
+    config = read_config(config_path)
+    graph, output_paths, display = parse_graph(config, verbose)
+
+    results = run_graph(graph, list(dict.fromkeys(list(output_paths) + display)), verbose=verbose, **options)
+
+    for name, path in output_paths.items():
+        output_path = resolve_output_path(path)
+        log(f"Saving '{name}' to: {output_path}", verbose)
+        save_image(results[name], output_path)
+
+    for name in display:
+        Image.fromarray(results[name]).show()
@@ -34,26 +34,25 @@ from PIL import Image
 import numpy as np
 import os
 import time
-
-# JSON key names
-INPUT = 'input'
-OUTPUT = 'output'
-OPERATIONS = 'operations'
-DISPLAY = 'display'
-TYPE = 'type'
-
-REQUIRED_KEYS = {INPUT, OPERATIONS}
-AT_LEAST_ONE = {OUTPUT, DISPLAY}
+from concurrent.futures import ProcessPoolExecutor
+
+from edit_image.common import (
+    INPUT, OUTPUT, OPERATIONS, DISPLAY, TYPE, OUTPUT_SIZE, MAX_DIMENSION, NODES, REQUIRED_KEYS, AT_LEAST_ONE,
+    log, resolve_output_path
+)
+from edit_image.tiling import plan_segments, apply_tiled, cache_tile_size, auto_tile_size
+from edit_image.transport import SharedFrames
+from edit_image.cache import image_key, prefix_keys
+from edit_image.planner import optimize_plan, describe_operation, propagate_value_ranges, add_resize
+from filters.base.base_filter import clip_is_noop
+from filters.base.buffers import empty, release, use_pool
 
 # Path to ready to use filters
 FILTERS_PATH = 'filters.catalog'
 
-def log(msg, verbose=False):
-    """
-    Print a message if verbose mode is True.
-    """
-    if verbose:
-        print(msg)
+# Intermediate dtype per precision policy. 'uint8' clips and quantises after every
+# filter; the float policies keep unclipped intermediates and quantise once at the end.
+PRECISIONS = {'uint8': None, 'float32': np.float32, 'float64': np.float64}
 
 def validate_filter_config(filter_type, params, verbose=False):
     """
@@ -94,42 +93,47 @@ def validate_filter_config(filter_type, params, verbose=False):
     log(f"Validated filter: {filter_type} with params: {params}", verbose)
     return filter_class
 
-def load_and_validate_config(config_path: str, verbose=False):
+def read_config(config_path: str) -> dict:
     """
-    Load and validate a JSON pipeline config file.
+    Read a JSON pipeline config file without validating its contents.
 
     Parameters:
         config_path (str): Path to JSON config
-        verbose (bool): Enable logging
 
     Returns:
-        tuple: (config dict, list of (filter class, params) tuples)
+        dict: Parsed config
 
     Raises:
-        FileNotFoundError, ValueError, TypeError
+        FileNotFoundError
     """
 
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Config file '{config_path}' not found")
 
     with open(config_path, "r") as f:
-        config = json.load(f)
+        return json.load(f)
 
-    if not REQUIRED_KEYS.issubset(set(config)):
-        raise ValueError(f"Missing required config fields: {REQUIRED_KEYS - set(config)}")
-    if not (AT_LEAST_ONE & set(config)):
-        raise ValueError(f"Missing one of the following fields: {AT_LEAST_ONE}")
+def validate_operations(operations, verbose=False):
+    """
+    Validate the 'operations' list of a config.
 
-    if not os.path.exists(config[INPUT]):
-        raise FileNotFoundError(f"Input image '{config[INPUT]}' not found")
+    Parameters:
+        operations (list): List of operation dicts, each with a 'type' field
+        verbose (bool): Enable logging
+
+    Returns:
+        list: (filter class, params) tuples
+
+    Raises:
+        ImportError, ValueError, TypeError
+    """
 
-    if not isinstance(config[OPERATIONS], list):
+    if not isinstance(operations, list):
         raise TypeError(f"'{OPERATIONS} must be a list")
 
-    # Validate all filters
     validated_filters = []
 
-    for operation in config[OPERATIONS]:
+    for operation in operations:
         if not isinstance(operation, dict) or TYPE not in operation:
             raise ValueError(f"Each operation must be a dict with a '{TYPE}' field")
 
@@ -139,32 +143,249 @@ def load_and_validate_config(config_path: str, verbose=False):
         cls = validate_filter_config(op_type, op_params, verbose)
         validated_filters.append((cls, op_params))
 
+    return validated_filters
+
+def load_and_validate_config(config_path: str, verbose=False):
+    """
+    Load and validate a JSON pipeline config file.
+
+    Parameters:
+        config_path (str): Path to JSON config
+        verbose (bool): Enable logging
+
+    Returns:
+        tuple: (config dict, list of (filter class, params) tuples)
+
+    Raises:
+        FileNotFoundError, ValueError, TypeError
+    """
+
+    config = read_config(config_path)
+
+    if NODES in config:
+        raise ValueError(f"Graph configs ('{NODES}') can only be run with 'edit-image --config'")
+    if not REQUIRED_KEYS.issubset(set(config)):
+        raise ValueError(f"Missing required config fields: {REQUIRED_KEYS - set(config)}")
+    if not (AT_LEAST_ONE & set(config)):
+        raise ValueError(f"Missing one of the following fields: {AT_LEAST_ONE}")
+
+    if not os.path.exists(config[INPUT]):
+        raise FileNotFoundError(f"Input image '{config[INPUT]}' not found")
+
+    # Validate all filters
+    validated_filters = validate_operations(config[OPERATIONS], verbose)
+
     return config, validated_filters
 
-def resolve_output_path(path):
+def resolve_output_size(config: dict, input_size):
+    """
+    Output size asked for by a config: 'output_size' ([width, height]) or
+    'max_dimension' (bound on the longer side; smaller images are left as they are).
+
+    Parameters:
+        config (dict): Config, only the size fields are read
+        input_size (tuple): (width, height) of the input image
+
+    Returns:
+        tuple or None: (width, height), or None if the image keeps its size
+
+    Raises:
+        ValueError
+    """
+    if OUTPUT_SIZE in config and MAX_DIMENSION in config:
+        raise ValueError(f"Use either '{OUTPUT_SIZE}' or '{MAX_DIMENSION}', not both")
+
+    if OUTPUT_SIZE in config:
+        size = config[OUTPUT_SIZE]
+        if not (isinstance(size, list) and len(size) == 2 and all(isinstance(v, int) and v > 0 for v in size)):
+            raise ValueError(f"'{OUTPUT_SIZE}' must be [width, height] with positive ints, got {size}")
+        return tuple(size)
+
+    if MAX_DIMENSION in config:
+        limit = config[MAX_DIMENSION]
+        if not (isinstance(limit, int) and limit > 0):
+            raise ValueError(f"'{MAX_DIMENSION}' must be a positive int, got {limit}")
+
+        width, height = input_size
+        scale = limit / max(width, height)
+        if scale >= 1:
+            return None
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    return None
+
+def build_filters(filters):
+    """
+    Instantiate validated filters once, so they can be reused across images.
+
+    Parameters:
+        filters (list): (filter class, params) tuples
+
+    Returns:
+        list: Filter instances
+    """
+    return [cls(**params) for cls, params in filters]
+
+def load_image(path: str) -> np.ndarray:
+    """
+    Decode an image file into an RGB uint8 array.
+    """
+    image = Image.open(path).convert("RGB")
+    return np.array(image)
+
+def save_image(image_np: np.ndarray, path: str):
+    """
+    Encode an image array to 'path', creating parent directories as needed.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    Image.fromarray(image_np.astype(np.uint8)).save(path)
+
+def quantise_image(image_np: np.ndarray, value_range=None, in_place=False) -> np.ndarray:
     """
-    Return a safe output path. If the file already exists, appends _1, _2, ...
+    Clip a float image to [0, 255] and truncate it to uint8, into a pooled buffer.
 
     Parameters:
-        path (str): Desired path to output file
+        image_np (np.ndarray): Float image
+        value_range (tuple or None): Known bounds on its values; the clip is skipped
+            when they show it changes nothing
+        in_place (bool): Clip inside 'image_np' and give it back to the pool afterwards
 
     Returns:
-        str: non-conflicting output path
+        np.ndarray: uint8 image
     """
-    if not os.path.exists(path):
-        return path
+    if clip_is_noop(value_range, integral=True):
+        clipped = image_np
+    else:
+        clipped = np.clip(image_np, 0, 255, out=image_np if in_place else None)
 
-    log(f'File already exists! {path}', verbose=True)
+    result = empty(clipped.shape, np.uint8)
+    np.copyto(result, clipped, casting='unsafe')
+    if in_place or clipped is not image_np:
+        release(clipped)
 
-    base, ext = os.path.splitext(path)
-    i = 1
-    while True:
-        candidate = f"{base}_{i}{ext}"
-        if not os.path.exists(candidate):
-            return candidate
-        i += 1
+    return result
 
-def run_from_config(config_path: str, verbose=False):
+def apply_filters(image_np: np.ndarray, filters, instances=None, verbose=False, tile_size=None,
+                  threads=1, cache_bytes=None, result_cache=None, processes=1, precision='uint8',
+                  buffers=None, input_range=(0, 255), quantise=True) -> np.ndarray:
+    """
+    Sequentially apply validated filters to an image.
+
+    Parameters:
+        image_np (np.ndarray): Decoded input image
+        filters (list): (filter class, params) tuples
+        instances (list or None): Prebuilt filter instances matching 'filters'
+        verbose (bool): Enable logging
+        tile_size (int or None): If set, run chains of local filters tile by tile
+        threads (int): Threads processing tiles concurrently; more than one
+            enables tiled execution even without 'tile_size'
+        cache_bytes (int or None): If set, walk each chain of local filters
+            depth-first over strips sized to fit this cache budget
+        result_cache (ResultCache or None): On-disk cache of intermediate and
+            final results; execution resumes from the longest cached prefix
+        processes (int): Worker processes computing tiles; frames are shared
+            with them through shared memory instead of being pickled, and stay
+            there from one filter chain to the next
+        precision (str): 'uint8', 'float32' or 'float64' (see PRECISIONS)
+        buffers (BufferPool or None): Pool the filters draw working and output
+            arrays from; intermediate results are handed back to it as soon as
+            the next filter is done with them. 'image_np' itself is never reused.
+        input_range (tuple or None): Bounds on the values of 'image_np'
+        quantise (bool): Quantise a float precision result to uint8; False returns
+            the float result, for callers that keep working on it
+
+    Returns:
+        np.ndarray: Filtered image
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {list(PRECISIONS)}, got {precision}")
+
+    if instances is None:
+        instances = build_filters(filters)
+    final_range = propagate_value_ranges(instances, precision, input_range)
+
+    # The caller's array; everything derived from it may go back to the buffer pool
+    source = image_np
+
+    work_dtype = PRECISIONS[precision]
+    clip = work_dtype is None
+    if work_dtype is not None:
+        image_np = image_np.astype(work_dtype)
+
+    if result_cache is not None:
+        keys = prefix_keys(image_key(image_np), filters)
+        done, cached = result_cache.longest_prefix(keys)
+        if cached is not None:
+            log(f"Resuming from cached result of the first {done} filter(s)", verbose)
+            image_np = cached
+            filters, instances, keys = filters[done:], instances[done:], keys[done:]
+
+    if tile_size is None and threads <= 1 and processes <= 1 and cache_bytes is None:
+        segments = [(idx, idx + 1, False) for idx in range(len(instances))]
+    else:
+        segments = plan_segments(instances)
+
+    pool = ProcessPoolExecutor(max_workers=processes) if processes > 1 else None
+    frames = SharedFrames() if pool is not None else None
+    workers = max(threads, processes)
+
+    with use_pool(buffers):
+        try:
+            for start, stop, tiled in segments:
+                names = ', '.join(describe_operation(cls, params) for cls, params in filters[start:stop])
+                if tiled:
+                    log(f"Applying filters {start + 1}-{stop} in tiles on {workers} worker(s): {names}", verbose)
+                else:
+                    log(f"Applying filter {start + 1}: {names}", verbose)
+
+                t0 = time.time()
+                previous = image_np
+                if tiled:
+                    chain = instances[start:stop]
+                    size = tile_size
+                    if cache_bytes is not None:
+                        size = cache_tile_size(image_np.shape, chain, cache_bytes)
+                        log(f"Depth-first strips of {size[0]} rows", verbose)
+                    elif size is None:
+                        size = auto_tile_size(*image_np.shape[:2], workers)
+                    image_np = apply_tiled(image_np, chain, size, threads=threads, pool=pool, clip=clip,
+                                           frames=frames)
+                else:
+                    image_np = instances[start].apply_filter(image_np, clip=clip)
+                log(f"filter took {time.time() - t0:.3f} seconds!", verbose)
+
+                # Ping-pong: the consumed input becomes the next filter's output buffer
+                if previous is not source:
+                    release(previous, image_np)
+                    if frames is not None and not np.may_share_memory(previous, image_np):
+                        frames.release(previous)
+
+                if result_cache is not None:
+                    result_cache.put(keys[stop - 1], image_np)
+
+            if work_dtype is not None and quantise:
+                log(f"Quantising {precision} result to uint8", verbose)
+                image_np = quantise_image(image_np, final_range, in_place=image_np is not source)
+            elif frames is not None and frames.owns(image_np):
+                # The result outlives the run's shared memory
+                image_np = image_np.copy()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            if frames is not None:
+                frames.close()
+
+    if buffers is not None:
+        log(f"Buffer pool: {buffers.hits} reused, {buffers.misses} allocated, "
+            f"{buffers.retained_bytes / 1024 ** 2:.1f} MiB idle", verbose)
+
+    return image_np
+
+def run_from_config(config_path: str, verbose=False, tile_size=None, threads=1, cache_bytes=None,
+                    result_cache=None, processes=1, precision='uint8', buffers=None, optimize=True,
+                    unclamped=False, fusion_report=False):
     """
     Execute the full image filter pipeline from a config file.
     Opens, transforms, saves and/or displays an image.
@@ -172,29 +393,62 @@ def run_from_config(config_path: str, verbose=False):
     Parameters:
         config_path (str): Path to config file
         verbose (bool): Enable logging
+        tile_size (int or None): Tile size for tiled execution (None = whole frame)
+        threads (int): Threads processing tiles of each filter chain concurrently
+        cache_bytes (int or None): Cache budget for depth-first strip execution
+        result_cache (ResultCache or None): On-disk cache of intermediate and
+            final results; the run resumes from the longest cached prefix
+        processes (int): Worker processes computing tiles of each filter chain
+        precision (str): Intermediate precision policy: 'uint8', 'float32' or 'float64'
+        buffers (BufferPool or None): Pool of reusable working / output arrays
+        optimize (bool): Rewrite the plan into a cheaper equivalent first (see 'edit_image.planner')
+        unclamped (bool): Let the optimiser compose linear kernels, dropping intermediate clipping
+        fusion_report (bool): With 'unclamped', also run the exact plan and report how far
+            the composed result deviates from it
     """
 
+    if NODES in read_config(config_path):
+        # Imported here: the graph executor builds on this module
+        from edit_image.graph import run_graph_from_config
+        if fusion_report:
+            log("--fusion-report only applies to linear configs", verbose=True)
+        run_graph_from_config(config_path, verbose=verbose, tile_size=tile_size, threads=threads,
+                              cache_bytes=cache_bytes, result_cache=result_cache, processes=processes,
+                              precision=precision, buffers=buffers, optimize=optimize, unclamped=unclamped)
+        return
+
     config, filters = load_and_validate_config(config_path, verbose)
 
-    log(f"Loading image: {config[INPUT]}", verbose)
-    image = Image.open(config[INPUT]).convert("RGB")
-    image_np = np.array(image)
+    with Image.open(config[INPUT]) as image:
+        input_size = image.size
+    target_size = resolve_output_size(config, input_size)
+    if target_size is not None:
+        filters = add_resize(filters, input_size, target_size, early=optimize, verbose=verbose)
 
-    for idx, (cls, params) in enumerate(filters):
-        log(f"Applying filter {idx + 1}: {cls.__name__} with params: {params}", verbose)
-        filt = cls(**params)
+    plan = filters
+    if optimize:
+        plan = optimize_plan(filters, verbose, precision, unclamped)
+
+    log(f"Loading image: {config[INPUT]}", verbose)
+    source = load_image(config[INPUT])
 
-        t0 = time.time()
-        image_np = filt.apply_filter(image_np)
-        log(f"filter took {time.time() - t0:.3f} seconds!", verbose)
+    options = dict(tile_size=tile_size, threads=threads, cache_bytes=cache_bytes, processes=processes,
+                   precision=precision, buffers=buffers)
+    image_np = apply_filters(source, plan, verbose=verbose, result_cache=result_cache, **options)
 
-    pil_image = Image.fromarray(image_np.astype(np.uint8))
+    if unclamped and fusion_report:
+        exact_plan = optimize_plan(filters, precision=precision) if optimize else filters
+        exact = apply_filters(source, exact_plan, **options)
+        deviation = np.abs(image_np.astype(np.int16) - exact.astype(np.int16))
+        log(f"Unclamped fusion deviation: max {deviation.max()}, mean {deviation.mean():.4f}, "
+            f"{np.count_nonzero(deviation) / deviation.size:.2%} of values differ", verbose=True)
+        with use_pool(buffers):
+            release(exact, source, image_np)
 
     if OUTPUT in config:
         output_path = resolve_output_path(config[OUTPUT])
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
         log(f"Saving output to: {output_path}", verbose)
-        pil_image.save(output_path)
+        save_image(image_np, output_path)
 
     if DISPLAY in config:
-        pil_image.show()
+        Image.fromarray(image_np.astype(np.uint8)).show()
@@ -0,0 +1,363 @@
+"""
+planner.py
+----------
+Rewrites a validated plan into a cheaper one that produces the same image.
+
+A plan is the list of (filter class, params) tuples returned by 'validate_operations()'.
+Every pass takes a plan and the precision policy (see 'apply_filters()') and returns
+a new plan; 'optimize_plan()' runs them all, in order, before the filters are built.
+
+Passes:
+    - simplify: identity operations (Brightness 0, Contrast 1, Saturation 1, Sharpen 0)
+      are dropped and adjacent operations of one type merged where that is exact,
+      e.g. Brightness 20 -> Brightness 30 becomes Brightness 50
+    - fuse_color_matrices (float precision): runs of affine color filters
+      (Saturation, Brightness, Contrast) become one 'ColorMatrix' matmul
+    - fuse_lookup_tables (uint8 precision): runs of per-channel pointwise filters
+      (Brightness, Contrast) become one 'LookupTable', applied in a single pass
+    - defer_upsampling: pointwise filters following a Retro run on its block grid
+      and the result is upsampled once ('DeferredUpsample'), block_size ** 2 times
+      fewer pixels
+
+Once the plan is built, 'propagate_value_ranges()' bounds the values every filter
+receives, starting from the [0, 255] of the decoded image. Filters use the bounds to
+skip clips that provably change nothing (a normalised Box, Retro, Sobel's orientation,
+the final quantise of a float pipeline that stayed in range).
+
+Opt-in passes change the image and only run when asked to:
+    - compose_kernels (unclamped): runs of linear convolutions (Box, Sharpen, plain
+      StaticFilters) become one 'ComposedKernel' where the larger kernel costs less
+      than the separate passes, dropping the clipping in between
+
+Size changes are planned separately, once the input size is known: 'add_resize()'
+moves the resizing to a smaller output before the filters, with their spatial
+parameters scaled down.
+"""
+
+import math
+
+from edit_image.common import log
+from filters.base import BaseFilter
+from filters.catalog import Retro, Resize
+from filters.fused import LookupTable, ColorMatrix, ComposedKernel, DeferredUpsample
+from filters.fused.composed_kernel import compose_filters
+from filters.base.static_filter import strategy_costs, auto_strategy
+
+
+def supports_lookup_table(cls) -> bool:
+    """
+    Whether a filter class provides 'lookup_table()'.
+    """
+    return cls.lookup_table is not BaseFilter.lookup_table
+
+
+def supports_color_matrix(cls) -> bool:
+    """
+    Whether a filter class provides 'color_matrix()'.
+    """
+    return cls.color_matrix is not BaseFilter.color_matrix
+
+
+def _fuse_runs(filters, supported, fused_cls, min_length=1):
+    """
+    Replace every run of at least 'min_length' supported filters with one 'fused_cls'.
+    """
+    plan, run = [], []
+
+    def flush():
+        if len(run) >= min_length:
+            plan.append((fused_cls, {'operations': list(run)}))
+        else:
+            plan.extend(run)
+        run.clear()
+
+    for cls, params in filters:
+        if supported(cls):
+            run.append((cls, params))
+        else:
+            flush()
+            plan.append((cls, params))
+    flush()
+
+    return plan
+
+
+def simplify(filters, precision='uint8'):
+    """
+    Drop filters that do not change the image and merge adjacent filters of the
+    same type into one where 'merged_params()' allows it.
+
+    Parameters:
+        filters (list): (filter class, params) tuples
+        precision (str): Precision policy of the run
+
+    Returns:
+        list: Rewritten (filter class, params) tuples
+    """
+    clip = precision == 'uint8'
+    plan = []  # (filter class, params, instance)
+
+    for cls, params in filters:
+        filt = cls(**params)
+        if plan and type(plan[-1][2]) is cls:
+            merged = plan[-1][2].merged_params(filt, clip)
+            if merged is not None:
+                plan.pop()
+                params, filt = merged, cls(**merged)
+
+        if not filt.is_identity():
+            plan.append((cls, params, filt))
+
+    return [(cls, params) for cls, params, _ in plan]
+
+
+def fuse_color_matrices(filters, precision='uint8'):
+    """
+    Replace every run of two or more filters supporting 'color_matrix()' with one
+    ColorMatrix. Only for float precision, where nothing is clipped in between.
+
+    Parameters:
+        filters (list): (filter class, params) tuples
+        precision (str): Precision policy of the run
+
+    Returns:
+        list: Rewritten (filter class, params) tuples
+    """
+    if precision == 'uint8':
+        return filters
+
+    # A lone filter is already a single pass
+    return _fuse_runs(filters, supports_color_matrix, ColorMatrix, min_length=2)
+
+
+def fuse_lookup_tables(filters, precision='uint8'):
+    """
+    Replace every run of filters supporting 'lookup_table()' with one LookupTable.
+    Only for uint8 precision, where tables reproduce the per-step clipping exactly.
+
+    Parameters:
+        filters (list): (filter class, params) tuples
+        precision (str): Precision policy of the run
+
+    Returns:
+        list: Rewritten (filter class, params) tuples
+    """
+    if precision != 'uint8':
+        return filters
+
+    return _fuse_runs(filters, supports_lookup_table, LookupTable)
+
+
+# Fixed cost of one convolution pass (padding, allocation, clipping), in kernel taps
+# of a 1D pass over the whole image
+PASS_COST = 10
+
+
+def convolution_cost(stages, precision='uint8') -> float:
+    """
+    Estimated cost of applying linear stages one after the other, in 1D kernel taps
+    per input pixel, each kernel applied with the strategy StaticFilter picks for it
+    (see 'filters.base.static_filter.auto_strategy()'): with uint8 precision filters
+    see integer images in [0, 255], with float precision float images.
+    """
+    magnitude = 255 if precision == 'uint8' else None
+    cost, area = 0.0, 1
+    for stage in stages:
+        area *= stage.stride[0] * stage.stride[1]
+        costs = strategy_costs(stage.kernel, stage.stride)
+        cost += (costs[auto_strategy(stage.kernel, stage.stride, magnitude=magnitude)] + PASS_COST) / area
+
+    return cost
+
+
+def defer_upsampling(filters, precision='uint8'):
+    """
+    Move the upsampling of every Retro past the pointwise filters that follow it,
+    so they run on the block grid. Runs after the fusion passes, so fused lookup
+    tables and color matrices are deferred as a whole.
+
+    Parameters:
+        filters (list): (filter class, params) tuples
+        precision (str): Precision policy of the run
+
+    Returns:
+        list: Rewritten (filter class, params) tuples
+    """
+    plan = []
+    for cls, params in filters:
+        previous = plan[-1][0] if plan else None
+        if cls.pointwise and previous is Retro:
+            plan[-1] = (DeferredUpsample, {'operations': [plan[-1], (cls, params)]})
+        elif cls.pointwise and previous is DeferredUpsample:
+            plan[-1][1]['operations'].append((cls, params))
+        else:
+            plan.append((cls, params))
+
+    return plan
+
+
+def compose_kernels(filters, precision='uint8'):
+    """
+    Replace runs of linear convolution filters with one ComposedKernel wherever the
+    composed kernel is cheaper than the passes it replaces. Intermediate results are
+    not clipped (nor truncated), so the image can change; see
+    'filters.fused.composed_kernel'.
+
+    Parameters:
+        filters (list): (filter class, params) tuples
+        precision (str): Precision policy of the run
+
+    Returns:
+        list: Rewritten (filter class, params) tuples
+    """
+    plan, run, instances = [], [], []
+    stages = []  # Stages of the run as it would be applied
+
+    def flush():
+        if len(run) >= 2:
+            plan.append((ComposedKernel, {'operations': list(run)}))
+        else:
+            plan.extend(run)
+        run.clear()
+        instances.clear()
+
+    for cls, params in filters:
+        filt = cls(**params)
+        filt_stages = filt.linear_stages()
+        if filt_stages is None:
+            flush()
+            plan.append((cls, params))
+            continue
+
+        composed = compose_filters(instances + [filt]) if run else None
+        if composed is not None and (convolution_cost([composed[0]], precision)
+                                     < convolution_cost(stages + filt_stages, precision)):
+            stages = [composed[0]]
+        else:
+            flush()
+            stages = filt_stages
+        run.append((cls, params))
+        instances.append(filt)
+    flush()
+
+    return plan
+
+
+# Run in this order by 'optimize_plan()'
+PASSES = [simplify, fuse_color_matrices, fuse_lookup_tables, defer_upsampling]
+
+
+def propagate_value_ranges(instances, precision='uint8', input_range=(0, 255)):
+    """
+    Interval analysis over built filters: record on each filter bounds on the values
+    it will be applied to (see 'BaseFilter.set_input_range()').
+
+    Parameters:
+        instances (list): Filter instances, in plan order
+        precision (str): Precision policy of the run; 'uint8' clips after every filter
+        input_range (tuple or None): Bounds on the values of the image the plan is
+            applied to; a decoded image is within [0, 255]
+
+    Returns:
+        tuple or None: Bounds on the values of the final result (before the final
+        quantise of float pipelines), or None if unknown
+    """
+    value_range = input_range
+    for filt in instances:
+        filt.set_input_range(value_range)
+        if precision == 'uint8':
+            # Clipped (or cast from within (-1, 256)) and truncated
+            value_range = (0, 255)
+        elif value_range is not None:
+            value_range = filt.value_range(*value_range)
+
+    return value_range
+
+
+def add_resize(filters, input_size, target_size, early=True, verbose=False):
+    """
+    Append the resizing of the result to 'target_size' to a plan.
+
+    When shrinking, the resizing moves before the longest tail of filters that can
+    be rescaled (see 'BaseFilter.rescaled_params()'). Those filters then run on the
+    smaller image with their spatial parameters (Box size, Sharpen's blur, Retro's
+    block size) scaled to match, which approximates the look of filtering at full
+    resolution at a fraction of the cost.
+
+    Parameters:
+        filters (list): (filter class, params) tuples
+        input_size (tuple): (width, height) of the input image
+        target_size (tuple): (width, height) of the output image
+        early (bool): Resize early; if False, only append the final resizing
+        verbose (bool): Enable logging
+
+    Returns:
+        list: (filter class, params) tuples
+    """
+    resize = (Resize, {'width': target_size[0], 'height': target_size[1]})
+    scale = math.sqrt(target_size[0] / input_size[0] * target_size[1] / input_size[1])
+    if not early or scale >= 1:
+        return list(filters) + [resize]
+
+    rescaled = []
+    for cls, params in reversed(filters):
+        params = cls(**params).rescaled_params(params, scale)
+        if params is None:
+            break
+        rescaled.append((cls, params))
+    rescaled.reverse()
+
+    prefix = list(filters[:len(filters) - len(rescaled)])
+    if not rescaled:
+        return prefix + [resize]
+
+    log(f"Resizing to {target_size[0]}x{target_size[1]} before {len(rescaled)} operation(s), "
+        f"spatial parameters scaled by {scale:.3f}", verbose)
+    plan = prefix + [resize] + rescaled
+
+    # Filters that keep the image size (local or pointwise) need no final resizing
+    if any(cls(**params).halo() is None and not cls.pointwise for cls, params in rescaled):
+        plan.append(resize)
+
+    return plan
+
+
+def describe_operation(cls, params) -> str:
+    """
+    Readable one-line form of a plan entry, fused filters included.
+    """
+    if 'operations' in params and cls.__module__.startswith('filters.fused'):
+        inner = ', '.join(describe_operation(*operation) for operation in params['operations'])
+        return f"{cls.__name__}[{inner}]"
+
+    args = ', '.join(f"{key}={value}" for key, value in params.items())
+    return f"{cls.__name__}({args})"
+
+
+def optimize_plan(filters, verbose=False, precision='uint8', unclamped=False):
+    """
+    Run every optimisation pass over a plan.
+
+    Parameters:
+        filters (list): (filter class, params) tuples
+        verbose (bool): Log the rewritten plan
+        precision (str): Precision policy the plan will run with
+        unclamped (bool): Also compose linear kernels, which drops intermediate clipping
+
+    Returns:
+        list: Cheaper (filter class, params) tuples, equivalent unless 'unclamped'
+    """
+    passes = list(PASSES)
+    if unclamped:
+        # Compose the simplified plan, before runs are claimed by the exact fusions
+        passes.insert(1, compose_kernels)
+
+    plan = list(filters)
+    for optimization in passes:
+        plan = optimization(plan, precision)
+
+    if plan != list(filters):
+        steps = ' -> '.join(describe_operation(cls, params) for cls, params in plan)
+        log(f"Optimised plan: {steps or 'no operations'}", verbose)
+
+    return plan
@@ -0,0 +1,247 @@
+"""
+server.py
+---------
+Long-running daemon that keeps filters warm and accepts jobs over a Unix socket.
+
+Each job is an 'operations' list plus the encoded input image (see 'edit_image.client'
+for the wire format). The daemon validates operations once per filter type / param
+set and remembers the result, then hands decoding, filtering and encoding to a pool
+of worker processes that were started, and imported NumPy / Pillow / the filter
+catalog, ahead of time. The encoded output is sent back to the client.
+
+Usage:
+    edit-image serve [--socket PATH] [--workers N] [--verbose]
+
+While it runs, 'edit-image --config X' forwards jobs to it automatically.
+"""
+
+import io
+import os
+import signal
+import socketserver
+import stat
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+import numpy as np
+
+import filters.catalog  # noqa: F401 (imported once here, inherited by the workers)
+from edit_image.common import OPERATIONS, TYPE, OUTPUT_SIZE, MAX_DIMENSION, log
+from edit_image.client import send_message, recv_message, daemon_available, socket_owned
+from edit_image.pipeline import validate_filter_config, build_filters, apply_filters, resolve_output_size
+from edit_image.cache import ResultCache, operation_key
+from edit_image.planner import optimize_plan, add_resize
+from filters.base.buffers import BufferPool, DEFAULT_MAX_BYTES
+
+# Filter instances kept per worker, keyed by the canonical operation list
+MAX_WARM_PIPELINES = 32
+
+# Options a job may set. Workers are already separate processes, so 'processes'
+# is not among them: each warm worker would otherwise start a pool of its own.
+JOB_OPTIONS = ('tile_size', 'threads', 'cache_bytes', 'result_cache', 'precision', 'buffer_bytes',
+               'optimize', 'unclamped', OUTPUT_SIZE, MAX_DIMENSION)
+
+_worker_pipelines = {}
+_worker_buffers = None
+
+
+def _init_worker():
+    """
+    Leave Ctrl+C handling to the server process, which shuts the pool down.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _warm_up(_=None):
+    """
+    Startup job for each worker: registers Pillow's codec plugins before the first real job.
+    """
+    Image.init()
+    return os.getpid()
+
+
+def _run_job(filter_list, image_bytes: bytes, extension: str, options: dict) -> bytes:
+    """
+    Decode, filter and encode one image inside a worker process.
+    """
+    global _worker_buffers
+    key = tuple(operation_key(cls, params) for cls, params in filter_list)
+    instances = _worker_pipelines.get(key)
+    if instances is None:
+        if len(_worker_pipelines) >= MAX_WARM_PIPELINES:
+            _worker_pipelines.pop(next(iter(_worker_pipelines)))
+        instances = _worker_pipelines[key] = build_filters(filter_list)
+
+    options = dict(options)
+    if options.get('result_cache'):
+        options['result_cache'] = ResultCache(*options['result_cache'])
+
+    # One pool per worker, kept across jobs; recreated if the client asks for another cap
+    buffer_bytes = options.pop('buffer_bytes', None)
+    if buffer_bytes is None:
+        buffer_bytes = DEFAULT_MAX_BYTES
+    if buffer_bytes == 0:
+        _worker_buffers = None
+    elif _worker_buffers is None or _worker_buffers.max_bytes != buffer_bytes:
+        _worker_buffers = BufferPool(buffer_bytes)
+
+    decoded = np.array(Image.open(io.BytesIO(image_bytes)).convert("RGB"))
+    image_np = apply_filters(decoded, filter_list, instances, buffers=_worker_buffers, **options)
+
+    output = io.BytesIO()
+    image_format = Image.registered_extensions().get(extension.lower(), 'PNG')
+    Image.fromarray(image_np.astype(np.uint8)).save(output, format=image_format)
+
+    if _worker_buffers is not None:
+        if not np.may_share_memory(decoded, image_np):
+            _worker_buffers.give(decoded)
+        _worker_buffers.give(image_np)
+
+    return output.getvalue()
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    """
+    Serves one job per connection.
+    """
+
+    def handle(self):
+        t0 = time.time()
+        try:
+            header, payload = recv_message(self.rfile)
+        except ConnectionError:
+            # 'daemon_available()' probes connect and close without sending a job
+            return
+
+        try:
+            options = dict(header.get('options', {}))
+            unknown = sorted(set(options) - set(JOB_OPTIONS))
+            if unknown:
+                raise ValueError(f"Unsupported option(s): {', '.join(map(str, unknown))}")
+            filter_list = self.server.validate(header[OPERATIONS])
+            unclamped = options.pop('unclamped', False)
+            optimize = options.pop('optimize', True)
+
+            size_fields = {key: options.pop(key) for key in (OUTPUT_SIZE, MAX_DIMENSION) if key in options}
+            if size_fields:
+                input_size = Image.open(io.BytesIO(payload)).size
+                target_size = resolve_output_size(size_fields, input_size)
+                if target_size is not None:
+                    filter_list = add_resize(filter_list, input_size, target_size, early=optimize)
+
+            if optimize:
+                filter_list = optimize_plan(filter_list, precision=options.get('precision', 'uint8'),
+                                            unclamped=unclamped)
+            future = self.server.pool.submit(
+                _run_job, filter_list, payload, header.get('extension', '.png'), options
+            )
+            output = future.result()
+        except Exception as e:
+            log(f"Job failed: {type(e).__name__}: {e}", self.server.verbose)
+            send_message(self.wfile, {'ok': False, 'error': f"{type(e).__name__}: {e}"})
+            return
+
+        send_message(self.wfile, {'ok': True}, output)
+        log(f"Job done in {time.time() - t0:.3f} seconds", self.server.verbose)
+
+
+class FilterServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server dispatching jobs to a pool of warm worker processes.
+
+    Parameters:
+        socket_path (str): Socket file to listen on
+        workers (int or None): Worker processes (default: CPU count)
+        verbose (bool): Enable logging
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, workers=None, verbose=False):
+        if daemon_available(socket_path):
+            raise RuntimeError(f"A daemon is already listening on '{socket_path}'")
+        if os.path.lexists(socket_path):
+            # Left over by a daemon that did not shut down cleanly; anything else stays
+            if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+                raise RuntimeError(f"'{socket_path}' exists and is not a socket")
+            if not socket_owned(socket_path):
+                raise RuntimeError(f"Socket '{socket_path}' belongs to another user")
+            os.remove(socket_path)
+
+        super().__init__(socket_path, JobHandler)
+        self.socket_path = socket_path
+        self.verbose = verbose
+
+        # Start every worker now rather than on the first jobs
+        workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        pids = set(self.pool.map(_warm_up, range(workers)))
+        log(f"Started {len(pids)} warm worker(s)", verbose)
+
+        # (type, param names) -> filter class
+        self._validated = {}
+        self._lock = threading.Lock()
+
+    def server_bind(self):
+        # Created with owner-only permissions, even inside a shared directory
+        umask = os.umask(0o077)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def validate(self, operations):
+        """
+        Validate an operations list, reusing earlier validation results.
+
+        Returns:
+            list: (filter class, params) tuples
+        """
+        if not isinstance(operations, list):
+            raise TypeError(f"'{OPERATIONS} must be a list")
+
+        filter_list = []
+        for operation in operations:
+            if not isinstance(operation, dict) or TYPE not in operation:
+                raise ValueError(f"Each operation must be a dict with a '{TYPE}' field")
+
+            op_type = operation[TYPE]
+            op_params = {k: v for k, v in operation.items() if k != TYPE}
+            key = (op_type, frozenset(op_params))
+
+            with self._lock:
+                cls = self._validated.get(key)
+                if cls is None:
+                    cls = self._validated[key] = validate_filter_config(op_type, op_params, self.verbose)
+
+            filter_list.append((cls, op_params))
+
+        return filter_list
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown()
+        if socket_owned(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def serve(socket_path: str, workers=None, verbose=False):
+    """
+    Run the daemon until interrupted.
+
+    Parameters:
+        socket_path (str): Socket file to listen on
+        workers (int or None): Worker processes (default: CPU count)
+        verbose (bool): Enable logging
+    """
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    with FilterServer(socket_path, workers, verbose) as server:
+        # Shut down cleanly (and remove the socket file) when killed, too
+        signal.signal(signal.SIGTERM, stop)
+        log(f"Listening on {socket_path} (Ctrl+C to stop)", verbose=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            log("Shutting down", verbose=True)
@@ -0,0 +1,139 @@
+"""
+stages.py
+---------
+Overlapped decode / filter / encode for runs over many images.
+
+Three stages run concurrently:
+    - a decoder thread prefetches and decodes the next images,
+    - the calling thread filters the current image,
+    - a pool of encoder threads saves finished images.
+
+Bounded queues sit between the stages, so a slow stage holds the others back instead
+of letting decoded or filtered frames pile up in memory. Pillow releases the GIL in
+its zlib / codec code, so decoding and encoding overlap with filtering and the
+filtering stage never waits on codec I/O.
+
+With a buffer pool, decoded inputs go back to the pool once filtered and outputs
+once encoded, so successive images reuse the same arrays.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from edit_image.pipeline import load_image, save_image, apply_filters
+
+DEFAULT_PREFETCH = 2
+DEFAULT_ENCODERS = 2
+
+# Marks the end of the decoded stream
+_DONE = object()
+
+
+def _decode_all(jobs, decoded: queue.Queue, stop: threading.Event):
+    """
+    Decoder thread: decode inputs in order; failures are passed on as exceptions.
+    """
+    for src, dst in jobs:
+        if stop.is_set():
+            break
+
+        t0 = time.time()
+        try:
+            image_np = load_image(src)
+        except Exception as e:
+            image_np = e
+        decoded.put((src, dst, t0, image_np))
+
+    decoded.put(_DONE)
+
+
+def _encode(src, dst, t0, image_np, buffers=None):
+    """
+    Encoder task: save one image, then hand its array back to 'buffers'.
+
+    Returns:
+        tuple: (input path, output path, seconds taken, error message or None)
+    """
+    try:
+        save_image(image_np, dst)
+    except Exception as e:
+        return src, dst, time.time() - t0, f"{type(e).__name__}: {e}"
+    finally:
+        if buffers is not None:
+            buffers.give(image_np)
+
+    return src, dst, time.time() - t0, None
+
+
+def run_staged(jobs, filters, instances=None, prefetch=DEFAULT_PREFETCH, encoders=DEFAULT_ENCODERS,
+               buffers=None, **options):
+    """
+    Process (input path, output path) jobs with overlapped decode, filter and encode.
+
+    Parameters:
+        jobs (list): (input path, output path) tuples
+        filters (list): (filter class, params) tuples
+        instances (list or None): Prebuilt filter instances matching 'filters'
+        prefetch (int): Decoded images allowed to wait for the filter stage
+        encoders (int): Encoder threads; as many filtered images may wait for them
+        buffers (BufferPool or None): Pool shared by the filter and encoder stages
+        **options: Passed to 'apply_filters()' (tile_size, result_cache, ...)
+
+    Yields:
+        tuple: (input path, output path, seconds taken, error message or None),
+        in completion order
+    """
+    decoded = queue.Queue(maxsize=max(1, prefetch))
+    stop = threading.Event()
+    decoder = threading.Thread(target=_decode_all, args=(jobs, decoded, stop), daemon=True)
+    decoder.start()
+
+    # Bounds the filtered images waiting for, or being processed by, an encoder
+    slots = threading.BoundedSemaphore(2 * max(1, encoders))
+    pending = deque()
+
+    def release(_):
+        slots.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, encoders)) as pool:
+            while True:
+                item = decoded.get()
+                if item is _DONE:
+                    break
+
+                src, dst, t0, image_np = item
+                try:
+                    if isinstance(image_np, Exception):
+                        raise image_np
+                    decoded_np = image_np
+                    image_np = apply_filters(image_np, filters, instances, buffers=buffers, **options)
+                except Exception as e:
+                    yield src, dst, time.time() - t0, f"{type(e).__name__}: {e}"
+                    continue
+
+                if buffers is not None and not np.may_share_memory(decoded_np, image_np):
+                    buffers.give(decoded_np)
+
+                slots.acquire()
+                future = pool.submit(_encode, src, dst, t0, image_np, buffers)
+                future.add_done_callback(release)
+                pending.append(future)
+
+                while pending and pending[0].done():
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+    finally:
+        # Unblock the decoder if the consumer stopped early
+        stop.set()
+        while decoder.is_alive():
+            try:
+                decoded.get_nowait()
+            except queue.Empty:
+                decoder.join(0.05)
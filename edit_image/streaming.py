@@ -0,0 +1,240 @@
+"""
+streaming.py
+------------
+Out-of-core execution: read, filter and write an image strip by strip.
+
+The input is opened as a memory map and read in horizontal strips. Each strip is
+read with the rows of context the filter chain needs above and below it, pushed
+through every filter (see 'edit_image.tiling'), and written to the output before
+the next strip starts. Memory use is bounded by strip height x width instead of
+image area.
+
+Truly incremental I/O is supported for raw formats that can be memory-mapped:
+    - NumPy '.npy' arrays of shape (H, W), (H, W, 3) or (H, W, 4), dtype uint8
+    - Binary PPM / PGM ('.ppm', '.pgm', '.pnm') with maxval 255
+Other formats are decoded / encoded by Pillow, which needs the whole frame in
+memory for the codec; the filters still only allocate strip-sized temporaries.
+
+Every filter of the pipeline must be local (see 'BaseFilter.halo()'); filters that
+need the whole frame, such as Contrast, cannot be streamed.
+"""
+
+import os
+import time
+import numpy as np
+from PIL import Image
+
+from edit_image.pipeline import (
+    INPUT, OUTPUT, DISPLAY, OUTPUT_SIZE, MAX_DIMENSION, log, load_and_validate_config, build_filters, resolve_output_path
+)
+from edit_image.tiling import tile_grid, chain_halo, apply_chain_to_tile
+from edit_image.planner import optimize_plan, propagate_value_ranges
+from filters.base.buffers import BufferPool, use_pool
+
+DEFAULT_STRIP_ROWS = 256
+
+NPY_EXTENSIONS = {'.npy'}
+PNM_EXTENSIONS = {'.ppm', '.pgm', '.pnm'}
+
+
+def _read_pnm_header(path: str):
+    """
+    Parse a binary PPM / PGM header.
+
+    Returns:
+        tuple: (magic, width, height, data offset in bytes)
+    """
+    with open(path, 'rb') as f:
+        data = f.read(1024)
+
+    tokens, pos = [], 0
+    while len(tokens) < 4:
+        while pos < len(data) and data[pos:pos + 1].isspace():
+            pos += 1
+        if data[pos:pos + 1] == b'#':
+            while pos < len(data) and data[pos:pos + 1] not in (b'\n', b'\r'):
+                pos += 1
+            continue
+        start = pos
+        while pos < len(data) and not data[pos:pos + 1].isspace():
+            pos += 1
+        if start == pos:
+            raise ValueError(f"Truncated PNM header in '{path}'")
+        tokens.append(data[start:pos])
+
+    magic, width, height, maxval = tokens[0], int(tokens[1]), int(tokens[2]), int(tokens[3])
+
+    if magic not in (b'P5', b'P6'):
+        raise ValueError(f"Only binary PGM (P5) / PPM (P6) can be streamed, got {magic!r}")
+    if maxval != 255:
+        raise ValueError(f"Only 8-bit PNM files can be streamed, got maxval {maxval}")
+
+    # Exactly one whitespace byte separates the header from the pixel data
+    return magic, width, height, pos + 1
+
+
+class StripReader:
+    """
+    Read-only RGB uint8 view of an image, decoded lazily strip by strip.
+
+    Supports 'shape' and 2D slicing ('reader[y0:y1, x0:x1]'), so it can be used
+    as the source of 'apply_chain_to_tile()'.
+    """
+
+    def __init__(self, path: str):
+        ext = os.path.splitext(path)[1].lower()
+
+        if ext in NPY_EXTENSIONS:
+            self.data = np.load(path, mmap_mode='r')
+        elif ext in PNM_EXTENSIONS:
+            magic, width, height, offset = _read_pnm_header(path)
+            channels = 3 if magic == b'P6' else 1
+            self.data = np.memmap(path, dtype=np.uint8, mode='r', offset=offset,
+                                  shape=(height, width, channels))
+        else:
+            # Pillow has no incremental decoder for most formats
+            self.data = np.array(Image.open(path).convert("RGB"))
+
+        if self.data.dtype != np.uint8 or self.data.ndim not in (2, 3):
+            raise ValueError(f"Expected a uint8 (H, W) or (H, W, C) image, got {self.data.dtype} {self.data.shape}")
+
+        self.shape = self.data.shape[:2] + (3,)
+
+    def __getitem__(self, key) -> np.ndarray:
+        strip = np.asarray(self.data[key])
+
+        if strip.ndim == 2:
+            strip = strip[:, :, np.newaxis]
+        if strip.shape[2] == 1:
+            return np.repeat(strip, 3, axis=2)
+
+        return strip[:, :, :3]
+
+
+class StripWriter:
+    """
+    Writes an RGB uint8 image strip by strip, top to bottom.
+
+    Rows go to a hidden '.partial' file next to 'path', which 'close()' renames
+    into place; 'abort()' deletes it, so a failed run leaves no truncated output.
+    """
+
+    def __init__(self, path: str, height: int, width: int):
+        self.path = path
+        self.ext = os.path.splitext(path)[1].lower()
+        self.row = 0
+
+        directory, name = os.path.split(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Keeps the extension, which selects the format
+        self.partial_path = os.path.join(directory, f".{os.path.splitext(name)[0]}.partial{self.ext}")
+
+        if self.ext in NPY_EXTENSIONS:
+            self.data = np.lib.format.open_memmap(self.partial_path, mode='w+', dtype=np.uint8,
+                                                  shape=(height, width, 3))
+        elif self.ext in PNM_EXTENSIONS:
+            self.file = open(self.partial_path, 'wb')
+            self.file.write(f"P6\n{width} {height}\n255\n".encode('ascii'))
+        else:
+            # Pillow needs the whole frame to encode
+            self.data = np.empty((height, width, 3), dtype=np.uint8)
+
+    def write(self, strip: np.ndarray):
+        """
+        Append the next strip of rows.
+        """
+        strip = strip.astype(np.uint8, copy=False)
+
+        if self.ext in PNM_EXTENSIONS:
+            self.file.write(np.ascontiguousarray(strip).tobytes())
+        else:
+            self.data[self.row: self.row + strip.shape[0]] = strip
+
+        self.row += strip.shape[0]
+
+    def close(self):
+        """
+        Flush the output to disk and move it to 'path'.
+        """
+        try:
+            if self.ext in NPY_EXTENSIONS:
+                self.data.flush()
+                del self.data
+            elif self.ext in PNM_EXTENSIONS:
+                self.file.close()
+            else:
+                Image.fromarray(self.data).save(self.partial_path)
+        except BaseException:
+            self.abort()
+            raise
+
+        os.replace(self.partial_path, self.path)
+
+    def abort(self):
+        """
+        Discard everything written so far.
+        """
+        if self.ext in NPY_EXTENSIONS:
+            self.data = None
+        elif self.ext in PNM_EXTENSIONS:
+            self.file.close()
+
+        if os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
+
+
+def stream_from_config(config_path: str, verbose=False, strip_rows=DEFAULT_STRIP_ROWS, optimize=True):
+    """
+    Execute a pipeline config strip by strip, without holding the frame in memory.
+
+    Parameters:
+        config_path (str): Path to config file
+        verbose (bool): Enable logging
+        strip_rows (int): Output rows computed per strip
+        optimize (bool): Rewrite the plan into a cheaper equivalent first
+
+    Raises:
+        ValueError if a filter needs the whole frame or the config has no output
+    """
+
+    config, filters = load_and_validate_config(config_path, verbose)
+
+    if OUTPUT not in config:
+        raise ValueError(f"Streaming mode requires an '{OUTPUT}' path")
+    if OUTPUT_SIZE in config or MAX_DIMENSION in config:
+        raise ValueError(f"Streaming mode does not resize: drop '{OUTPUT_SIZE}' / '{MAX_DIMENSION}'")
+    if DISPLAY in config:
+        log("Streaming mode does not display the result", verbose)
+
+    if optimize:
+        filters = optimize_plan(filters, verbose)
+
+    instances = build_filters(filters)
+    propagate_value_ranges(instances)
+    for (cls, params), filt in zip(filters, instances):
+        if filt.halo() is None:
+            raise ValueError(f"Filter '{cls.__name__}' needs the whole frame and cannot be streamed")
+
+    reader = StripReader(config[INPUT])
+    height, width = reader.shape[:2]
+    halo = chain_halo(instances)
+
+    output_path = resolve_output_path(config[OUTPUT])
+    writer = StripWriter(output_path, height, width)
+
+    log(f"Streaming {config[INPUT]} ({width}x{height}) in {strip_rows}-row strips, "
+        f"{halo[0]} rows of context", verbose)
+
+    t0 = time.time()
+    try:
+        # Strips share their shape, so each one reuses the previous strip's buffers
+        with use_pool(BufferPool()):
+            for box in tile_grid(height, width, (strip_rows, width)):
+                writer.write(apply_chain_to_tile(reader, instances, box, halo))
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+    log(f"Saved output to: {output_path} ({time.time() - t0:.3f} seconds)", verbose)
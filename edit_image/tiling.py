@@ -0,0 +1,246 @@
+"""
+tiling.py
+---------
+Tiled execution of filter chains.
+
+Consecutive filters that only need a bounded neighbourhood (see 'BaseFilter.halo()')
+are grouped into chains. Each chain runs tile by tile: a tile is cut out of the
+frame together with the halo accumulated over the whole chain, pushed through every
+filter of the chain, and its core is stitched into the output frame. Filters that
+need the whole frame (e.g. Contrast, which uses the image mean) run between chains
+as usual.
+
+Only tile-sized temporaries are allocated while a chain runs, and the result is
+bit-identical to whole-frame execution. Tiles are independent, so they can also be
+processed on a thread pool: NumPy releases the GIL inside the heavy array operations,
+and every thread reads its tile straight out of the shared input frame. Tiles can
+also go to worker processes, which read and write frames kept in shared memory
+(see 'edit_image.transport').
+"""
+
+import math
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from edit_image.transport import SharedFrame, SharedFrames
+from filters.base.buffers import empty, release
+
+DEFAULT_TILE_SIZE = 1024
+
+# Per-core cache budget for depth-first strips (a typical L2)
+DEFAULT_CACHE_BYTES = 1024 * 1024
+
+# Rough bytes touched per pixel channel while one filter runs on a strip: the
+# int32 copy, the padded copy, the float64 result and its clipped copy.
+WORKING_BYTES_PER_VALUE = 32
+
+
+def plan_segments(filters):
+    """
+    Split a filter list into tileable chains and whole-frame filters.
+
+    Parameters:
+        filters (list): Filter instances
+
+    Returns:
+        list: (start, stop, tiled) index ranges covering 'filters' in order
+    """
+    segments = []
+    start = 0
+
+    for idx, filt in enumerate(filters):
+        if filt.halo() is None:
+            if start < idx:
+                segments.append((start, idx, True))
+            segments.append((idx, idx + 1, False))
+            start = idx + 1
+
+    if start < len(filters):
+        segments.append((start, len(filters), True))
+
+    return segments
+
+
+def chain_halo(filters):
+    """
+    Total (halo_y, halo_x) of a chain of tileable filters.
+    """
+    halos = [filt.halo() for filt in filters]
+    return sum(h[0] for h in halos), sum(h[1] for h in halos)
+
+
+def tile_grid(height: int, width: int, tile_size):
+    """
+    Yield (y0, y1, x0, x1) boxes covering a frame.
+
+    Parameters:
+        height, width (int): Frame size
+        tile_size (int or tuple): Tile (height, width); an int means square tiles
+    """
+    tile_h, tile_w = (tile_size, tile_size) if isinstance(tile_size, int) else tile_size
+
+    for y0 in range(0, height, tile_h):
+        for x0 in range(0, width, tile_w):
+            yield y0, min(y0 + tile_h, height), x0, min(x0 + tile_w, width)
+
+
+def apply_chain_to_tile(source, filters, box, halo=None, clip=True) -> np.ndarray:
+    """
+    Run a chain of tileable filters over one tile of a frame.
+
+    Parameters:
+        source (array-like): Full input frame of shape (H, W) or (H, W, C). Only
+            the tile and its halo are read, so this may be a memory-mapped array.
+        filters (list): Tileable filter instances
+        box (tuple): (y0, y1, x0, x1) region of the output to compute
+        halo (tuple or None): Precomputed 'chain_halo(filters)'
+        clip (bool): Clip after every filter (see 'BaseFilter.apply_filter()')
+
+    Returns:
+        np.ndarray: Output pixels for 'box'
+    """
+    height, width = source.shape[:2]
+    y0, y1, x0, x1 = box
+    halo_y, halo_x = halo if halo is not None else chain_halo(filters)
+
+    # Region of the frame currently held in 'tile'
+    cy0, cy1 = max(0, y0 - halo_y), min(height, y1 + halo_y)
+    cx0, cx1 = max(0, x0 - halo_x), min(width, x1 + halo_x)
+    tile = np.asarray(source[cy0:cy1, cx0:cx1])
+
+    for filt in filters:
+        edges = (cy0 == 0, cy1 == height, cx0 == 0, cx1 == width)
+        previous, tile = tile, filt.apply_filter(tile, edges, clip)
+        release(previous, tile)
+
+        fy, fx = filt.halo()
+        cy0, cy1 = cy0 if edges[0] else cy0 + fy, cy1 if edges[1] else cy1 - fy
+        cx0, cx1 = cx0 if edges[2] else cx0 + fx, cx1 if edges[3] else cx1 - fx
+
+    return tile[y0 - cy0: y1 - cy0, x0 - cx0: x1 - cx0]
+
+
+def auto_tile_size(height: int, width: int, threads: int):
+    """
+    Pick full-width strips giving each thread a couple of tiles to balance load.
+    """
+    rows = max(1, math.ceil(height / (2 * threads)))
+    return rows, width
+
+
+def cache_tile_size(image_shape, filters, cache_bytes=DEFAULT_CACHE_BYTES):
+    """
+    Pick full-width strips whose working set fits in 'cache_bytes'.
+
+    A strip then goes through every filter of the chain while its intermediates
+    are still cached, instead of each filter streaming the whole frame through
+    memory. Strips are kept at least as tall as twice the chain halo, so the
+    rows recomputed in the overlap stay a minor part of the work.
+
+    Parameters:
+        image_shape (tuple): (H, W) or (H, W, C) of the frame
+        filters (list): Tileable filter instances
+        cache_bytes (int): Cache budget per strip
+
+    Returns:
+        tuple: (strip rows, width)
+    """
+    height, width = image_shape[:2]
+    channels = image_shape[2] if len(image_shape) > 2 else 1
+    halo_y, _ = chain_halo(filters)
+
+    row_bytes = width * channels * WORKING_BYTES_PER_VALUE
+    rows = cache_bytes // row_bytes - 2 * halo_y
+
+    return max(rows, 2 * halo_y, 1), width
+
+
+def _run_tile_in_process(filters, source, target, box, halo, clip):
+    """
+    Process pool task: compute one tile from a shared input frame into a shared output.
+
+    Parameters:
+        source, target (tuple): 'SharedFrame' descriptors of the input and output frames
+    """
+    with SharedFrame.attach(source) as src, SharedFrame.attach(target) as dst:
+        y0, y1, x0, x1 = box
+        dst.array[y0:y1, x0:x1] = apply_chain_to_tile(src.array, filters, box, halo, clip)
+
+
+def apply_tiled(image: np.ndarray, filters, tile_size=DEFAULT_TILE_SIZE, out=None, threads=1,
+                pool=None, clip=True, frames=None) -> np.ndarray:
+    """
+    Apply a chain of tileable filters to a frame, one tile at a time.
+
+    Parameters:
+        image (array-like): Input frame (H, W) or (H, W, C)
+        filters (list): Tileable filter instances (see 'plan_segments()')
+        tile_size (int, tuple or None): Tile size in output pixels. None picks
+            strips from the frame size and thread count.
+        out (array-like or None): Optional preallocated output frame
+        threads (int): Number of threads processing tiles concurrently
+        pool (ProcessPoolExecutor or None): If given, tiles run in its worker
+            processes. Input and output frames are exchanged through shared
+            memory, so only descriptors are pickled.
+        clip (bool): Clip after every filter (see 'BaseFilter.apply_filter()')
+        frames (SharedFrames or None): With 'pool', the run's shared frames. An
+            input that is one of them is read in place, and the output is one of
+            them (unless 'out' is given), so nothing is copied between chains.
+            Without it, both frames are copied through temporary shared memory.
+
+    Returns:
+        np.ndarray: Filtered frame
+    """
+    height, width = image.shape[:2]
+    halo = chain_halo(filters)
+
+    if tile_size is None:
+        tile_size = auto_tile_size(height, width, threads)
+
+    boxes = list(tile_grid(height, width, tile_size))
+
+    def run(box):
+        y0, y1, x0, x1 = box
+        out[y0:y1, x0:x1] = apply_chain_to_tile(image, filters, box, halo, clip)
+
+    # The first tile tells us the output dtype / channels
+    first = apply_chain_to_tile(image, filters, boxes[0], halo, clip)
+
+    if pool is not None and len(boxes) > 2:
+        with (SharedFrames() if frames is None else nullcontext(frames)) as shared:
+            copied = not shared.owns(image)
+            source = shared.share(np.asarray(image))
+            target = shared.create(image.shape[:2] + first.shape[2:], first.dtype)
+            futures = [
+                pool.submit(_run_tile_in_process, filters, source.descriptor, target.descriptor, box, halo, clip)
+                for box in boxes[1:]
+            ]
+            for future in futures:
+                future.result()
+            if copied:
+                shared.release(source.array)
+
+            y0, y1, x0, x1 = boxes[0]
+            target.array[y0:y1, x0:x1] = first
+
+            if out is None:
+                return target.array if frames is not None else target.array.copy()
+            out[...] = target.array
+            shared.release(target.array)
+            return out
+
+    if out is None:
+        out = empty(image.shape[:2] + first.shape[2:], first.dtype)
+    y0, y1, x0, x1 = boxes[0]
+    out[y0:y1, x0:x1] = first
+
+    if threads > 1 and len(boxes) > 2:
+        with ThreadPoolExecutor(max_workers=threads) as thread_pool:
+            # Consume the iterator so worker exceptions propagate
+            list(thread_pool.map(run, boxes[1:]))
+    else:
+        for box in boxes[1:]:
+            run(box)
+
+    return out
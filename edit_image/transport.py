@@ -0,0 +1,160 @@
+"""
+transport.py
+------------
+Shared-memory frame transport between processes.
+
+A 'SharedFrame' is a NumPy array whose buffer lives in 'multiprocessing.shared_memory'.
+Only its descriptor (segment name, shape, dtype) is pickled when it is sent to a
+worker process; the worker attaches to the same memory, reads its input straight
+from the parent's frame and writes its results into a preallocated shared output
+buffer. No pixel data goes through pickle.
+
+The process that creates a frame owns it and must 'unlink()' it when done; workers
+only 'close()' their mapping. 'SharedFrames' holds the frames of one run, so a frame
+is copied into shared memory once and then stays there from one filter chain to
+the next.
+"""
+
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class SharedFrame:
+    """
+    NumPy array backed by a shared memory segment.
+
+    Use 'create()', 'from_array()' or 'attach()' rather than the constructor.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape, dtype, owner: bool):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = owner
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, shape, dtype) -> 'SharedFrame':
+        """
+        Allocate an uninitialised shared frame.
+        """
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        return cls(shared_memory.SharedMemory(create=True, size=size), shape, dtype, owner=True)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray, dtype=None) -> 'SharedFrame':
+        """
+        Copy an array into a new shared frame, cast to 'dtype' if given.
+        """
+        frame = cls.create(array.shape, array.dtype if dtype is None else dtype)
+        np.copyto(frame.array, array, casting='unsafe')
+        return frame
+
+    @classmethod
+    def attach(cls, descriptor) -> 'SharedFrame':
+        """
+        Map a frame created by another process from its 'descriptor'.
+        """
+        name, shape, dtype = descriptor
+        return cls(shared_memory.SharedMemory(name=name), shape, dtype, owner=False)
+
+    @property
+    def descriptor(self) -> tuple:
+        """
+        Picklable (name, shape, dtype) handle to send to other processes.
+        """
+        return self.shm.name, self.shape, self.dtype.str
+
+    def close(self):
+        """
+        Release this process' mapping. Arrays viewing the frame become invalid.
+        """
+        self.array = None
+        self.shm.close()
+
+    def unlink(self):
+        """
+        Close and destroy the segment (owner only).
+        """
+        self.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.owner:
+            self.unlink()
+        else:
+            self.close()
+
+
+class SharedFrames:
+    """
+    Shared frames owned by one run, found again from the arrays they back.
+
+    Frames handed back with 'release()' are kept and reused for the next frame
+    of the same shape and dtype; 'close()' unlinks all of them.
+    """
+
+    def __init__(self):
+        self._frames = {}  # id(array) -> frame in use
+        self._idle = []
+
+    def create(self, shape, dtype) -> SharedFrame:
+        """
+        Uninitialised frame, reusing an idle one when possible.
+        """
+        shape, dtype = tuple(shape), np.dtype(dtype)
+        for idx, frame in enumerate(self._idle):
+            if frame.shape == shape and frame.dtype == dtype:
+                frame = self._idle.pop(idx)
+                break
+        else:
+            frame = SharedFrame.create(shape, dtype)
+
+        self._frames[id(frame.array)] = frame
+        return frame
+
+    def share(self, array: np.ndarray, dtype=None) -> SharedFrame:
+        """
+        Frame backing 'array', copying it into a new frame (cast to 'dtype' if
+        given) unless it already is one of this run's frames.
+        """
+        frame = self._frames.get(id(array))
+        if frame is not None and frame.array is array and (dtype is None or frame.dtype == dtype):
+            return frame
+
+        frame = self.create(array.shape, array.dtype if dtype is None else dtype)
+        np.copyto(frame.array, array, casting='unsafe')
+        return frame
+
+    def owns(self, array) -> bool:
+        """
+        True if 'array' is the array of one of this run's frames in use.
+        """
+        frame = self._frames.get(id(array))
+        return frame is not None and frame.array is array
+
+    def release(self, array):
+        """
+        Hand the frame backing 'array' back for reuse. No-op for other arrays.
+        """
+        if self.owns(array):
+            self._idle.append(self._frames.pop(id(array)))
+
+    def close(self):
+        """
+        Unlink every frame. Arrays viewing them become invalid.
+        """
+        for frame in list(self._frames.values()) + self._idle:
+            frame.unlink()
+        self._frames.clear()
+        self._idle.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,142 @@
+"""
+watch.py
+--------
+Watch mode: re-run a config whenever it or its input image changes.
+
+The decoded input and the result after every operation are kept in memory. When the
+config changes, only the operations from the first one whose type or params changed
+are re-executed; the unchanged prefix is reused as is. Changing the input image
+invalidates everything.
+
+Usage:
+    edit-image watch --config configs/glow.json [--interval 0.5] [--verbose]
+"""
+
+import os
+import time
+from PIL import Image
+
+from edit_image.pipeline import (
+    INPUT, OUTPUT, DISPLAY, log, load_and_validate_config, build_filters, load_image, save_image,
+    resolve_output_size
+)
+from edit_image.cache import operation_key
+from edit_image.planner import propagate_value_ranges, add_resize
+
+DEFAULT_INTERVAL = 0.5
+
+
+class Session:
+    """
+    Decoded input and per-operation results of the last run.
+    """
+
+    def __init__(self):
+        self.input_path = None
+        self.input_mtime = None
+        self.image = None
+        self.keys = []
+        self.results = []
+
+    def first_changed(self, keys) -> int:
+        """
+        Index of the first operation whose result cannot be reused.
+        """
+        for idx, (old, new) in enumerate(zip(self.keys, keys)):
+            if old != new:
+                return idx
+
+        return min(len(self.keys), len(keys))
+
+    def run(self, input_path: str, filters, verbose=False):
+        """
+        Bring the results up to date with 'filters' and return the final image.
+
+        Parameters:
+            input_path (str): Input image path
+            filters (list): (filter class, params) tuples
+            verbose (bool): Enable logging
+        """
+        input_mtime = os.path.getmtime(input_path)
+        if (input_path, input_mtime) != (self.input_path, self.input_mtime):
+            log(f"Loading image: {input_path}", verbose)
+            self.image = load_image(input_path)
+            self.input_path, self.input_mtime = input_path, input_mtime
+            self.keys, self.results = [], []
+
+        keys = [operation_key(cls, params) for cls, params in filters]
+        start = self.first_changed(keys)
+        log(f"Reusing {start} of {len(filters)} operation(s)", verbose)
+
+        self.keys, self.results = keys[:start], self.results[:start]
+        image_np = self.results[-1] if self.results else self.image
+
+        instances = build_filters(filters[start:])
+        propagate_value_ranges(instances)
+        for idx, ((cls, params), filt) in enumerate(zip(filters[start:], instances), start):
+            log(f"Applying filter {idx + 1}: {cls.__name__} with params: {params}", verbose)
+
+            t0 = time.time()
+            image_np = filt.apply_filter(image_np)
+            log(f"filter took {time.time() - t0:.3f} seconds!", verbose)
+
+            self.keys.append(keys[idx])
+            self.results.append(image_np)
+
+        return image_np
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except (OSError, TypeError):
+        return None
+
+
+def watch_config(config_path: str, interval=DEFAULT_INTERVAL, verbose=False):
+    """
+    Run a config, then re-run it incrementally every time it or its input changes.
+
+    The output file is overwritten on every run. Invalid configs are reported and
+    the previous results are kept until the config is fixed. Stops on Ctrl+C.
+
+    Parameters:
+        config_path (str): Path to config file
+        interval (float): Seconds between checks for changes
+        verbose (bool): Enable logging
+    """
+    session = Session()
+    seen = None
+    input_path = None
+
+    log(f"Watching {config_path} (Ctrl+C to stop)", verbose=True)
+
+    try:
+        while True:
+            stamp = (_mtime(config_path), _mtime(input_path))
+            if stamp != seen:
+                seen = stamp
+                t0 = time.time()
+
+                try:
+                    config, filters = load_and_validate_config(config_path, verbose)
+                    input_path = config[INPUT]
+                    seen = (seen[0], _mtime(input_path))
+                    with Image.open(input_path) as image:
+                        input_size = image.size
+                    target_size = resolve_output_size(config, input_size)
+                    if target_size is not None:
+                        filters = add_resize(filters, input_size, target_size, verbose=verbose)
+                    image_np = session.run(input_path, filters, verbose)
+                except Exception as e:
+                    log(f"Run failed: {type(e).__name__}: {e}", verbose=True)
+                else:
+                    if OUTPUT in config:
+                        save_image(image_np, config[OUTPUT])
+                    if DISPLAY in config:
+                        Image.fromarray(image_np).show()
+                    log(f"Updated in {time.time() - t0:.3f} seconds", verbose=True)
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        log("Stopped watching", verbose=True)
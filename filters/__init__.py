@@ -6,5 +6,6 @@ Filter framework and standard implementations.
 
 from .base import *
 from .catalog import *
+from .fused import *
 
-__all__ = base.__all__ + catalog.__all__
+__all__ = base.__all__ + catalog.__all__ + fused.__all__
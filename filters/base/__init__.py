@@ -6,7 +6,8 @@ Core filter abstractions and infrastructure.
 
 from .base_filter import BaseFilter
 from .conv_filter import ConvFilter
-from .static_filter import StaticFilter
+from .static_filter import StaticFilter, LinearStage
 from .dynamic_filter import DynamicFilter
+from .buffers import BufferPool, use_pool
 
-__all__ = ["BaseFilter", "ConvFilter", "StaticFilter", "DynamicFilter"]
+__all__ = ["BaseFilter", "ConvFilter", "StaticFilter", "LinearStage", "DynamicFilter", "BufferPool", "use_pool"]
@@ -9,6 +9,28 @@ Author: lwwws
 
 from abc import ABC, abstractmethod
 import numpy as np
+from .buffers import empty, release
+
+
+def clip_is_noop(value_range, integral=False) -> bool:
+    """
+    Whether clipping values known to lie within 'value_range' to [0, 255] changes nothing.
+
+    Parameters:
+        value_range (tuple or None): (low, high) bounds, None if unknown
+        integral (bool): The values are truncated to integers right after the clip;
+            anything in (-1, 256) then lands in [0, 255] with or without it
+
+    Returns:
+        bool
+    """
+    if value_range is None:
+        return False
+
+    low, high = value_range
+    if integral:
+        return low > -1 and high < 256
+    return low >= 0 and high <= 255
 
 class BaseFilter(ABC):
     """
@@ -17,12 +39,35 @@ class BaseFilter(ABC):
     Subclasses must implement the 'apply()' method.
     This class handles general image shape handling and type restoration.
     """
-    def apply_filter(self, image: np.ndarray) -> np.ndarray:
+    # Whether 'lookup_table()' / 'color_matrix()' need statistics of the image
+    # (its value histogram / channel means)
+    needs_histogram = False
+
+    # Whether each output pixel depends only on the input pixel at the same position
+    # (and on the value histogram, for 'needs_histogram' filters). Such filters commute
+    # with nearest-neighbour upsampling (see 'filters.fused.DeferredUpsample').
+    pointwise = False
+
+    # Bounds on the values 'apply_filter()' is given, when known from the value-range
+    # analysis of the plan (see 'set_input_range()')
+    input_range = None
+
+    def apply_filter(self, image: np.ndarray, edges=None, clip=True) -> np.ndarray:
         """
         Apply the filter to an image, handling shape and clipping.
 
+        Integer images are processed as int32 and clipped back to [0, 255].
+        Floating point images are processed in their own precision, so a
+        pipeline can keep float intermediates and quantise once at the end.
+        Working copies and outputs come from the active buffer pool, if any
+        (see 'filters.base.buffers').
+
         Parameters:
             image (np.ndarray): Input image (H, W) or (H, W, C).
+            edges (tuple or None): If given, 'image' is a tile and this is
+                (top, bottom, left, right) flags telling which of its sides lie
+                on the frame border. See 'apply_tile()'.
+            clip (bool): Clip the result to [0, 255].
 
         Returns:
             np.ndarray: Filtered image with same dtype and shape as input.
@@ -32,10 +77,197 @@ class BaseFilter(ABC):
         elif image.ndim != 3:
             raise ValueError(f"Expected 2D or 3D image, got shape {image.shape}")
 
-        result = self.apply(image.astype(np.int32))
-        result = np.clip(result, 0, 255)
+        if image.dtype.kind == 'f':
+            work = image
+        else:
+            work = empty(image.shape, np.int32)
+            np.copyto(work, image)
+
+        if edges is None:
+            result = self.apply(work)
+        else:
+            result = self.apply_tile(work, edges)
+
+        if work is not image:
+            release(work, result)
+
+        # Truncated to the integer input dtype below, unless squeezed
+        integral = image.dtype.kind in 'iu' and result.shape[-1] != 1
+        if clip and not clip_is_noop(self.output_range(), integral):
+            if np.may_share_memory(result, image):
+                result = np.clip(result, 0, 255)
+            else:
+                np.clip(result, 0, 255, out=result)
+
+        if result.shape[-1] == 1:
+            return result.squeeze(-1)
+        if result.dtype == image.dtype and not np.may_share_memory(result, image):
+            return result
+
+        out = empty(result.shape, image.dtype)
+        np.copyto(out, result, casting='unsafe')
+        release(result, image)
+        return out
+
+    def rescaled_params(self, params: dict, scale: float):
+        """
+        Params giving the same look on the image scaled by 'scale', used to filter a
+        downscaled image instead of downscaling the filtered one. Pointwise filters
+        do not depend on the scale; filters with a spatial extent shrink it.
+
+        Parameters:
+            params (dict): Constructor params of this filter
+            scale (float): Image scale factor (< 1 when downscaling)
+
+        Returns:
+            dict or None: Constructor params, or None if the filter cannot be rescaled
+        """
+        return dict(params) if self.pointwise else None
+
+    def value_range(self, low, high):
+        """
+        Bounds on the values 'apply()' returns for inputs within [low, high], used
+        to skip clips that cannot change anything.
+
+        Bounds may be loose but must hold for every input in the range, rounding
+        included.
+
+        Parameters:
+            low, high (float): Bounds on the input values
+
+        Returns:
+            tuple or None: (low, high) bounds on the output, or None if unknown
+        """
+        return None
+
+    def set_input_range(self, value_range):
+        """
+        Record bounds on the values this filter will be applied to. Filters built
+        around inner filters forward them where the inner result reaches the
+        final cast of 'apply_filter()' unchanged.
+
+        Parameters:
+            value_range (tuple or None): (low, high) bounds, None if unknown
+        """
+        self.input_range = value_range
+
+    def output_range(self):
+        """
+        'value_range()' for the recorded input range, or None.
+        """
+        if self.input_range is None:
+            return None
+
+        return self.value_range(*self.input_range)
+
+    def halo(self):
+        """
+        Context needed around each output pixel, used by tiled execution.
+
+        Returns:
+            tuple or None: (halo_y, halo_x) rows / columns of input needed on each
+            side of an output pixel, or None if the filter needs the whole frame
+            (global statistics, resampling, size changes) and cannot be tiled.
+        """
+        return None
+
+    def lookup_table(self, channels: int, histogram=None):
+        """
+        Per-channel 256-entry table equivalent to 'apply_filter()' on a uint8 image
+        with 'channels' channels.
+
+        Only filters mapping every value of a channel independently of its position
+        (and of the other channels) can provide one. Runs of such filters are fused
+        into a single table lookup (see 'filters.fused.LookupTable').
+
+        Parameters:
+            channels (int): Number of image channels (> 1)
+            histogram (np.ndarray or None): (C, 256) value counts of the image the
+                filter is applied to; given only if 'needs_histogram' is set
+
+        Returns:
+            np.ndarray or None: (256, C) uint8 table, or None if not supported
+        """
+        return None
+
+    def color_matrix(self, mean=None):
+        """
+        3x4 affine map [A | b] equivalent to 'apply()' on every RGB pixel x
+        (A @ x + b), for filters that are affine in the channels of a pixel.
+
+        Clipping is not part of the map, so it only stands for the filter on
+        unclipped float pipelines (see 'filters.fused.ColorMatrix').
+
+        Parameters:
+            mean (np.ndarray or None): (3,) channel means of the image the filter
+                is applied to; given only if 'needs_histogram' is set
 
-        return result.squeeze(-1) if result.shape[-1] == 1 else result.astype(image.dtype)
+        Returns:
+            np.ndarray or None: (3, 4) float64 matrix, or None if not supported
+        """
+        return None
+
+    def linear_stages(self):
+        """
+        The filter as a chain of linear convolutions, for filters that are one
+        apart from clipping (see 'filters.fused.ComposedKernel').
+
+        Returns:
+            list or None: 'LinearStage' tuples applied in order, or None if the
+            filter is not linear or its padding depends on the image size
+        """
+        return None
+
+    def is_identity(self) -> bool:
+        """
+        Whether 'apply_filter()' returns its input unchanged, so the filter can be
+        dropped from a plan.
+        """
+        return False
+
+    def merged_params(self, other, clip=True):
+        """
+        Params of a single filter of this class equivalent to this filter followed
+        by 'other', used to merge adjacent operations of a plan.
+
+        Parameters:
+            other (BaseFilter): Filter applied to the output of this one
+            clip (bool): Whether the result of this filter is clipped to [0, 255]
+                (and truncated back to uint8) before 'other' sees it
+
+        Returns:
+            dict or None: Constructor params, or None if the pair cannot be merged
+            without changing the result
+        """
+        return None
+
+    @staticmethod
+    def _value_ramp(channels: int) -> np.ndarray:
+        """
+        (256, 1, C) int32 image holding every uint8 value once per channel, for
+        building lookup tables with the same arithmetic as 'apply()'.
+        """
+        ramp = np.arange(256, dtype=np.int32)[:, np.newaxis, np.newaxis]
+        return np.repeat(ramp, channels, axis=2)
+
+    def apply_tile(self, image: np.ndarray, edges) -> np.ndarray:
+        """
+        Apply the filter to a tile cut out of a larger frame.
+
+        The tile carries 'halo()' extra rows / columns on every side that is not
+        on the frame border. Those are consumed: the output is smaller than the
+        tile by the halo on each interior side, and matches what whole-frame
+        'apply()' produces for that region.
+
+        Parameters:
+            image (np.ndarray): Tile with shape (H, W, C)
+            edges (tuple): (top, bottom, left, right) flags, True where the tile
+                touches the frame border
+
+        Returns:
+            np.ndarray: Transformed tile
+        """
+        return self.apply(image)
 
     @abstractmethod
     def apply(self, image: np.ndarray) -> np.ndarray:
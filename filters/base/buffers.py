@@ -0,0 +1,158 @@
+"""
+Buffers Module
+--------------
+Reusable output buffers for filters.
+
+Every filter step allocates full-size arrays: the int32 working copy, the padded
+image, the convolution output, the cast back to uint8. On large frames each fresh
+allocation pays page faults on first touch. A 'BufferPool' keeps arrays that are no
+longer needed and hands them out again for the next request with the same shape and
+dtype, so consecutive filters (and consecutive images of a batch) ping-pong between
+the same few buffers.
+
+Filters never see the pool directly. They allocate with 'empty()' and give arrays
+back with 'release()'; both fall back to plain NumPy behaviour unless a pool was
+activated for the current thread with 'use_pool()'.
+
+Author: lwwws
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+
+# Idle bytes a pool keeps by default
+DEFAULT_MAX_BYTES = 1 << 30
+
+_active = threading.local()
+
+
+class BufferPool:
+    """
+    Thread-safe pool of idle arrays keyed by (shape, dtype).
+
+    Parameters:
+        max_bytes (int or None): Cap on the bytes held by idle buffers; the least
+            recently released buffers are dropped first when it is exceeded.
+            None uses DEFAULT_MAX_BYTES.
+    """
+
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = DEFAULT_MAX_BYTES
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            raise ValueError(f"max_bytes must be a non-negative int, got {max_bytes}")
+
+        self.max_bytes = max_bytes
+        self.retained_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._free = {}  # (shape, dtype) -> idle arrays, most recently released last
+        self._order = OrderedDict()  # id(array) -> key, least recently released first
+        self._lock = threading.Lock()
+
+    def take(self, shape, dtype) -> np.ndarray:
+        """
+        Uninitialised array of the given shape and dtype, reused when possible.
+        """
+        shape, dtype = tuple(shape), np.dtype(dtype)
+
+        with self._lock:
+            idle = self._free.get((shape, dtype.str))
+            if idle:
+                array = idle.pop()
+                del self._order[id(array)]
+                self.retained_bytes -= array.nbytes
+                self.hits += 1
+                return array
+            self.misses += 1
+
+        return np.empty(shape, dtype)
+
+    def give(self, array: np.ndarray):
+        """
+        Hand an array back for reuse. The caller must not use it afterwards.
+
+        Views, read-only and non-contiguous arrays are ignored, as are arrays
+        larger than 'max_bytes'.
+        """
+        if (array is None or array.base is not None or not array.flags.c_contiguous
+                or not array.flags.writeable or array.nbytes > self.max_bytes):
+            return
+
+        key = (array.shape, array.dtype.str)
+
+        with self._lock:
+            if id(array) in self._order:
+                return
+            while self._order and self.retained_bytes + array.nbytes > self.max_bytes:
+                self._evict_oldest()
+            self._free.setdefault(key, []).append(array)
+            self._order[id(array)] = key
+            self.retained_bytes += array.nbytes
+
+    def _evict_oldest(self):
+        array_id, key = self._order.popitem(last=False)
+        idle = self._free[key]
+        idx = next(idx for idx, array in enumerate(idle) if id(array) == array_id)
+        self.retained_bytes -= idle.pop(idx).nbytes
+        if not idle:
+            del self._free[key]
+
+    def clear(self):
+        """
+        Drop every idle buffer.
+        """
+        with self._lock:
+            self._free.clear()
+            self._order.clear()
+            self.retained_bytes = 0
+
+
+@contextmanager
+def use_pool(pool):
+    """
+    Make 'pool' the one 'empty()' and 'release()' use on this thread.
+
+    Parameters:
+        pool (BufferPool or None): None disables pooling inside the block
+    """
+    previous = getattr(_active, 'pool', None)
+    _active.pool = pool
+    try:
+        yield pool
+    finally:
+        _active.pool = previous
+
+
+def active_pool():
+    """
+    Pool activated on this thread, or None.
+    """
+    return getattr(_active, 'pool', None)
+
+
+def empty(shape, dtype) -> np.ndarray:
+    """
+    Uninitialised array from the active pool (or a fresh one without a pool).
+    """
+    pool = active_pool()
+    if pool is None:
+        return np.empty(shape, dtype)
+
+    return pool.take(shape, dtype)
+
+
+def release(array: np.ndarray, *keep):
+    """
+    Give 'array' back to the active pool, unless it may share memory with any
+    of the 'keep' arrays (inputs or results still in use).
+    """
+    pool = active_pool()
+    if pool is None or array is None:
+        return
+    if any(other is not None and np.may_share_memory(array, other) for other in keep):
+        return
+
+    pool.give(array)
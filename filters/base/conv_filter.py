@@ -16,6 +16,7 @@ from abc import abstractmethod
 import numpy as np
 import warnings
 from .base_filter import BaseFilter
+from .buffers import empty, release
 
 class ConvFilter(BaseFilter):
     """
@@ -79,22 +80,57 @@ class ConvFilter(BaseFilter):
         """
         pass
 
-    def pad_image(self, image: np.ndarray) -> np.ndarray:
+    def resolve_padding(self, height: int, width: int) -> tuple:
+        """
+        Returns the (pad_y, pad_x) used for an image of the given size.
+
+        Automatic padding is computed per call instead of being stored on the
+        filter, so one instance can be reused across images of different sizes.
+
+        Parameters:
+            height, width (int): Input image size
+
+        Returns:
+            tuple: (pad_y, pad_x)
+        """
+        if self.pad_y is not None and self.pad_x is not None:
+            return self.pad_y, self.pad_x
+
+        if self.keep_dims_with_pad:
+            pad_y = ((self.stride_y - 1) * height + self.kernel_height - self.stride_y) // 2
+            pad_x = ((self.stride_x - 1) * width + self.kernel_width - self.stride_x) // 2
+            return pad_y, pad_x
+
+        return 0, 0
+
+    def pad_image(self, image: np.ndarray, pad_y: int, pad_x: int) -> np.ndarray:
         """
         Pads the input image using constant padding.
 
         Parameters:
             image (np.ndarray): Input image of shape (H, W, C)
+            pad_y, pad_x (int): Rows / columns added on each side
 
         Returns:
             np.ndarray: Padded image
         """
-        return np.pad(
-            image,
-            ((self.pad_y, self.pad_y), (self.pad_x, self.pad_x), (0, 0)),
-            mode='constant',
-            constant_values=self.pad_val
-        )
+        return self._pad_sides(image, pad_y, pad_y, pad_x, pad_x)
+
+    def _pad_sides(self, image: np.ndarray, top: int, bottom: int, left: int, right: int) -> np.ndarray:
+        """
+        Constant padding into a pooled buffer (same values as 'np.pad').
+        """
+        if not (top or bottom or left or right):
+            return image
+
+        h, w, c = image.shape
+        padded = empty((h + top + bottom, w + left + right, c), image.dtype)
+        padded[:top] = self.pad_val
+        padded[top + h:] = self.pad_val
+        padded[top:top + h, :left] = self.pad_val
+        padded[top:top + h, left + w:] = self.pad_val
+        padded[top:top + h, left:left + w] = image
+        return padded
 
     def apply(self, image: np.ndarray) -> np.ndarray:
         """
@@ -107,17 +143,59 @@ class ConvFilter(BaseFilter):
             np.ndarray: Convolved and clipped output image
         """
 
-        if self.pad_y is None and self.pad_x is None:
-            if self.keep_dims_with_pad:
-                H, W = image.shape[:2]
-                self.pad_y = ((self.stride_y - 1) * H + self.kernel_height - self.stride_y) // 2
-                self.pad_x = ((self.stride_x - 1) * W + self.kernel_width - self.stride_x) // 2
-            else:
-                self.pad_y, self.pad_x = 0, 0
+        pad_y, pad_x = self.resolve_padding(*image.shape[:2])
+        padded_image = self.pad_image(image, pad_y, pad_x)
+        final_image = self.convolve(padded_image)
+
+        if padded_image is not image:
+            release(padded_image, final_image)
+
+        return final_image
+
+    def padded_range(self, low, high):
+        """
+        Bounds on the values of the padded image, given bounds on the image itself.
+        """
+        if self.keep_dims_with_pad or self.pad_y or self.pad_x:
+            return min(low, self.pad_val), max(high, self.pad_val)
+
+        return low, high
+
+    def halo(self):
+        """
+        Convolutions are local as long as they keep the image size: stride 1 and
+        padding equal to the kernel radius.
+        """
+        if (self.stride_y, self.stride_x) != (1, 1):
+            return None
+        if self.resolve_padding(0, 0) != (self.radius_y, self.radius_x):
+            return None
+
+        return self.radius_y, self.radius_x
 
-        padded_image = self.pad_image(image)
+    def apply_tile(self, image: np.ndarray, edges) -> np.ndarray:
+        """
+        Pads only the tile sides lying on the frame border; interior sides already
+        carry real neighbouring pixels.
+
+        Parameters:
+            image (np.ndarray): Tile of shape (H, W, C)
+            edges (tuple): (top, bottom, left, right) frame border flags
+
+        Returns:
+            np.ndarray: Convolved tile
+        """
+        top, bottom, left, right = edges
+        padded_image = self._pad_sides(
+            image,
+            self.radius_y if top else 0, self.radius_y if bottom else 0,
+            self.radius_x if left else 0, self.radius_x if right else 0
+        )
         final_image = self.convolve(padded_image)
 
+        if padded_image is not image:
+            release(padded_image, final_image)
+
         return final_image
 
     @staticmethod
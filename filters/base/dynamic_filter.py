@@ -17,7 +17,9 @@ Author: lwwws
 
 from abc import abstractmethod
 import numpy as np
+from .base_filter import clip_is_noop
 from .conv_filter import ConvFilter
+from .buffers import empty
 class DynamicFilter(ConvFilter):
     """
     A convolutional filter base that computes output per region using dynamic logic.
@@ -25,6 +27,9 @@ class DynamicFilter(ConvFilter):
     This is useful for non-linear filters, adaptive kernels, or filters where the
     convolution result depends on local image properties.
     """
+    # Whether 'apply_region()' reads its y / x arguments. A tile only knows positions
+    # relative to itself, so such filters always run on the whole frame.
+    uses_position = True
 
     def __init__(self, **kwargs):
         """
@@ -50,6 +55,22 @@ class DynamicFilter(ConvFilter):
         """
         pass
 
+    def region_range(self, low, high):
+        """
+        Bounds on what 'apply_region()' returns for regions with values within
+        [low, high], or None if unknown. Lets 'convolve()' skip its clipping.
+        """
+        return None
+
+    def value_range(self, low, high):
+        return self.region_range(*self.padded_range(low, high))
+
+    def halo(self):
+        if self.uses_position:
+            return None
+
+        return super().halo()
+
     def compute_convolution(self, region: np.ndarray, kernel: np.ndarray) -> float:
         """
         Utility function to compute standard convolution on a region.
@@ -80,7 +101,12 @@ class DynamicFilter(ConvFilter):
         out_height = (image.shape[0] - self.kernel_height) // self.stride_y + 1
         out_width = (image.shape[1] - self.kernel_width) // self.stride_x + 1
 
-        out = np.zeros((out_height, out_width, n_channels))
+        # Every pixel is written below, so the buffer needs no initialisation
+        out = empty((out_height, out_width, n_channels), np.result_type(image.dtype, np.float32))
+
+        # The result goes to the integer cast of 'apply_filter()' for integer inputs
+        integral = image.dtype.kind in 'iu' and n_channels != 1
+        clip = not clip_is_noop(self.output_range(), integral)
 
         for y in range(out_height):
             for x in range(out_width):
@@ -94,6 +120,7 @@ class DynamicFilter(ConvFilter):
                          :
                          ]
 
-                out[y, x, :] = np.clip(self.apply_region(region, y, x), 0, 255)
+                value = self.apply_region(region, y, x)
+                out[y, x, :] = np.clip(value, 0, 255) if clip else value
 
         return out
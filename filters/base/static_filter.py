@@ -6,6 +6,28 @@ Implements a convolutional filter using fixed kernels.
 Supports applying one or more user-defined static kernels.
 Inherits padding, stride, and clipping logic from ConvFilter.
 
+Every kernel is applied with the cheapest of several strategies for its size (see
+'strategy_costs()'):
+    - direct: sliding windows and einsum, kh * kw multiply-adds per pixel
+    - matmul: windows copied, a block of rows at a time, into a contiguous matrix
+      (im2col) that BLAS multiplies by the flattened kernel; also kh * kw
+      multiply-adds, but several times faster than the einsum
+    - separable: rank-1 kernels (Box, Sobel's derivatives, ...), detected when the
+      filter is built, run as two 1D passes costing kh + kw
+    - fft: large kernels are correlated through real FFTs, in blocks of FFT_BLOCK
+      samples per axis, at a cost that barely depends on the kernel size
+    - summed_area: kernels that are constant per channel (Box) read each window sum
+      from a summed-area table (integral image) with four lookups, at a cost that
+      does not depend on the kernel size at all
+
+Only strategies that compute every output pixel the same way wherever it lies in the
+array are picked automatically (see 'auto_strategy()'), so tiles match the whole
+frame bit for bit: direct and separable always; matmul, fft and summed_area only on
+integer images, where their results are exact (BLAS and FFT rounding depends on the
+block a pixel falls in, and a summed-area table's on its origin). The choice does not
+depend on the array size either. 'StaticFilter(strategy=...)' forces one strategy
+instead.
+
 Author: lwwws
 
 ChatGPT Usage:
@@ -13,10 +35,279 @@ Used it for kernel validation, and for convolving optimizations (using sliding w
 """
 
 import numpy as np
+from collections import namedtuple
 from numpy.lib.stride_tricks import sliding_window_view
 from typing import Union
 
+from .base_filter import clip_is_noop
 from .conv_filter import ConvFilter
+from .buffers import empty, release
+
+# One linear convolution: correlate the (pad, pad_val)-padded input with 'kernel'
+# (kh, kw, 1 or C) at 'stride', then add 'bias'. See 'BaseFilter.linear_stages()'.
+LinearStage = namedtuple('LinearStage', ['kernel', 'stride', 'pad', 'pad_val', 'bias'])
+
+# Estimated costs per output pixel, in multiply-adds of a 1D pass over the image
+# (see 'strategy_costs()'), measured with NumPy's einsum, BLAS (OpenBLAS) and pocketfft
+DIRECT_COST = 80        # setting up the sliding-window einsum (mixed dtypes, strided views)
+DIRECT_TAP_COST = 2.5   # one tap of the sliding-window einsum
+BUFFER_COST = 10        # one intermediate full-size buffer (allocation, write, read back)
+FFT_COST = 0.8          # one sample of a forward + inverse real FFT, per log2 of the FFT size
+MATMUL_COST = 12        # copying windows into the im2col matrix, per output pixel
+MATMUL_TAP_COST = 0.75  # one tap of the im2col matrix-vector product
+SUMMED_AREA_COST = 14   # one input pixel of the summed-area table (copy and two running sums)
+LOOKUP_COST = 6         # the four table lookups and the scaling of one window sum
+
+# Ways to apply a kernel; 'auto' picks the cheapest per call
+STRATEGIES = ('auto', 'direct', 'separable', 'fft', 'matmul', 'summed_area')
+
+# FFT length per axis that larger images are cut into blocks of
+FFT_BLOCK = 512
+
+# Size of the im2col matrix the matmul strategy fills per block of output rows
+MATMUL_BLOCK_BYTES = 1 << 21
+
+# Integer images convolved by FFT are rounded back to exact results when the kernel
+# entries are multiples of 2 ** -bits for some bits up to this
+MAX_EXACT_BITS = 40
+
+
+def separable_factors(kernel: np.ndarray):
+    """
+    Exact rank-1 factorisation of a kernel, channel by channel.
+
+    Only factors whose outer product reproduces every kernel entry exactly are
+    accepted, so the two 1D passes compute the same sums as the 2D kernel up to
+    the rounding of the additions.
+
+    Parameters:
+        kernel (np.ndarray): Kernel of shape (kh, kw, C)
+
+    Returns:
+        tuple or None: (column, row) weights of shapes (kh, C) and (kw, C), or None
+        if the kernel is not separable
+    """
+    columns, rows = [], []
+    for c in range(kernel.shape[2]):
+        channel = kernel[:, :, c]
+        y, x = np.unravel_index(np.argmax(np.abs(channel)), channel.shape)
+        if channel[y, x] == 0:
+            column, row = channel[:, 0], np.ones_like(channel[0])
+        else:
+            column, row = channel[:, x], channel[y] / channel[y, x]
+
+        if not np.array_equal(np.outer(column, row), channel):
+            return None
+        columns.append(column)
+        rows.append(row)
+
+    return np.stack(columns, axis=1), np.stack(rows, axis=1)
+
+
+def is_uniform(kernel: np.ndarray) -> bool:
+    """
+    Whether every channel of a kernel of shape (kh, kw, C) holds a single value.
+    """
+    return bool(np.all(kernel == kernel[:1, :1]))
+
+
+def _unit_sign(weight: np.ndarray) -> int:
+    """
+    1 or -1 if every entry of a tap's weights is that value, else 0.
+    """
+    if np.all(weight == 1):
+        return 1
+    if np.all(weight == -1):
+        return -1
+    return 0
+
+
+def _fft_length(n: int) -> int:
+    """
+    Smallest 2^a * 3^b * 5^c at least 'n', a size the FFT handles efficiently.
+    """
+    best = 1 << (n - 1).bit_length()
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            length = power35
+            while length < n:
+                length *= 2
+            best = min(best, length)
+            power35 *= 3
+        power5 *= 5
+
+    return best
+
+
+def _fft_block_length(kernel_size: int, stride: int, image_size=None) -> int:
+    """
+    FFT length along one axis: the whole image if it fits in a block, else
+    FFT_BLOCK (and at least twice the kernel). Either way there is room for one
+    stride, so every block advances by at least one output.
+    """
+    block = max(FFT_BLOCK, 2 * kernel_size, kernel_size + stride - 1)
+    if image_size is not None and image_size <= block:
+        return _fft_length(max(image_size, kernel_size + stride - 1))
+
+    return _fft_length(block)
+
+
+def strategy_costs(kernel: np.ndarray, stride=(1, 1), image_size=None, separable=None, uniform=None) -> dict:
+    """
+    Estimated cost of each way to apply a kernel, per output pixel.
+
+    Parameters:
+        kernel (np.ndarray): Kernel of shape (kh, kw, C)
+        stride (tuple): (stride_y, stride_x)
+        image_size (tuple or None): (height, width) of the padded input; None
+            assumes an image larger than an FFT block
+        separable (bool or None): Whether the kernel is rank-1; None checks it
+        uniform (bool or None): Whether the kernel is constant per channel; None checks it
+
+    Returns:
+        dict: strategy name -> cost, in 1D multiply-adds
+    """
+    kh, kw = kernel.shape[:2]
+    sy, sx = stride
+    costs = {
+        'direct': DIRECT_COST + DIRECT_TAP_COST * kh * kw,
+        'matmul': MATMUL_COST + MATMUL_TAP_COST * kh * kw,
+    }
+
+    if separable is None:
+        separable = separable_factors(kernel) is not None
+    if separable:
+        # The vertical pass keeps every column
+        costs['separable'] = kh * sx + kw + BUFFER_COST
+
+    if uniform is None:
+        uniform = is_uniform(kernel)
+    if uniform:
+        # The table covers every input pixel
+        costs['summed_area'] = sy * sx * SUMMED_AREA_COST + LOOKUP_COST
+
+    # Every stride-1 output is computed, and blocks overlap by the kernel size
+    fh = _fft_block_length(kh, sy, image_size and image_size[0])
+    fw = _fft_block_length(kw, sx, image_size and image_size[1])
+    overlap = fh * fw / ((fh - kh + 1) * (fw - kw + 1))
+    costs['fft'] = sy * sx * (FFT_COST * np.log2(fh * fw) * overlap + BUFFER_COST)
+
+    return costs
+
+
+def _image_magnitude(image: np.ndarray):
+    """
+    Largest absolute value of an integer image, or None for float or empty images.
+    """
+    if image.dtype.kind not in 'iu' or image.size == 0:
+        return None
+
+    return max(abs(int(image.min())), abs(int(image.max())))
+
+
+def _exact_grid(kernel: np.ndarray, magnitude):
+    """
+    Grid the products and partial sums of correlating an integer image with
+    'kernel' lie on, when the kernel entries are multiples of 2 ** -bits for some
+    bits up to MAX_EXACT_BITS. None otherwise.
+
+    Parameters:
+        kernel (np.ndarray): Kernel of shape (kh, kw, C)
+        magnitude (int or None): Bound on the absolute values of the integer image;
+            None for float images, which never lie on a grid
+
+    Returns:
+        tuple or None: (step, bound); every partial sum is a multiple of 'step' no
+        larger than 'bound' in absolute value
+    """
+    if magnitude is None:
+        return None
+
+    kernel = kernel.astype(np.float64)
+    for bits in range(MAX_EXACT_BITS + 1):
+        scaled = np.ldexp(kernel, bits)
+        if np.array_equal(scaled, np.rint(scaled)):
+            break
+    else:
+        return None
+
+    return 2.0 ** -bits, float(np.abs(kernel).sum(axis=(0, 1)).max()) * magnitude
+
+
+def _exact_dtype(kernel: np.ndarray, magnitude):
+    """
+    Float32 or float64, whichever first holds every partial sum of correlating an
+    integer image bounded by 'magnitude' with 'kernel' exactly (see '_exact_grid()'),
+    or None.
+    """
+    grid = _exact_grid(kernel, magnitude)
+    if grid is None:
+        return None
+
+    step, bound = grid
+    for dtype in (np.float32, np.float64):
+        if bound / step < 2.0 ** (np.finfo(dtype).nmant + 1):
+            return dtype
+    return None
+
+
+def _exact_step(kernel: np.ndarray, magnitude, fft_size: int):
+    """
+    Spacing of the grid exact correlations of an integer image bounded by
+    'magnitude' with 'kernel' lie on, if the FFT path can round its results back
+    onto it: kernel entries that are multiples of a power of two, sums exact in
+    float64, and FFT rounding errors well below the spacing. None otherwise.
+    """
+    grid = _exact_grid(kernel, magnitude)
+    if grid is None:
+        return None
+
+    step, bound = grid
+    if bound / step >= 2.0 ** 53:
+        return None
+
+    error = 64 * np.finfo(np.float64).eps * np.log2(fft_size) * bound
+    return step if error < step / 4 else None
+
+
+def auto_strategy(kernel: np.ndarray, stride=(1, 1), separable=None, magnitude=None, fft_size=None) -> str:
+    """
+    Strategy 'auto' applies a kernel with: the cheapest one (see 'strategy_costs()',
+    for a large frame) whose result at a pixel does not depend on where the pixel
+    lies in the array. Direct and separable always qualify; matmul and fft only
+    when their results are exact, summed_area on any integer image.
+
+    Parameters:
+        kernel (np.ndarray): Kernel of shape (kh, kw, C)
+        stride (tuple): (stride_y, stride_x)
+        separable (bool or None): Whether the kernel is rank-1; None checks it
+        magnitude (int or None): Bound on the absolute values of an integer input;
+            None for float inputs
+        fft_size (int or None): Samples per FFT block; None assumes full blocks
+
+    Returns:
+        str: Strategy name
+    """
+    costs = strategy_costs(kernel, stride, separable=separable)
+    if fft_size is None:
+        fft_size = _fft_block_length(kernel.shape[0], stride[0]) * _fft_block_length(kernel.shape[1], stride[1])
+
+    for strategy in sorted(costs, key=costs.get):
+        if strategy in ('direct', 'separable'):
+            return strategy
+        if magnitude is None:
+            continue
+        if strategy == 'summed_area':
+            return strategy
+        if strategy == 'matmul' and _exact_dtype(kernel, magnitude) is not None:
+            return strategy
+        if strategy == 'fft' and _exact_step(kernel, magnitude, fft_size) is not None:
+            return strategy
+
+    return 'direct'
+
 class StaticFilter(ConvFilter):
     """
     Convolutional filter that uses fixed user-defined kernels.
@@ -25,12 +316,14 @@ class StaticFilter(ConvFilter):
     where C is either 1 (applied to all channels) or 3 (per-channel).
     """
 
-    def __init__(self, kernels: Union[np.ndarray, list[np.ndarray]], **kwargs):
+    def __init__(self, kernels: Union[np.ndarray, list[np.ndarray]], strategy='auto', **kwargs):
         """
         Initializes the static filter with one or more kernels.
 
         Parameters:
             kernels (np.ndarray or list[np.ndarray]): One or more 3D kernels of shape (H, W, C).
+            strategy (str): How kernels are applied, one of STRATEGIES; 'auto' picks
+                the cheapest for each kernel and image size.
             kwargs: Passed to ConvFilter (e.g. stride, pad_val, bias, ...).
         """
         if isinstance(kernels, np.ndarray):
@@ -38,6 +331,15 @@ class StaticFilter(ConvFilter):
 
         self._validate_kernels(kernels)
         self.kernels = kernels
+        self.factors = [separable_factors(kernel) for kernel in kernels]
+
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unsupported strategy '{strategy}', expected one of {STRATEGIES}")
+        if strategy == 'separable' and any(factors is None for factors in self.factors):
+            raise ValueError("The 'separable' strategy needs rank-1 kernels")
+        if strategy == 'summed_area' and not all(is_uniform(kernel) for kernel in kernels):
+            raise ValueError("The 'summed_area' strategy needs kernels that are constant per channel")
+        self.strategy = strategy
 
         kh, kw = self.kernels[0].shape[:2]
         expected_radius = (kh // 2, kw // 2)
@@ -50,17 +352,41 @@ class StaticFilter(ConvFilter):
 
         super().__init__(**kwargs)
 
-    def _apply_single_filter(self, image: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    def _apply_single_filter(self, image: np.ndarray, kernel: np.ndarray, clip=True, factors=None) -> np.ndarray:
         """
-        Applies a single kernel to the image using sliding windows and einsum.
+        Applies a single kernel to the image with the filter's strategy, by default
+        the cheapest one (see 'strategy_costs()'); otherwise using sliding windows
+        and einsum.
 
         Parameters:
             image (np.ndarray): Input image of shape (H, W, C)
             kernel (np.ndarray): Kernel of shape (kh, kw, 1) or (kh, kw, 3)
+            clip (bool): Clip the result to [0, 255]
+            factors (tuple or None): 'separable_factors()' of the kernel, if it has any
 
         Returns:
             np.ndarray: Filtered image
         """
+        strategy = self.strategy
+        if strategy == 'auto':
+            fh = _fft_block_length(self.kernel_height, self.stride_y, image.shape[0])
+            fw = _fft_block_length(self.kernel_width, self.stride_x, image.shape[1])
+            strategy = auto_strategy(kernel, (self.stride_y, self.stride_x), factors is not None,
+                                     _image_magnitude(image), fh * fw)
+        elif strategy == 'separable' and factors is None:
+            # Kernels passed in by subclasses, whose factors were not checked
+            factors = separable_factors(kernel)
+            if factors is None:
+                raise ValueError("The 'separable' strategy needs rank-1 kernels")
+
+        if strategy == 'separable':
+            return self._apply_separable(image, *factors, clip=clip)
+        if strategy == 'fft':
+            return self._apply_fft(image, kernel, clip=clip)
+        if strategy == 'matmul':
+            return self._apply_matmul(image, kernel, clip=clip)
+        if strategy == 'summed_area':
+            return self._apply_summed_area(image, kernel, clip=clip)
 
         windows = sliding_window_view(
             image,
@@ -70,11 +396,310 @@ class StaticFilter(ConvFilter):
 
         windows = windows[::self.stride_y, ::self.stride_x]
 
+        # Float images keep their precision instead of being promoted by the kernel
+        if image.dtype.kind == 'f':
+            kernel = kernel.astype(image.dtype, copy=False)
+
         if kernel.shape[-1] == 1:
             kernel = np.broadcast_to(kernel, (self.kernel_height, self.kernel_width, image.shape[-1]))
 
-        out = np.einsum('hwckl,klc->hwc', windows, kernel) + self.bias
-        return np.clip(out, 0, 255)
+        out = empty(windows.shape[:3], np.result_type(windows.dtype, kernel.dtype))
+        np.einsum('hwckl,klc->hwc', windows, kernel, out=out)
+        if self.bias:
+            out += self.bias
+        if clip:
+            np.clip(out, 0, 255, out=out)
+        return out
+
+    def _apply_separable(self, image: np.ndarray, column: np.ndarray, row: np.ndarray, clip=True) -> np.ndarray:
+        """
+        Applies a rank-1 kernel as 'column' down the rows, then 'row' along the columns.
+
+        Each pass is one multiply-add over the whole image per tap, so every output
+        pixel sums its taps in the same order wherever it lies, and tiles match the
+        whole frame exactly.
+        """
+        # Float images keep their precision instead of being promoted by the kernel
+        if image.dtype.kind == 'f':
+            column, row = column.astype(image.dtype, copy=False), row.astype(image.dtype, copy=False)
+        dtype = np.result_type(image.dtype, column.dtype, row.dtype)
+
+        height = (image.shape[0] - self.kernel_height) // self.stride_y + 1
+        width = (image.shape[1] - self.kernel_width) // self.stride_x + 1
+
+        vertical = self._apply_taps(image, column, 0, height, self.stride_y, dtype)
+        out = self._apply_taps(vertical, row, 1, width, self.stride_x, dtype)
+        release(vertical)
+
+        if self.bias:
+            out += self.bias
+        if clip:
+            np.clip(out, 0, 255, out=out)
+        return out
+
+    def _apply_fft(self, image: np.ndarray, kernel: np.ndarray, clip=True) -> np.ndarray:
+        """
+        Correlates with 'kernel' through real FFTs. Large images are cut into blocks
+        of FFT_BLOCK samples per axis that overlap by the kernel size, and the valid
+        part of each block's output is kept (overlap-save), so memory stays bounded.
+
+        Results match the direct strategy up to float rounding. For integer images
+        and power-of-two-multiple kernel entries (integers, 1/25 in float32, ...)
+        they are rounded back onto the exact results, which the direct strategy
+        also computes, so tiles and whole frames agree exactly.
+        """
+        kh, kw = self.kernel_height, self.kernel_width
+        sy, sx = self.stride_y, self.stride_x
+        height = (image.shape[0] - kh) // sy + 1
+        width = (image.shape[1] - kw) // sx + 1
+
+        if image.dtype.kind == 'f':
+            kernel = kernel.astype(image.dtype, copy=False)
+        out = empty((height, width, image.shape[2]), np.result_type(image.dtype, kernel.dtype, np.float32))
+
+        fh = _fft_block_length(kh, sy, image.shape[0])
+        fw = _fft_block_length(kw, sx, image.shape[1])
+        # Stride-1 output rows / columns per block, so every block starts on an output
+        step_y = (fh - kh + 1) // sy * sy
+        step_x = (fw - kw + 1) // sx * sx
+
+        # Correlation is convolution with the flipped kernel
+        compute_dtype = np.float32 if image.dtype == np.float32 else np.float64
+        spectrum = np.fft.rfft2(kernel[::-1, ::-1].astype(compute_dtype), s=(fh, fw), axes=(0, 1))
+
+        for y in range(0, (height - 1) * sy + 1, step_y):
+            rows = min(step_y, (height - 1) * sy + 1 - y)
+            for x in range(0, (width - 1) * sx + 1, step_x):
+                cols = min(step_x, (width - 1) * sx + 1 - x)
+
+                block = image[y:y + rows + kh - 1, x:x + cols + kw - 1].astype(compute_dtype, copy=False)
+                product = np.fft.rfft2(block, s=(fh, fw), axes=(0, 1))
+                product *= spectrum
+                full = np.fft.irfft2(product, s=(fh, fw), axes=(0, 1))
+
+                out[y // sy:(y + rows - 1) // sy + 1, x // sx:(x + cols - 1) // sx + 1] = \
+                    full[kh - 1:kh - 1 + rows:sy, kw - 1:kw - 1 + cols:sx]
+
+        step = _exact_step(kernel, _image_magnitude(image), fh * fw)
+        if step is not None:
+            # Powers of two: scaling is exact
+            out /= step
+            np.rint(out, out=out)
+            out *= step
+
+        if self.bias:
+            out += self.bias
+        if clip:
+            np.clip(out, 0, 255, out=out)
+        return out
+
+    def _apply_matmul(self, image: np.ndarray, kernel: np.ndarray, clip=True) -> np.ndarray:
+        """
+        Correlates with 'kernel' as matrix-vector products (im2col): the windows of
+        a block of output rows are copied into a contiguous (pixels, kh * kw) matrix,
+        about MATMUL_BLOCK_BYTES large, that 'np.matmul' multiplies by the
+        flattened kernel through BLAS.
+
+        Integer images are multiplied in float32 or float64, whichever holds every
+        partial sum exactly when the kernel entries allow it, so the results are the
+        exact ones (see '_exact_dtype()'). Float images are multiplied in their own
+        precision and match the direct strategy up to rounding.
+        """
+        kh, kw = self.kernel_height, self.kernel_width
+        channels = image.shape[2]
+
+        if image.dtype.kind == 'f':
+            kernel = kernel.astype(image.dtype, copy=False)
+            compute_dtype = image.dtype
+        else:
+            compute_dtype = _exact_dtype(kernel, _image_magnitude(image)) or np.float64
+
+        windows = sliding_window_view(image, window_shape=(kh, kw), axis=(0, 1))
+        windows = windows[::self.stride_y, ::self.stride_x]
+        height, width = windows.shape[:2]
+
+        out = empty((height, width, channels), np.result_type(image.dtype, kernel.dtype))
+        weights = np.ascontiguousarray(kernel.reshape(kh * kw, kernel.shape[2]).T, dtype=compute_dtype)
+
+        # A single kernel channel multiplies the windows of every image channel at once
+        shared = kernel.shape[2] == 1
+        pixel_shape = (channels,) if shared else ()
+        row_bytes = width * (channels if shared else 1) * kh * kw * np.dtype(compute_dtype).itemsize
+        block = max(1, min(height, MATMUL_BLOCK_BYTES // max(1, row_bytes)))
+        columns = empty((block, width) + pixel_shape + (kh, kw), compute_dtype)
+        # Products go straight into 'out' when they can
+        products = None
+        if not shared or out.dtype != compute_dtype:
+            products = empty((block, width) + pixel_shape, compute_dtype)
+
+        for y in range(0, height, block):
+            rows = min(block, height - y)
+            matrix = columns[:rows]
+            for c in ([None] if shared else range(channels)):
+                matrix[...] = windows[y:y + rows] if shared else windows[y:y + rows, :, c]
+                result = out[y:y + rows] if products is None else products[:rows]
+                np.matmul(matrix.reshape(-1, kh * kw), weights[c or 0], out=result.reshape(-1))
+                if shared and products is not None:
+                    out[y:y + rows] = result
+                elif not shared:
+                    out[y:y + rows, :, c] = result
+
+        release(columns)
+        release(products)
+
+        if self.bias:
+            out += self.bias
+        if clip:
+            np.clip(out, 0, 255, out=out)
+        return out
+
+    def _apply_summed_area(self, image: np.ndarray, kernel: np.ndarray, clip=True) -> np.ndarray:
+        """
+        Correlates with a kernel that is constant per channel: every window sum is
+        read from a summed-area table with four lookups, then scaled by the kernel
+        value, whatever the kernel size.
+
+        Integer images are summed in wrapping int32 (int64 if a window sum may not
+        fit): the table itself may overflow, but the four-term difference is exact
+        modulo 2 ** 32, so window sums, and the results, are exact. Float images are
+        summed in float64 and match the direct strategy up to rounding.
+        """
+        kh, kw = self.kernel_height, self.kernel_width
+        sy, sx = self.stride_y, self.stride_x
+        height = (image.shape[0] - kh) // sy + 1
+        width = (image.shape[1] - kw) // sx + 1
+        channels = image.shape[2]
+
+        if image.dtype.kind == 'f':
+            kernel = kernel.astype(image.dtype, copy=False)
+            sum_dtype = np.float64
+        else:
+            magnitude = max(abs(int(image.min())), abs(int(image.max()))) if image.size else 0
+            sum_dtype = np.int32 if kh * kw * magnitude < 2 ** 31 else np.int64
+
+        # table[y, x] is the sum of image[:y, :x]
+        table = empty((image.shape[0] + 1, image.shape[1] + 1, channels), sum_dtype)
+        table[0] = 0
+        table[1:, 0] = 0
+        np.cumsum(image, axis=0, dtype=sum_dtype, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+
+        top = slice(0, (height - 1) * sy + 1, sy)
+        bottom = slice(kh, kh + (height - 1) * sy + 1, sy)
+        left = slice(0, (width - 1) * sx + 1, sx)
+        right = slice(kw, kw + (width - 1) * sx + 1, sx)
+
+        sums = empty((height, width, channels), sum_dtype)
+        np.subtract(table[bottom, right], table[top, right], out=sums)
+        sums -= table[bottom, left]
+        sums += table[top, left]
+        release(table)
+
+        out = empty((height, width, channels), np.result_type(image.dtype, kernel.dtype))
+        np.multiply(sums, kernel[0, 0], out=out)
+        release(sums)
+
+        if self.bias:
+            out += self.bias
+        if clip:
+            np.clip(out, 0, 255, out=out)
+        return out
+
+    @staticmethod
+    def _apply_taps(image: np.ndarray, weights: np.ndarray, axis: int, size: int, stride: int, dtype):
+        """
+        1D correlation of 'image' with 'weights' (taps, C) along 'axis', keeping
+        'size' outputs 'stride' apart. All-zero taps are skipped, and taps of 1 or -1
+        are added or subtracted without multiplying (Box's row pass, Sobel's passes).
+        """
+        shape = list(image.shape)
+        shape[axis] = size
+        out = empty(shape, dtype)
+        scratch = None
+        span = (size - 1) * stride + 1
+
+        def window(tap):
+            index = [slice(None)] * image.ndim
+            index[axis] = slice(tap, tap + span, stride)
+            return image[tuple(index)]
+
+        taps = [(tap, weight, _unit_sign(weight)) for tap, weight in enumerate(weights) if weight.any()]
+
+        started = False
+        if len(taps) >= 2 and taps[0][2] and taps[1][2] and (taps[0][2] > 0 or taps[1][2] > 0):
+            # Two leading unit taps: a single add or subtract
+            (first, _, first_sign), (second, _, second_sign) = taps[:2]
+            if first_sign > 0 and second_sign > 0:
+                np.add(window(first), window(second), out=out)
+            elif first_sign > 0:
+                np.subtract(window(first), window(second), out=out)
+            else:
+                np.subtract(window(second), window(first), out=out)
+            taps = taps[2:]
+            started = True
+
+        for tap, weight, sign in taps:
+            if not started:
+                if sign > 0:
+                    np.copyto(out, window(tap))
+                elif sign < 0:
+                    np.negative(window(tap), out=out)
+                else:
+                    np.multiply(window(tap), weight, out=out)
+                started = True
+            elif sign > 0:
+                out += window(tap)
+            elif sign < 0:
+                out -= window(tap)
+            else:
+                if scratch is None:
+                    scratch = empty(shape, dtype)
+                np.multiply(window(tap), weight, out=scratch)
+                out += scratch
+
+        if not started:
+            out[...] = 0
+        release(scratch)
+        return out
+
+    def kernel_range(self, kernel: np.ndarray, low, high):
+        """
+        Bounds on the result of one kernel (before clipping) for inputs within [low, high].
+        """
+        kernel = kernel.astype(np.float64)
+        positive = np.clip(kernel, 0, None).sum(axis=(0, 1))
+        negative = np.clip(kernel, None, 0).sum(axis=(0, 1))
+        lows = positive * low + negative * high + self.bias
+        highs = positive * high + negative * low + self.bias
+
+        # Room for the rounding of float32 sums over the window
+        margin = 1e-4 * float(np.abs(kernel).sum(axis=(0, 1)).max() * max(abs(low), abs(high)) + abs(self.bias))
+        return float(lows.min()) - margin, float(highs.max()) + margin
+
+    def value_range(self, low, high):
+        value_range = self.padded_range(low, high)
+        for idx, kernel in enumerate(self.kernels):
+            if idx:
+                # Results of earlier kernels are clipped
+                value_range = max(value_range[0], 0), min(value_range[1], 255)
+            value_range = self.kernel_range(kernel, *value_range)
+
+        return value_range
+
+    def linear_stages(self):
+        """
+        One stage per kernel; only the first one pads, as in 'convolve()'.
+        """
+        stride = (self.stride_y, self.stride_x)
+        if self.keep_dims_with_pad and self.pad_y is None and stride != (1, 1):
+            # Padding is derived from the image size
+            return None
+
+        pad = self.resolve_padding(0, 0)
+        return [
+            LinearStage(kernel.astype(np.float64), stride, pad if idx == 0 else (0, 0), self.pad_val, self.bias)
+            for idx, kernel in enumerate(self.kernels)
+        ]
 
     def convolve(self, image: np.ndarray) -> np.ndarray:
         """
@@ -87,8 +712,22 @@ class StaticFilter(ConvFilter):
             np.ndarray: Final output after applying all kernels
         """
 
-        for kernel in self.kernels:
-            image = self._apply_single_filter(image, kernel)
+        value_range = None if self.input_range is None else self.padded_range(*self.input_range)
+        # The last result goes to the integer cast of 'apply_filter()' for integer inputs
+        integral = image.dtype.kind in 'iu' and image.shape[-1] != 1
+
+        for idx, kernel in enumerate(self.kernels):
+            if value_range is not None:
+                value_range = self.kernel_range(kernel, *value_range)
+            clip = not clip_is_noop(value_range, integral and idx == len(self.kernels) - 1)
+
+            result = self._apply_single_filter(image, kernel, clip, self.factors[idx])
+            if clip and value_range is not None:
+                value_range = max(value_range[0], 0), min(value_range[1], 255)
+            if idx:
+                # Intermediate results of earlier kernels, never the caller's image
+                release(image)
+            image = result
 
         return image
 
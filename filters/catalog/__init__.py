@@ -12,5 +12,6 @@ from .sharpen import Sharpen
 from .sobel import Sobel
 from .glow import Glow
 from .retro import Retro
+from .resize import Resize
 
-__all__ = ["Box", "Brightness", "Contrast", "Saturation", "Sharpen", "Sobel", "Glow", "Retro"]
+__all__ = ["Box", "Brightness", "Contrast", "Saturation", "Sharpen", "Sobel", "Glow", "Retro", "Resize"]
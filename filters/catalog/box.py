@@ -6,6 +6,8 @@ class Box(StaticFilter):
     def __init__(self, alpha: float = None, width: int = 3, height: int = 3, keep_dims=True, **kwargs):
         """
             Box blur filter using a uniform kernel.
+            Larger kernels are summed from a summed-area table, at a cost that does not
+            depend on their size (see StaticFilter's 'summed_area' strategy).
 
             Parameters:
                 alpha (float): Optional. Value in (0, 1] to scale blur radius.
@@ -41,3 +43,17 @@ class Box(StaticFilter):
         kernel = kernel[:, :, np.newaxis]
 
         super().__init__(kernels=kernel, keep_dims=keep_dims, **kwargs)
+
+    def rescaled_params(self, params, scale):
+        if 'stride' in params or 'pad' in params:
+            return None
+
+        params = dict(params)
+        if params.get('alpha') is not None:
+            params['alpha'] = params['alpha'] * scale
+        else:
+            # Same radius in scaled pixels, at least 1
+            for key in ('width', 'height'):
+                params[key] = 2 * max(1, round(params.get(key, 3) // 2 * scale)) + 1
+
+        return params
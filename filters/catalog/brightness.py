@@ -1,7 +1,10 @@
 import numpy as np
 from ..base import BaseFilter
+from ..base.buffers import empty
 
 class Brightness(BaseFilter):
+    pointwise = True
+
     def __init__(self, alpha: float = 1.0):
         """
         Brightness filter.
@@ -17,4 +20,33 @@ class Brightness(BaseFilter):
         self.alpha = alpha
 
     def apply(self, image: np.ndarray) -> np.ndarray:
-        return image + self.alpha
+        out = empty(image.shape, np.result_type(image.dtype, self.alpha))
+        return np.add(image, self.alpha, out=out)
+
+    def halo(self):
+        return 0, 0
+
+    def value_range(self, low, high):
+        return low + self.alpha, high + self.alpha
+
+    def lookup_table(self, channels: int, histogram=None):
+        values = self.apply(self._value_ramp(channels))
+        return np.clip(values, 0, 255).astype(np.uint8)[:, 0]
+
+    def color_matrix(self, mean=None):
+        return np.hstack([np.eye(3), np.full((3, 1), float(self.alpha))])
+
+    def is_identity(self):
+        return self.alpha == 0
+
+    def merged_params(self, other, clip=True):
+        if type(other) is not Brightness or not -100 <= self.alpha + other.alpha <= 100:
+            return None
+
+        # clip(clip(x + a) + b) == clip(x + a + b) when a and b do not pull in opposite
+        # directions, and truncation only commutes with whole offsets
+        if clip and (self.alpha * other.alpha < 0
+                     or not float(self.alpha).is_integer() or not float(other.alpha).is_integer()):
+            return None
+
+        return {'alpha': self.alpha + other.alpha}
@@ -1,7 +1,11 @@
 import numpy as np
 from ..base import BaseFilter
+from ..base.buffers import empty
 
 class Contrast(BaseFilter):
+    needs_histogram = True
+    pointwise = True
+
     def __init__(self, alpha: float = 1.0):
         """
         Contrast Filter.
@@ -17,4 +21,39 @@ class Contrast(BaseFilter):
 
     def apply(self, image: np.ndarray) -> np.ndarray:
         mean = np.mean(image, axis=(0, 1), keepdims=True)
-        return (image - mean) * self.alpha + mean
+        return self._stretch(image, mean)
+
+    def lookup_table(self, channels: int, histogram=None):
+        # Integer sums are exact in float64, so this is the same mean np.mean computes
+        totals = histogram @ np.arange(256, dtype=np.int64)
+        mean = (totals.astype(np.float64) / histogram.sum(axis=1))[np.newaxis, np.newaxis, :]
+
+        values = self._stretch(self._value_ramp(channels), mean)
+        return np.clip(values, 0, 255).astype(np.uint8)[:, 0]
+
+    def color_matrix(self, mean=None):
+        # (x - mean) * alpha + mean == alpha * x + (1 - alpha) * mean
+        return np.hstack([self.alpha * np.eye(3), ((1 - self.alpha) * mean)[:, np.newaxis]])
+
+    def value_range(self, low, high):
+        # alpha * x + (1 - alpha) * mean, with the mean within [low, high] as well
+        stretched = sorted((self.alpha * low, self.alpha * high))
+        anchored = sorted(((1 - self.alpha) * low, (1 - self.alpha) * high))
+        return stretched[0] + anchored[0], stretched[1] + anchored[1]
+
+    def is_identity(self):
+        return self.alpha == 1
+
+    def merged_params(self, other, clip=True):
+        # Stretching keeps the mean, so unclipped stretches compose; clipping moves it
+        if clip or type(other) is not Contrast or not -5 <= self.alpha * other.alpha <= 5:
+            return None
+
+        return {'alpha': self.alpha * other.alpha}
+
+    def _stretch(self, image: np.ndarray, mean: np.ndarray) -> np.ndarray:
+        out = empty(image.shape, np.result_type(image.dtype, mean.dtype))
+        np.subtract(image, mean, out=out)
+        out *= self.alpha
+        out += mean
+        return out
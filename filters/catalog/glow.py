@@ -2,6 +2,9 @@ from ..base import DynamicFilter
 import numpy as np
 
 class Glow(DynamicFilter):
+    # Only the region matters, so tiles are fine
+    uses_position = False
+
     def __init__(self, low_thresh=40, high_thresh=80, glow_boost=2.0, **kwargs):
         """
         Initializes thresholds for detecting dim glows.
@@ -17,6 +20,11 @@ class Glow(DynamicFilter):
         self.high_thresh = high_thresh
         self.glow_boost = glow_boost
 
+    def region_range(self, low, high):
+        # The centre pixel, boosted or not
+        boosted = sorted((low * self.glow_boost, high * self.glow_boost))
+        return min(low, boosted[0]), max(high, boosted[1])
+
     def apply_region(self, region: np.ndarray, y: int, x: int) -> np.ndarray:
         """
         Amplifies mid-brightness (glow) areas to reveal hidden content.
@@ -0,0 +1,34 @@
+import numpy as np
+from PIL import Image
+from ..base import BaseFilter
+from ..base.buffers import empty
+
+class Resize(BaseFilter):
+    def __init__(self, width: int, height: int):
+        """
+        Resize Filter.
+        Resamples the image to a fixed size with a Lanczos filter (antialiased when shrinking).
+
+        Parameters:
+            width, height (int): Output size in pixels.
+        """
+        if not all(isinstance(v, int) and v > 0 for v in (width, height)):
+            raise ValueError(f"Width and height must be positive ints, got ({width}, {height})")
+
+        self.width = width
+        self.height = height
+
+    def apply(self, image: np.ndarray) -> np.ndarray:
+        if image.shape[:2] == (self.height, self.width):
+            return image
+
+        # One Pillow image per channel: 8-bit for integer images, 32-bit float otherwise
+        out = empty((self.height, self.width, image.shape[2]), np.result_type(image.dtype, np.float32))
+        for c in range(image.shape[2]):
+            if image.dtype.kind == 'f':
+                channel = Image.fromarray(image[:, :, c].astype(np.float32), mode='F')
+            else:
+                channel = Image.fromarray(np.clip(image[:, :, c], 0, 255).astype(np.uint8))
+            out[:, :, c] = np.asarray(channel.resize((self.width, self.height), Image.LANCZOS))
+
+        return out
@@ -1,5 +1,6 @@
 import numpy as np
 from ..base import BaseFilter
+from ..base.buffers import empty, release
 from .box import Box
 
 """
@@ -35,5 +36,41 @@ class Retro(BaseFilter):
         Applies block averaging and expands result back to original size.
         """
         out = self.blur.apply(image)
-        upsampled = np.kron(out, np.ones((self.block_size, self.block_size, 1)))
+        upsampled = self.upsample(out)
+        release(out)
         return upsampled
+
+    def rescaled_params(self, params, scale):
+        if 'stride' in params or 'pad' in params:
+            return None
+
+        # Nearest power of two
+        params = dict(params)
+        size = params.get('block_size', 2) * scale
+        params['block_size'] = 2 ** max(0, int(round(np.log2(size))))
+        return params
+
+    def upsample(self, image: np.ndarray) -> np.ndarray:
+        """
+        Nearest-neighbour upsampling of the block grid: every value becomes a
+        block_size x block_size block (same values as 'np.kron' with a block of ones).
+
+        Parameters:
+            image (np.ndarray): Block averages (h, w) or (h, w, C)
+
+        Returns:
+            np.ndarray: (h * block_size, w * block_size[, C]) image
+        """
+        height, width = image.shape[:2]
+        size = self.block_size
+        out = empty((height * size, width * size) + image.shape[2:], image.dtype)
+        out.reshape((height, size, width, size) + image.shape[2:])[...] = image[:, np.newaxis, :, np.newaxis]
+        return out
+
+    def value_range(self, low, high):
+        # Upsampling copies the block averages
+        return self.blur.value_range(low, high)
+
+    def set_input_range(self, value_range):
+        super().set_input_range(value_range)
+        self.blur.set_input_range(value_range)
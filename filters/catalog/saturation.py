@@ -1,12 +1,17 @@
 import numpy as np
 from ..base import BaseFilter
+from ..base.buffers import empty, release
 
 """
 ChatGPT Usage:
 The [0.2989, 0.5870, 0.1140] values that are used instead of [1/3, 1/3, 1/3]
 """
 
+LUMA_WEIGHTS = (0.2989, 0.5870, 0.1140)
+
 class Saturation(BaseFilter):
+    pointwise = True
+
     def __init__(self, alpha: float = 1.0):
         """
         Saturation Filter.
@@ -25,6 +30,31 @@ class Saturation(BaseFilter):
             raise ValueError("Saturation adjustment requires an RGB image.")
 
         # Computing grayscale using weighted sum (according to our light sensitivity)
-        gray = np.dot(image, [0.2989, 0.5870, 0.1140])[:, :, np.newaxis]
-        return gray * (1 - self.alpha) + image * self.alpha
+        weights = np.array(LUMA_WEIGHTS, dtype=np.result_type(image.dtype, np.float32))
+        dtype = np.result_type(image.dtype, weights.dtype)
+        gray = np.dot(image, weights, out=empty(image.shape[:2], dtype))
+
+        out = empty(image.shape, dtype)
+        np.multiply(image, self.alpha, out=out)
+        gray *= 1 - self.alpha
+        out += gray[:, :, np.newaxis]
+        release(gray)
+        return out
+
+    def color_matrix(self, mean=None):
+        # gray * (1 - alpha) + x * alpha, with gray = weights . x broadcast to every channel
+        matrix = self.alpha * np.eye(3) + (1 - self.alpha) * np.outer(np.ones(3), LUMA_WEIGHTS)
+        return np.hstack([matrix, np.zeros((3, 1))])
+
+    def halo(self):
+        return 0, 0
+
+    def value_range(self, low, high):
+        # alpha * x + (1 - alpha) * gray, with gray within sum(weights) * [low, high]
+        total = sum(LUMA_WEIGHTS)
+        colored = sorted((self.alpha * low, self.alpha * high))
+        gray = sorted(((1 - self.alpha) * total * low, (1 - self.alpha) * total * high))
+        return colored[0] + gray[0], colored[1] + gray[1]
 
+    def is_identity(self):
+        return self.alpha == 1
@@ -1,26 +1,76 @@
 import numpy as np
-from ..base import BaseFilter
+from ..base import BaseFilter, LinearStage
 from .box import Box
 
 class Sharpen(BaseFilter):
-    def __init__(self, alpha: float = 1.0, keep_dims=True, **kwargs):
+    def __init__(self, alpha: float = 1.0, blur_size: int = 5, keep_dims=True, **kwargs):
         """
         Sharpen Filter.
         Enhances edges by subtracting a blurred version of the image (unsharp masking).
 
         Parameters:
             alpha (float): Sharpening strength, between [0, 5].
+            blur_size (int): Width and height of the box blur that is subtracted (odd).
         """
 
         if not (0 <= alpha <= 5):
             raise ValueError(f"Alpha must be in [0, 5], got {alpha}")
 
         self.alpha = alpha
-        self.blur = Box(height=5, width=5, keep_dims=keep_dims, **kwargs)
+        self.blur = Box(height=blur_size, width=blur_size, keep_dims=keep_dims, **kwargs)
 
     def apply(self, image: np.ndarray) -> np.ndarray:
         blurred = self.blur.apply(image)
-        mask = image - blurred
-        sharpened = image + self.alpha * mask
+        return self._unsharp(image, blurred)
 
-        return sharpened
\ No newline at end of file
+    def halo(self):
+        return self.blur.halo()
+
+    def value_range(self, low, high):
+        blur_range = self.blur.value_range(low, high)
+        if blur_range is None:
+            return None
+
+        # (1 + alpha) * image - alpha * blurred
+        return ((1 + self.alpha) * low - self.alpha * blur_range[1],
+                (1 + self.alpha) * high - self.alpha * blur_range[0])
+
+    def rescaled_params(self, params, scale):
+        if 'stride' in params or 'pad' in params:
+            return None
+
+        params = dict(params)
+        params['blur_size'] = 2 * max(1, round(params.get('blur_size', 5) // 2 * scale)) + 1
+        return params
+
+    def is_identity(self):
+        # Only if the blur keeps the frame size
+        return self.alpha == 0 and self.blur.halo() is not None
+
+    def linear_stages(self):
+        # image + alpha * (image - blur(image)) is one kernel: (1 + alpha) * identity - alpha * box
+        if self.blur.halo() is None:
+            return None
+
+        (blur,) = self.blur.linear_stages()
+        kernel = -self.alpha * blur.kernel
+        kernel[blur.kernel.shape[0] // 2, blur.kernel.shape[1] // 2] += 1 + self.alpha
+        return [LinearStage(kernel, blur.stride, blur.pad, blur.pad_val, -self.alpha * blur.bias)]
+
+    def apply_tile(self, image: np.ndarray, edges) -> np.ndarray:
+        blurred = self.blur.apply_tile(image, edges)
+
+        # Crop the halo the blur consumed so both operands cover the same pixels
+        top, bottom, left, right = edges
+        ry, rx = self.blur.radius_y, self.blur.radius_x
+        image = image[0 if top else ry: image.shape[0] - (0 if bottom else ry),
+                      0 if left else rx: image.shape[1] - (0 if right else rx)]
+
+        return self._unsharp(image, blurred)
+
+    def _unsharp(self, image: np.ndarray, blurred: np.ndarray) -> np.ndarray:
+        # image + alpha * (image - blurred), computed inside the blur's buffer
+        mask = np.subtract(image, blurred, out=blurred)
+        mask *= self.alpha
+        mask += image
+        return mask
@@ -1,5 +1,6 @@
 import numpy as np
 from ..base import StaticFilter
+from ..base.buffers import release
 
 """
 ChatGPT Usage:
@@ -37,8 +38,20 @@ SOBEL_KERNELS = {
     )
 }
 
+# 1D factors of the kernels above, per size: (shared, smoothing, derivative) taps
+# such that Kx is (shared * smoothing) down the rows times (shared * derivative)
+# along the columns and Ky the transpose, '*' being 1D convolution. The shared
+# factor is applied along both axes once for both gradients.
+SOBEL_FACTORS = {
+    3: ([1, 1], [1, 1], [-1, 1]),  # [1, 2, 1] = [1, 1] * [1, 1], [-1, 0, 1] = [1, 1] * [-1, 1]
+    5: ([1], [1, 1, 2, 1, 1], [-2, -1, 0, 1, 2]),
+}
+
+# What 'Sobel' outputs per channel
+SOBEL_OUTPUTS = ('magnitude', 'magnitude_l1', 'orientation')
+
 class Sobel(StaticFilter):
-    def __init__(self, size=3, keep_dims=True, **kwargs):
+    def __init__(self, size=3, keep_dims=True, output='magnitude', **kwargs):
         """
         Sobel Filter.
         Applies Sobel edge detection using horizontal and vertical derivative filters.
@@ -46,10 +59,15 @@ class Sobel(StaticFilter):
         Parameters:
             size (int): Kernel size (3 or 5 supported).
             keep_dims (bool): If True, pads to preserve dimensions.
+            output (str): 'magnitude' (sqrt(Gx^2 + Gy^2)), 'magnitude_l1' (|Gx| + |Gy|,
+                cheaper) or 'orientation' (atan2(Gy, Gx), mapped from [-pi, pi] to [0, 255]).
         """
+        if output not in SOBEL_OUTPUTS:
+            raise ValueError(f"Unsupported output '{output}', expected one of {SOBEL_OUTPUTS}")
 
+        self.size = size
+        self.output = output
         self.Kx, self.Ky = self.get_sobel_kernels(size)
-        radius = self.Kx.shape[0], self.Kx.shape[0]
 
         super().__init__(kernels=[self.Kx, self.Ky], keep_dims=keep_dims, **kwargs)
 
@@ -64,13 +82,84 @@ class Sobel(StaticFilter):
         except KeyError:
             raise ValueError(f"No Sobel kernels defined for size {size}")
 
-    def apply(self, image: np.ndarray) -> np.ndarray:
-        # Apply horizontal and vertical filters separately
-        Gx = self._apply_single_filter(image, self.kernels[0])
-        Gy = self._apply_single_filter(image, self.kernels[1])
+    def convolve(self, image: np.ndarray) -> np.ndarray:
+        """
+        Gradients of the padded image, combined into the requested output.
+
+        Both gradients are kept signed and in float32 (float images keep their own
+        precision) until they are combined, so negative gradients count as much as
+        positive ones.
+        """
+        dtype = image.dtype if image.dtype.kind == 'f' else np.float32
+
+        if self.strategy in ('auto', 'separable'):
+            gx, gy = self._gradients(image, dtype)
+        else:
+            gx, gy = (self._apply_single_filter(image, kernel, clip=False).astype(dtype, copy=False)
+                      for kernel in self.kernels)
+
+        if self.bias:
+            gx += self.bias
+            gy += self.bias
+
+        if self.output == 'magnitude':
+            out = np.hypot(gx, gy, out=gx)
+        elif self.output == 'magnitude_l1':
+            out = np.abs(gx, out=gx)
+            out += np.abs(gy, out=gy)
+        else:
+            # atan2 tells -0.0 from 0.0 (-pi from pi), and which zero a flat gradient
+            # comes out as depends on the strategy: adding 0.0 makes every zero +0.0
+            gx += 0.0
+            gy += 0.0
+            out = np.arctan2(gy, gx, out=gx)
+            out += np.pi
+            out *= 255 / (2 * np.pi)
+
+        release(gy)
+        return out
+
+    def _gradients(self, image: np.ndarray, dtype):
+        """
+        Gx and Gy as 1D passes: the shared factor along both axes once, then the
+        smoothing and derivative factors, in opposite directions for each gradient.
+        """
+        shared, smoothing, derivative = (np.array(taps, dtype=dtype)[:, np.newaxis]
+                                         for taps in SOBEL_FACTORS[self.size])
+        height = (image.shape[0] - self.kernel_height) // self.stride_y + 1
+        width = (image.shape[1] - self.kernel_width) // self.stride_x + 1
+
+        common = image
+        if len(shared) > 1:
+            rows = self._apply_taps(image, shared, 0, image.shape[0] - len(shared) + 1, 1, dtype)
+            common = self._apply_taps(rows, shared, 1, image.shape[1] - len(shared) + 1, 1, dtype)
+            release(rows)
+
+        smoothed = self._apply_taps(common, smoothing, 0, height, self.stride_y, dtype)
+        gx = self._apply_taps(smoothed, derivative, 1, width, self.stride_x, dtype)
+        release(smoothed)
+
+        differentiated = self._apply_taps(common, derivative, 0, height, self.stride_y, dtype)
+        gy = self._apply_taps(differentiated, smoothing, 1, width, self.stride_x, dtype)
+        release(differentiated)
+
+        if common is not image:
+            release(common)
+        return gx, gy
 
-        # Compute gradient magnitude
-        G = np.sqrt(Gx.astype(np.float32) ** 2 + Gy.astype(np.float32) ** 2)
-        return np.clip(G, 0, 255)
+    def value_range(self, low, high):
+        if self.output == 'orientation':
+            # Room for float32 rounding around atan2's +-pi
+            margin = 1e-4 * 255
+            return -margin, 255.0 + margin
 
+        # Largest absolute value of each gradient
+        bounds = [max(abs(value) for value in self.kernel_range(kernel, *self.padded_range(low, high)))
+                  for kernel in self.kernels]
+        if self.output == 'magnitude':
+            return 0.0, float(np.hypot(*bounds))
+        return 0.0, float(sum(bounds))
 
+    def linear_stages(self):
+        # The gradient magnitude is not linear
+        return None
@@ -0,0 +1,13 @@
+"""
+filters.fused
+-------------
+Filters standing for a run of catalog filters, produced by the pipeline planner.
+"""
+
+from .fused_filter import FusedFilter
+from .lookup_table import LookupTable
+from .color_matrix import ColorMatrix
+from .composed_kernel import ComposedKernel
+from .deferred_upsample import DeferredUpsample
+
+__all__ = ["FusedFilter", "LookupTable", "ColorMatrix", "ComposedKernel", "DeferredUpsample"]
@@ -0,0 +1,73 @@
+"""
+ColorMatrix Module
+------------------
+Fuses a run of affine color filters into one 3x4 matrix.
+
+Saturation blends each pixel with its luminance, Brightness adds a constant and
+Contrast scales around the channel means: all of them are affine maps of the RGB
+vector of a pixel (see 'BaseFilter.color_matrix()'). Without clipping in between,
+a run of them is a single affine map, applied with one float matmul over the pixel
+buffer.
+
+Contrast's mean is not needed per step: the mean of an affinely mapped image is
+the mapped mean, so the input means are computed once and pushed through the
+matrices composed so far.
+
+Per-step clipping makes the chain non-affine, so the matrix only stands for the
+run on unclipped float pipelines ('--precision float32' / 'float64').
+
+Author: lwwws
+"""
+
+import numpy as np
+
+from ..base.buffers import empty
+from .fused_filter import FusedFilter
+
+
+class ColorMatrix(FusedFilter):
+    """
+    Run of affine color filters applied as one 3x4 matrix.
+
+    The matrix path is used for unclipped float RGB images; anything else runs
+    the filters in turn, with the usual per-filter clipping.
+
+    Parameters:
+        operations (list): (filter class, params) tuples, each providing 'color_matrix()'
+    """
+    pointwise = True
+
+    def apply_filter(self, image: np.ndarray, edges=None, clip=True) -> np.ndarray:
+        if clip or image.dtype.kind != 'f' or image.ndim != 3 or image.shape[2] != 3:
+            return self.apply_each(image, edges, clip)
+
+        matrix = self.matrix(image)
+        linear = matrix[:, :3].T.astype(image.dtype)
+        offset = matrix[:, 3].astype(image.dtype)
+
+        out = empty(image.shape, image.dtype)
+        np.matmul(image.reshape(-1, 3), linear, out=out.reshape(-1, 3))
+        if offset.any():
+            out += offset
+
+        return out
+
+    def matrix(self, image: np.ndarray) -> np.ndarray:
+        """
+        Composed (3, 4) float64 matrix of the whole run for 'image'.
+        """
+        total = np.eye(3, 4)
+        mean = None
+
+        for filt in self.filters:
+            current = None
+            if filt.needs_histogram:
+                if mean is None:
+                    mean = np.mean(image, axis=(0, 1), dtype=np.float64)
+                # Means of the image this filter sees
+                current = total[:, :3] @ mean + total[:, 3]
+
+            step = filt.color_matrix(current)
+            total = np.hstack([step[:, :3] @ total[:, :3], (step[:, :3] @ total[:, 3] + step[:, 3])[:, np.newaxis]])
+
+        return total
@@ -0,0 +1,175 @@
+"""
+ComposedKernel Module
+---------------------
+Composes consecutive linear convolutions into one kernel ("unclamped fusion").
+
+Correlating with KA and then with KB is the same as correlating once with the full
+convolution of the two kernels (KB dilated by the stride of KA), with bias
+bA * sum(KB) + bB. A run of StaticFilters (and Sharpen, which is one kernel) thus
+costs one pass with a larger kernel instead of one pass per filter.
+
+What composition drops is the clipping, and on uint8 pipelines the truncation, each
+filter applies to its output; results can differ from the step-by-step ones wherever
+an intermediate left [0, 255] or had a fractional part. The planner only composes
+kernels when asked to, and the difference can be measured (see '--fusion-report').
+
+Padding is respected exactly:
+    - a run whose later filters do not pad ('keep_dims' off) composes as is, at any stride
+    - a run of same-size filters (stride 1, padded by their radius) pads once by the
+      total radius; the border band where a later filter would have read its own
+      padding is recomputed with the filters one by one
+
+Author: lwwws
+"""
+
+import numpy as np
+
+from ..base import StaticFilter, LinearStage
+from .fused_filter import FusedFilter
+
+
+def compose_stages(first: LinearStage, second: LinearStage):
+    """
+    Single stage equivalent to 'second' applied to the output of 'first'.
+
+    Returns:
+        LinearStage or None: None if the result needs padding between the stages
+        or a per-channel bias
+    """
+    if second.pad != (0, 0) and (first.stride != (1, 1) or second.stride != (1, 1)):
+        return None
+
+    channels = max(first.kernel.shape[2], second.kernel.shape[2])
+    ka = np.broadcast_to(first.kernel, first.kernel.shape[:2] + (channels,))
+    kb = np.broadcast_to(second.kernel, second.kernel.shape[:2] + (channels,))
+
+    bias = first.bias * kb.sum(axis=(0, 1)) + second.bias
+    if not np.all(bias == bias[0]):
+        return None
+
+    sy, sx = first.stride
+    (ah, aw), (bh, bw) = ka.shape[:2], kb.shape[:2]
+    kernel = np.zeros((sy * (bh - 1) + ah, sx * (bw - 1) + aw, channels))
+    for y in range(bh):
+        for x in range(bw):
+            kernel[sy * y: sy * y + ah, sx * x: sx * x + aw] += kb[y, x] * ka
+
+    stride = (sy * second.stride[0], sx * second.stride[1])
+    pad = (first.pad[0] + second.pad[0], first.pad[1] + second.pad[1])
+    return LinearStage(kernel, stride, pad, first.pad_val, float(bias[0]))
+
+
+def compose_filters(filters):
+    """
+    Single stage equivalent to a run of filters, ignoring intermediate clipping.
+
+    Returns:
+        tuple or None: (LinearStage, border) where border is the (rows, columns)
+        band along the frame border that depends on the padding of a later
+        filter, or None if the run cannot be composed
+    """
+    per_filter = [filt.linear_stages() for filt in filters]
+    if any(stages is None for stages in per_filter):
+        return None
+    stages = [stage for filt_stages in per_filter for stage in filt_stages]
+
+    # Same-size filters: one kernel, stride 1, padded by its radius
+    halos = [filt.halo() for filt in filters]
+    same_size = all(halo is not None and len(filt_stages) == 1 for halo, filt_stages in zip(halos, per_filter))
+
+    if same_size:
+        border = (sum(h[0] for h in halos[1:]), sum(h[1] for h in halos[1:]))
+    elif any(stage.pad != (0, 0) for stage in stages[1:]):
+        return None
+    else:
+        border = (0, 0)
+
+    total = stages[0]
+    for stage in stages[1:]:
+        total = compose_stages(total, stage)
+        if total is None:
+            return None
+
+    return total, border
+
+
+class ComposedKernel(FusedFilter):
+    """
+    Run of linear convolution filters applied as one composed kernel.
+
+    Parameters:
+        operations (list): (filter class, params) tuples accepted by 'compose_filters()'
+    """
+
+    def __init__(self, operations):
+        super().__init__(operations)
+
+        composed = compose_filters(self.filters)
+        if composed is None:
+            raise ValueError(f"Filters {[type(f).__name__ for f in self.filters]} cannot be composed")
+
+        stage, self.border = composed
+        self.conv = StaticFilter(stage.kernel, stride=stage.stride, pad=stage.pad,
+                                 pad_val=stage.pad_val, bias=stage.bias)
+
+    def apply_filter(self, image: np.ndarray, edges=None, clip=True) -> np.ndarray:
+        out = self.conv.apply_filter(image, edges, clip)
+        if self.border != (0, 0):
+            self._fix_border(image, out, (True,) * 4 if edges is None else edges, clip)
+
+        return out
+
+    def _fix_border(self, image: np.ndarray, out: np.ndarray, edges, clip: bool):
+        """
+        Overwrite the frame border band of 'out' with the step-by-step result.
+
+        Parameters:
+            image (np.ndarray): Input frame or tile (with its halo on interior sides)
+            out (np.ndarray): Composed result for 'image'
+            edges (tuple): Which of the (top, bottom, left, right) sides are on the frame border
+        """
+        height, width = image.shape[:2]
+        out_height, out_width = out.shape[:2]
+        by, bx = self.border
+        hy, hx = self.conv.radius_y, self.conv.radius_x
+
+        # Output pixel (y, x) is centred on input pixel (y + ty, x + tx)
+        ty = 0 if edges[0] else hy
+        tx = 0 if edges[2] else hx
+
+        top = min(by, out_height) if edges[0] else 0
+        bottom = max(top, out_height - by) if edges[1] else out_height
+        bands = [
+            (0, top, 0, out_width), (bottom, out_height, 0, out_width),
+            (top, bottom, 0, bx if edges[2] else 0), (top, bottom, max(0, out_width - bx) if edges[3] else out_width, out_width),
+        ]
+        for y0, y1, x0, x1 in bands:
+            if y0 >= y1 or x0 >= x1:
+                continue
+
+            # Input region with the context the run needs; sides cut by the frame get padded
+            cy0, cy1 = y0 + ty - hy, y1 + ty + hy
+            cx0, cx1 = x0 + tx - hx, x1 + tx + hx
+            band_edges = (cy0 < 0, cy1 > height, cx0 < 0, cx1 > width)
+            cy0, cy1, cx0, cx1 = max(0, cy0), min(height, cy1), max(0, cx0), min(width, cx1)
+            band = self.apply_each(image[cy0:cy1, cx0:cx1], band_edges, clip)
+
+            # Padded sides keep their rows / columns, the others lose the context
+            oy0 = (cy0 if band_edges[0] else cy0 + hy) - ty
+            ox0 = (cx0 if band_edges[2] else cx0 + hx) - tx
+            out[y0:y1, x0:x1] = band[y0 - oy0: y1 - oy0, x0 - ox0: x1 - ox0]
+
+    def value_range(self, low, high):
+        # Border bands come from the filters one by one
+        composed, each = self.conv.value_range(low, high), super().value_range(low, high)
+        if composed is None or each is None:
+            return None
+
+        return min(composed[0], each[0]), max(composed[1], each[1])
+
+    def set_input_range(self, value_range):
+        super().set_input_range(value_range)
+        self.conv.set_input_range(value_range)
+
+    def halo(self):
+        return self.conv.halo()
@@ -0,0 +1,56 @@
+"""
+DeferredUpsample Module
+-----------------------
+Runs the pointwise filters that follow a Retro on its block grid.
+
+Retro averages blocks on a strided grid and upsamples the result by repeating every
+value over a block_size x block_size block. A pointwise filter (see
+'BaseFilter.pointwise') maps each pixel on its own, so applying it before or after
+the repetition gives the same image, and before costs block_size ** 2 times less.
+The upsampling is deferred past the whole run of pointwise filters.
+
+Statistics the pointwise filters depend on (Contrast's mean) are unchanged, since
+repetition scales every value count by the same factor. On uint8 pipelines the means
+are exact integer ratios and results are identical to the step-by-step ones; float
+pipelines match up to rounding.
+
+Author: lwwws
+"""
+
+import numpy as np
+
+from ..base.buffers import release
+from ..catalog.retro import Retro
+from .fused_filter import FusedFilter
+
+
+class DeferredUpsample(FusedFilter):
+    """
+    Retro followed by pointwise filters, with the pointwise filters applied to the
+    block grid before upsampling.
+
+    Parameters:
+        operations (list): (Retro, params) followed by (filter class, params) tuples
+            of pointwise filters
+    """
+
+    def __init__(self, operations):
+        super().__init__(operations)
+
+        self.retro, *self.pointwise_filters = self.filters
+        if not isinstance(self.retro, Retro):
+            raise ValueError(f"DeferredUpsample must start with a Retro, got {type(self.retro).__name__}")
+        if not all(filt.pointwise for filt in self.pointwise_filters):
+            raise ValueError("DeferredUpsample can only defer past pointwise filters")
+
+    def apply_filter(self, image: np.ndarray, edges=None, clip=True) -> np.ndarray:
+        # Retro's block averages, clipped and cast as Retro's own output would be
+        grid = self.retro.blur.apply_filter(image, clip=clip)
+
+        for filt in self.pointwise_filters:
+            previous, grid = grid, filt.apply_filter(grid, clip=clip)
+            release(previous, grid)
+
+        out = self.retro.upsample(grid)
+        release(grid, image)
+        return out
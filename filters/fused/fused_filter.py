@@ -0,0 +1,67 @@
+"""
+FusedFilter Module
+------------------
+Base class for filters standing for a run of other filters.
+
+A fused filter takes the same (filter class, params) operations the run was
+validated from, builds them, and falls back to applying them one after the other
+whenever its fast path does not apply to an image.
+
+Author: lwwws
+"""
+
+import numpy as np
+
+from ..base import BaseFilter
+from ..base.buffers import release
+
+
+class FusedFilter(BaseFilter):
+    """
+    Run of filters executed as one step.
+
+    Parameters:
+        operations (list): (filter class, params) tuples
+    """
+
+    def __init__(self, operations):
+        if not operations:
+            raise ValueError(f"{type(self).__name__} needs at least one operation")
+
+        self.operations = [(cls, dict(params)) for cls, params in operations]
+        self.filters = [cls(**params) for cls, params in self.operations]
+
+    def apply(self, image: np.ndarray) -> np.ndarray:
+        return self.apply_each(image)
+
+    def apply_each(self, image: np.ndarray, edges=None, clip=True) -> np.ndarray:
+        """
+        Apply the fused filters one after the other.
+        """
+        source = image
+        for filt in self.filters:
+            previous, image = image, filt.apply_filter(image, edges, clip)
+            if previous is not source:
+                release(previous, image)
+
+        return image
+
+    def value_range(self, low, high):
+        # Bounds of the unclipped chain also hold with clipping in between
+        value_range = (low, high)
+        for filt in self.filters:
+            value_range = filt.value_range(*value_range)
+            if value_range is None:
+                return None
+
+        return value_range
+
+    def set_input_range(self, value_range):
+        super().set_input_range(value_range)
+        for filt in self.filters:
+            filt.set_input_range(value_range)
+            value_range = None if value_range is None else filt.value_range(*value_range)
+
+    def halo(self):
+        halos = [filt.halo() for filt in self.filters]
+        return (0, 0) if all(halo == (0, 0) for halo in halos) else None
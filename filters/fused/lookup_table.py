@@ -0,0 +1,84 @@
+"""
+LookupTable Module
+------------------
+Fuses a run of per-channel pointwise filters into one table lookup.
+
+On a uint8 image, a filter such as Brightness maps every channel value through a
+fixed function followed by clipping and truncation to uint8, so it is fully described
+by a 256-entry table per channel (see 'BaseFilter.lookup_table()'). Composing the
+tables of consecutive filters gives a single table for the whole run, and the image
+is read and written once however many filters the run contains.
+
+Filters that depend on global statistics (Contrast's mean) get the value histogram
+of the image they would see: the input histogram is computed once and pushed through
+the tables composed so far.
+
+Author: lwwws
+"""
+
+import numpy as np
+from PIL import Image
+
+from ..base.buffers import empty
+from .fused_filter import FusedFilter
+
+
+class LookupTable(FusedFilter):
+    """
+    Run of per-channel pointwise filters applied as one 256-entry table per channel.
+
+    Results are identical to applying the filters one by one. The table path is
+    used for uint8 images with two or more channels and clipping enabled; anything
+    else (float precision, single channel images) runs the filters in turn.
+
+    Parameters:
+        operations (list): (filter class, params) tuples, each providing 'lookup_table()'
+    """
+    pointwise = True
+
+    def apply_filter(self, image: np.ndarray, edges=None, clip=True) -> np.ndarray:
+        if not (clip and image.dtype == np.uint8 and image.ndim == 3 and image.shape[2] > 1):
+            return self.apply_each(image, edges, clip)
+
+        table = self.table(image)
+        out = empty(image.shape, np.uint8)
+        for c in range(image.shape[2]):
+            out[:, :, c] = table[image[:, :, c], c]
+
+        return out
+
+    def table(self, image: np.ndarray) -> np.ndarray:
+        """
+        Composed (256, C) uint8 table of the whole run for 'image'.
+        """
+        channels = image.shape[2]
+        table = np.repeat(np.arange(256, dtype=np.uint8)[:, np.newaxis], channels, axis=1)
+        histogram = None
+
+        for filt in self.filters:
+            current = None
+            if filt.needs_histogram:
+                if histogram is None:
+                    histogram = self.histogram(image)
+                # Value counts after the tables applied so far
+                current = np.stack([
+                    np.bincount(table[:, c], weights=histogram[c], minlength=256)
+                    for c in range(channels)
+                ]).astype(np.int64)
+
+            step = filt.lookup_table(channels, current)
+            table = np.take_along_axis(step, table.astype(np.intp), axis=0)
+
+        return table
+
+    @staticmethod
+    def histogram(image: np.ndarray) -> np.ndarray:
+        """
+        (C, 256) value counts per channel of a uint8 image.
+        """
+        channels = image.shape[2]
+        if channels == 3:
+            counts = Image.fromarray(np.ascontiguousarray(image)).histogram()
+            return np.array(counts, dtype=np.int64).reshape(3, 256)
+
+        return np.stack([np.bincount(image[:, :, c].ravel(), minlength=256) for c in range(channels)])
@@ -0,0 +1,64 @@
+"""
+test_batch.py
+-------------
+Batch mode against running the same operations image by image.
+
+Run with 'python -m pytest' from the repository root.
+"""
+
+import json
+import os
+import numpy as np
+import pytest
+from PIL import Image
+
+from edit_image.batch import run_batch
+from edit_image.pipeline import validate_operations, apply_filters, load_image
+
+OPERATIONS = [{'type': 'contrast', 'alpha': 2.0}, {'type': 'box', 'alpha': 0.5}, {'type': 'sharpen'}]
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    # Two levels of directories, to check the tree is mirrored
+    rng = np.random.default_rng(0)
+    paths = [tmp_path / 'in' / 'a.png', tmp_path / 'in' / 'sub' / 'b.png', tmp_path / 'in' / 'sub' / 'c.png']
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        Image.fromarray(rng.integers(0, 256, (40, 50, 3), dtype=np.uint8)).save(path)
+
+    config = tmp_path / 'config.json'
+    config.write_text(json.dumps({'operations': OPERATIONS}))
+    return str(config), str(tmp_path / 'in'), paths
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_outputs_mirror_inputs(inputs, tmp_path, jobs):
+    config, input_dir, paths = inputs
+    output_dir = tmp_path / 'out'
+
+    written = run_batch(config, input_dir, str(output_dir), jobs=jobs, tile_size=16)
+
+    expected = [str(output_dir / os.path.relpath(path, input_dir)) for path in paths]
+    assert sorted(written) == sorted(expected)
+    for path, output in zip(paths, expected):
+        reference = apply_filters(load_image(str(path)), validate_operations(OPERATIONS))
+        np.testing.assert_array_equal(load_image(output), reference)
+
+
+def test_existing_outputs_are_kept(inputs, tmp_path):
+    config, input_dir, _ = inputs
+    output_dir = str(tmp_path / 'out')
+
+    run_batch(config, input_dir, output_dir, jobs=1)
+    written = run_batch(config, input_dir, output_dir, jobs=1)
+
+    assert all(os.path.splitext(path)[0].endswith('_1') for path in written)
+
+
+def test_failed_image_raises(inputs, tmp_path):
+    config, input_dir, paths = inputs
+    paths[1].write_bytes(b'not an image')
+
+    with pytest.raises(RuntimeError, match='1 of 3 images failed'):
+        run_batch(config, input_dir, str(tmp_path / 'out'), jobs=1)
@@ -0,0 +1,48 @@
+"""
+test_buffers.py
+---------------
+Buffer reuse against fresh allocations.
+
+Run with 'python -m pytest' from the repository root.
+"""
+
+import numpy as np
+import pytest
+
+from edit_image.pipeline import validate_operations, apply_filters
+from filters.base.buffers import BufferPool
+
+OPERATIONS = [{'type': 'box'}, {'type': 'contrast', 'alpha': 1.5}, {'type': 'sharpen'}, {'type': 'emboss'},
+              {'type': 'retro', 'block_size': 4}, {'type': 'glow'}]
+
+
+@pytest.mark.parametrize('precision', ['uint8', 'float32'])
+def test_reused_buffers_change_nothing(precision):
+    plan = validate_operations(OPERATIONS)
+    pool = BufferPool()
+    rng = np.random.default_rng(0)
+
+    # Consecutive images of a batch draw on the same pool
+    for _ in range(3):
+        image = rng.integers(0, 256, (48, 64, 3), dtype=np.uint8)
+        original = image.copy()
+
+        result = apply_filters(image, plan, precision=precision, buffers=pool)
+
+        np.testing.assert_array_equal(result, apply_filters(image, plan, precision=precision))
+        np.testing.assert_array_equal(image, original)
+
+    assert pool.hits > 0
+
+
+def test_pool_keeps_to_its_budget():
+    pool = BufferPool(max_bytes=3000)
+    arrays = [np.empty(1000, dtype=np.uint8) for _ in range(4)]
+
+    for array in arrays:
+        pool.give(array)
+
+    assert pool.retained_bytes == 3000
+    # The least recently released buffer went first
+    assert pool.take((1000,), np.uint8) is arrays[3]
+    assert all(pool.take((1000,), np.uint8) is not arrays[0] for _ in range(2))
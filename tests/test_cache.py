@@ -0,0 +1,53 @@
+"""
+test_cache.py
+-------------
+On-disk result cache: eviction and resuming from cached prefixes.
+
+Run with 'python -m pytest' from the repository root.
+"""
+
+import os
+import numpy as np
+
+from edit_image.cache import ResultCache, image_key, prefix_keys
+from edit_image.pipeline import validate_operations, apply_filters
+
+OPERATIONS = [{'type': 'box'}, {'type': 'brightness', 'alpha': 30}, {'type': 'sharpen'}]
+
+
+def _entry(value):
+    return np.full((16, 16, 3), value, dtype=np.uint8)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    # Room for two entries
+    cache = ResultCache(str(tmp_path), max_bytes=2 * _entry(0).nbytes + 512)
+
+    for idx, key in enumerate(['aa1', 'bb2']):
+        cache.put(key, _entry(idx))
+        os.utime(cache._path(key), (idx, idx))
+    cache.get('aa1')
+    cache.put('cc3', _entry(2))
+
+    assert cache.get('bb2') is None
+    np.testing.assert_array_equal(cache.get('aa1'), _entry(0))
+    np.testing.assert_array_equal(cache.get('cc3'), _entry(2))
+
+
+def test_runs_resume_from_longest_cached_prefix(tmp_path):
+    image = np.random.default_rng(0).integers(0, 256, (30, 40, 3), dtype=np.uint8)
+    filters = validate_operations(OPERATIONS)
+    cache = ResultCache(str(tmp_path))
+
+    reference = apply_filters(image, filters)
+    np.testing.assert_array_equal(apply_filters(image, filters, result_cache=cache), reference)
+
+    # A longer pipeline gives the same result starting from the cached prefix
+    longer = validate_operations(OPERATIONS + [{'type': 'contrast', 'alpha': 2.0}])
+    np.testing.assert_array_equal(apply_filters(image, longer, result_cache=cache),
+                                  apply_filters(image, longer))
+
+    # ... and really reads it: a marked entry comes back as is
+    keys = prefix_keys(image_key(image), filters)
+    cache.put(keys[-1], _entry(7))
+    np.testing.assert_array_equal(apply_filters(image, filters, result_cache=cache), _entry(7))
@@ -0,0 +1,77 @@
+"""
+test_graph.py
+-------------
+Graph configs: simplification and execution.
+
+Run with 'python -m pytest' from the repository root.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from edit_image.graph import parse_graph, plan_graph, run_graph, Unsharp
+from edit_image.pipeline import validate_operations, apply_filters, load_image
+
+
+@pytest.fixture
+def photo(tmp_path):
+    path = str(tmp_path / 'photo.png')
+    Image.fromarray(np.random.default_rng(0).integers(0, 256, (40, 50, 3), dtype=np.uint8)).save(path)
+    return path
+
+
+def _graph(photo, nodes, outputs):
+    return parse_graph({'input': photo, 'nodes': nodes, 'outputs': {name: f'{name}.png' for name in outputs}})[0]
+
+
+NODES = [
+    {'name': 'soft', 'from': 'input', 'type': 'box', 'width': 5, 'height': 5},
+    # Same operation as 'soft', with a default spelled out
+    {'name': 'soft_again', 'from': 'input', 'type': 'box', 'width': 5, 'height': 5, 'keep_dims': True},
+    {'name': 'crisp', 'from': 'input', 'type': 'sharpen', 'alpha': 1.5},
+    {'name': 'unused', 'from': 'input', 'type': 'emboss'},
+    {'name': 'bright', 'from': 'soft_again', 'type': 'brightness', 'alpha': 20},
+    {'name': 'mixed', 'from': ['crisp', 'bright'], 'type': 'blend', 'mode': 'screen'},
+]
+OUTPUTS = ['soft', 'mixed']
+
+
+def test_common_subexpressions_run_once(photo):
+    graph = _graph(photo, NODES, OUTPUTS)
+
+    planned, alias = plan_graph(graph, OUTPUTS)
+
+    assert set(planned) == {'input', 'soft', 'crisp', 'bright', 'mixed'}
+    assert planned['bright'].sources == ('soft',)
+    assert alias == {'soft': 'soft', 'mixed': 'mixed'}
+
+
+@pytest.mark.parametrize('precision', ['uint8', 'float32'])
+def test_optimised_graph_matches_graph_as_listed(photo, precision):
+    graph = _graph(photo, NODES, OUTPUTS)
+
+    optimised = run_graph(graph, OUTPUTS, precision=precision)
+    as_listed = run_graph(graph, OUTPUTS, precision=precision, optimize=False)
+
+    for name in OUTPUTS:
+        np.testing.assert_array_equal(optimised[name], as_listed[name])
+
+
+def test_sharpen_reuses_box_blur_only_in_float(photo):
+    nodes = [{'name': 'soft', 'from': 'input', 'type': 'box', 'width': 5, 'height': 5},
+             {'name': 'crisp', 'from': 'input', 'type': 'sharpen'}]
+    graph = _graph(photo, nodes, ['soft', 'crisp'])
+
+    assert plan_graph(graph, ['soft', 'crisp'], 'uint8')[0]['crisp'].op is not Unsharp
+    assert plan_graph(graph, ['soft', 'crisp'], 'float32')[0]['crisp'].op is Unsharp
+
+
+def test_chain_matches_linear_config(photo):
+    operations = [{'type': 'box'}, {'type': 'contrast', 'alpha': 1.5}, {'type': 'sharpen'}]
+    nodes = [dict(operation, name=f'step{idx}') for idx, operation in enumerate(operations)]
+    graph = _graph(photo, nodes, ['step2'])
+
+    result = run_graph(graph, ['step2'])['step2']
+
+    np.testing.assert_array_equal(result, apply_filters(load_image(photo), validate_operations(operations)))
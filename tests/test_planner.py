@@ -0,0 +1,125 @@
+"""
+test_planner.py
+---------------
+Exact optimisation passes against the plan they rewrite.
+
+Run with 'python -m pytest' from the repository root.
+"""
+
+import numpy as np
+import pytest
+
+from edit_image.pipeline import validate_operations, apply_filters, build_filters
+from edit_image.planner import optimize_plan, simplify, propagate_value_ranges
+from filters.catalog import Brightness, Contrast, Box
+from filters.fused import LookupTable, ColorMatrix, DeferredUpsample
+
+
+def _image():
+    # Random pixels plus rows of the extremes, where clipping matters most
+    image = np.random.default_rng(0).integers(0, 256, (48, 64, 3), dtype=np.uint8)
+    image[:4] = 0
+    image[4:8] = 255
+    return image
+
+
+def _optimised_plan(operations, precision='uint8'):
+    """
+    Optimised plan of 'operations', after checking it gives the same image as the plan as listed.
+    """
+    filters = validate_operations(operations)
+    plan = optimize_plan(filters, precision=precision)
+
+    image = _image()
+    np.testing.assert_array_equal(apply_filters(image, plan, precision=precision),
+                                  apply_filters(image, filters, precision=precision))
+    return plan
+
+
+@pytest.mark.parametrize('operations', [
+    [{'type': 'brightness', 'alpha': 40}, {'type': 'contrast', 'alpha': 1.8}],
+    [{'type': 'contrast', 'alpha': 0.6}, {'type': 'brightness', 'alpha': -70}, {'type': 'contrast', 'alpha': 2.5}],
+    [{'type': 'box'}, {'type': 'brightness', 'alpha': 90}, {'type': 'contrast', 'alpha': 3.0}, {'type': 'box'}],
+])
+def test_lookup_table_fusion_is_exact(operations):
+    plan = _optimised_plan(operations)
+
+    assert any(cls is LookupTable for cls, _ in plan)
+
+
+@pytest.mark.parametrize('precision', ['float32', 'float64'])
+@pytest.mark.parametrize('operations', [
+    [{'type': 'saturation', 'alpha': 30}, {'type': 'brightness', 'alpha': 25}],
+    [{'type': 'contrast', 'alpha': 2.0}, {'type': 'saturation', 'alpha': 0.5}, {'type': 'brightness', 'alpha': -40}],
+])
+def test_color_matrix_fusion_is_exact(operations, precision):
+    plan = _optimised_plan(operations, precision)
+
+    assert [cls for cls, _ in plan] == [ColorMatrix]
+
+
+@pytest.mark.parametrize('precision, operations, expected', [
+    # Identities dropped, same-direction whole offsets merged
+    ('uint8', [{'type': 'brightness', 'alpha': 20}, {'type': 'sharpen', 'alpha': 0}, {'type': 'brightness', 'alpha': 30},
+               {'type': 'saturation', 'alpha': 1}, {'type': 'box'}], [(Brightness, {'alpha': 50}), (Box, {})]),
+    # Clipping in between: opposite offsets and contrast stretches stay apart
+    ('uint8', [{'type': 'brightness', 'alpha': 40}, {'type': 'brightness', 'alpha': -60}],
+     [(Brightness, {'alpha': 40}), (Brightness, {'alpha': -60})]),
+    ('uint8', [{'type': 'contrast', 'alpha': 2.0}, {'type': 'contrast', 'alpha': 1.5}],
+     [(Contrast, {'alpha': 2.0}), (Contrast, {'alpha': 1.5})]),
+    ('float32', [{'type': 'contrast', 'alpha': 2.0}, {'type': 'contrast', 'alpha': 1.5}], [(Contrast, {'alpha': 3.0})]),
+])
+def test_simplify_is_exact(precision, operations, expected):
+    assert simplify(validate_operations(operations), precision) == expected
+
+    _optimised_plan(operations, precision)
+
+
+@pytest.mark.parametrize('precision', ['uint8', 'float32'])
+@pytest.mark.parametrize('operations', [
+    [{'type': 'retro', 'block_size': 4}, {'type': 'brightness', 'alpha': 30}, {'type': 'saturation', 'alpha': 2}],
+    [{'type': 'retro', 'block_size': 8}, {'type': 'contrast', 'alpha': 1.5}, {'type': 'box'}],
+])
+def test_deferred_upsampling_is_exact(operations, precision):
+    plan = _optimised_plan(operations, precision)
+
+    assert plan[0][0] is DeferredUpsample
+
+
+RANGE_CHAINS = [
+    [{'type': 'box'}, {'type': 'retro', 'block_size': 4}, {'type': 'box', 'width': 5, 'height': 5}],
+    [{'type': 'sobel', 'output': 'orientation'}, {'type': 'box'}],
+    [{'type': 'glow'}, {'type': 'box'}, {'type': 'brightness', 'alpha': 10}],
+]
+
+
+@pytest.mark.parametrize('operations', RANGE_CHAINS)
+def test_value_ranges_hold(operations):
+    instances = build_filters(validate_operations(operations))
+    propagate_value_ranges(instances, 'float32')
+
+    image = _image().astype(np.float32)
+    for filt in instances:
+        bounds = filt.output_range()
+        image = filt.apply_filter(image, clip=False)
+        if bounds is not None:
+            assert bounds[0] <= image.min() and image.max() <= bounds[1], type(filt).__name__
+
+
+@pytest.mark.parametrize('precision', ['uint8', 'float32'])
+@pytest.mark.parametrize('operations', RANGE_CHAINS)
+def test_skipped_clips_change_nothing(operations, precision):
+    filters = validate_operations(operations)
+
+    # Every filter clipped, as before value-range analysis
+    image = _image()
+    if precision == 'uint8':
+        for filt in build_filters(filters):
+            image = filt.apply_filter(image)
+    else:
+        image = image.astype(np.float32)
+        for filt in build_filters(filters):
+            image = filt.apply_filter(image, clip=False)
+        image = np.clip(image, 0, 255).astype(np.uint8)
+
+    np.testing.assert_array_equal(apply_filters(_image(), filters, precision=precision), image)
@@ -0,0 +1,75 @@
+"""
+test_server.py
+--------------
+Round trips through the daemon.
+
+Run with 'python -m pytest' from the repository root.
+"""
+
+import io
+import os
+import socket
+import stat
+import threading
+import numpy as np
+import pytest
+from PIL import Image
+
+from edit_image.client import request
+from edit_image.server import FilterServer
+from edit_image.pipeline import validate_operations, apply_filters
+
+OPERATIONS = [{'type': 'box', 'alpha': 0.5}, {'type': 'brightness', 'alpha': 20}]
+
+
+def _encode(image):
+    output = io.BytesIO()
+    Image.fromarray(image).save(output, format='PNG')
+    return output.getvalue()
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    path = str(tmp_path / 'daemon.sock')
+    server = FilterServer(path, workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+
+
+def test_round_trip_matches_in_process(daemon):
+    image = np.random.default_rng(0).integers(0, 256, (30, 40, 3), dtype=np.uint8)
+
+    output = request(daemon, OPERATIONS, _encode(image), options={'tile_size': 16, 'threads': 2})
+
+    result = np.array(Image.open(io.BytesIO(output)))
+    np.testing.assert_array_equal(result, apply_filters(image, validate_operations(OPERATIONS)))
+
+
+@pytest.mark.parametrize('options', [{'processes': 2}, {'no_such_option': 1}])
+def test_unknown_options_are_rejected(daemon, options):
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    with pytest.raises(RuntimeError, match='Unsupported option'):
+        request(daemon, OPERATIONS, _encode(image), options=options)
+
+
+def test_socket_is_private(daemon):
+    assert stat.S_IMODE(os.stat(daemon).st_mode) & 0o077 == 0
+
+
+def test_stale_socket_is_replaced_but_other_files_are_not(tmp_path):
+    path = str(tmp_path / 'stale.sock')
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+
+    FilterServer(path, workers=1).server_close()
+    assert not os.path.exists(path)
+
+    open(path, 'w').close()
+    with pytest.raises(RuntimeError, match='not a socket'):
+        FilterServer(path, workers=1)
+    assert os.path.isfile(path)
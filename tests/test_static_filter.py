@@ -0,0 +1,66 @@
+"""
+test_static_filter.py
+---------------------
+Convolution strategies of 'StaticFilter' (and Sobel) against each other.
+
+Run with 'python -m pytest' from the repository root.
+"""
+
+import numpy as np
+import pytest
+
+from filters.base import StaticFilter
+from filters.catalog import Sobel
+
+KERNELS = {
+    'rank1': np.outer([1, 2, 1], [1, 4, 6, 4, 1]),
+    'uniform': np.ones((5, 5), dtype=int),
+    'dense': np.random.default_rng(1).integers(-4, 5, (5, 5)),
+}
+
+# Integer kernels on integer images: every strategy is exact, so all of them agree
+STRATEGY_CASES = [
+    ('separable', 'rank1'), ('separable', 'uniform'),
+    ('fft', 'rank1'), ('fft', 'uniform'), ('fft', 'dense'),
+    ('matmul', 'rank1'), ('matmul', 'uniform'), ('matmul', 'dense'),
+    ('summed_area', 'uniform'),
+]
+
+
+@pytest.mark.parametrize('stride', [(1, 1), (2, 3)])
+@pytest.mark.parametrize('strategy, kernel', STRATEGY_CASES)
+def test_strategies_match_direct(strategy, kernel, stride):
+    kernel = KERNELS[kernel][:, :, np.newaxis].astype(np.float64)
+    image = np.random.default_rng(0).integers(0, 256, (45, 70, 3)).astype(np.int32)
+
+    result = StaticFilter(kernel, stride=stride, strategy=strategy).apply(image)
+    direct = StaticFilter(kernel, stride=stride, strategy='direct').apply(image)
+
+    np.testing.assert_array_equal(result, direct)
+
+
+@pytest.mark.parametrize('height', [17, 18, 20, 24, 40])
+def test_fft_single_block_with_stride(height):
+    # Images that fit in one FFT block but are shorter than kernel + stride - 1
+    rng = np.random.default_rng(0)
+    kernel = rng.integers(-3, 4, (17, 17, 1)).astype(np.float64)
+    image = rng.integers(0, 256, (height, 30, 3)).astype(np.int32)
+
+    fft = StaticFilter(kernel, stride=(8, 8), strategy='fft').apply(image)
+    direct = StaticFilter(kernel, stride=(8, 8), strategy='direct').apply(image)
+
+    assert fft.shape == direct.shape
+    np.testing.assert_array_equal(fft, direct)
+
+
+@pytest.mark.parametrize('size', [3, 5])
+@pytest.mark.parametrize('keep_dims', [True, False])
+def test_sobel_orientation_same_for_every_strategy(size, keep_dims):
+    # Flat 6x6 blocks: many zero gradients, whose sign depends on the strategy
+    blocks = np.random.default_rng(0).integers(0, 256, (5, 5, 3), dtype=np.uint8)
+    image = np.repeat(np.repeat(blocks, 6, axis=0), 6, axis=1)
+    results = [Sobel(size=size, output='orientation', strategy=strategy, keep_dims=keep_dims).apply_filter(image)
+               for strategy in ('auto', 'direct', 'matmul', 'fft')]
+
+    for result in results[1:]:
+        np.testing.assert_array_equal(result, results[0])
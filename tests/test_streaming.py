@@ -0,0 +1,57 @@
+"""
+test_streaming.py
+-----------------
+Strip streaming against whole-frame execution.
+
+Run with 'python -m pytest' from the repository root.
+"""
+
+import json
+import numpy as np
+import pytest
+from PIL import Image
+
+import edit_image.streaming as streaming
+from edit_image.pipeline import validate_operations, apply_filters
+
+OPERATIONS = [{'type': 'box', 'alpha': 0.5}, {'type': 'sharpen'}, {'type': 'brightness', 'alpha': 20}]
+
+
+def _config(tmp_path, output):
+    image = np.random.default_rng(0).integers(0, 256, (100, 60, 3), dtype=np.uint8)
+    np.save(tmp_path / 'in.npy', image)
+
+    config = tmp_path / 'config.json'
+    config.write_text(json.dumps({'input': str(tmp_path / 'in.npy'), 'output': str(tmp_path / output),
+                                  'operations': OPERATIONS}))
+    return str(config), image
+
+
+@pytest.mark.parametrize('output', ['out.npy', 'out.ppm', 'out.png'])
+def test_strips_match_whole_frame(tmp_path, output):
+    config, image = _config(tmp_path, output)
+
+    streaming.stream_from_config(config, strip_rows=32)
+
+    path = tmp_path / output
+    result = np.load(path) if output.endswith('.npy') else np.array(Image.open(path))
+    np.testing.assert_array_equal(result, apply_filters(image, validate_operations(OPERATIONS)))
+
+
+@pytest.mark.parametrize('output', ['out.npy', 'out.ppm', 'out.png'])
+def test_failed_run_leaves_no_output(tmp_path, monkeypatch, output):
+    config, _ = _config(tmp_path, output)
+    apply_chain_to_tile = streaming.apply_chain_to_tile
+    strips = []
+
+    def fail_on_second_strip(*args, **kwargs):
+        strips.append(None)
+        if len(strips) == 2:
+            raise RuntimeError('strip failed')
+        return apply_chain_to_tile(*args, **kwargs)
+
+    monkeypatch.setattr(streaming, 'apply_chain_to_tile', fail_on_second_strip)
+    with pytest.raises(RuntimeError, match='strip failed'):
+        streaming.stream_from_config(config, strip_rows=32)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['config.json', 'in.npy']
@@ -0,0 +1,93 @@
+"""
+test_tiling.py
+--------------
+Tiled execution against whole-frame execution.
+
+Run with 'python -m pytest' from the repository root.
+"""
+
+import numpy as np
+import pytest
+
+from edit_image.pipeline import validate_operations, apply_filters
+from edit_image.planner import optimize_plan
+from edit_image.transport import SharedFrame
+from filters.base import DynamicFilter
+from filters.catalog import Glow
+
+CHAINS = [
+    [{'type': 'box', 'alpha': 0.5}, {'type': 'sharpen'}],
+    [{'type': 'sharpen', 'blur_size': 9}, {'type': 'emboss'}],
+    [{'type': 'emboss', 'strength': 0.3}, {'type': 'box', 'alpha': 1.0}],
+]
+
+
+@pytest.mark.parametrize('operations', CHAINS)
+@pytest.mark.parametrize('precision', ['uint8', 'float32'])
+@pytest.mark.parametrize('unclamped', [False, True])
+def test_tiles_match_whole_frame(operations, precision, unclamped):
+    image = np.random.default_rng(0).integers(0, 256, (300, 420, 3), dtype=np.uint8)
+    plan = optimize_plan(validate_operations(operations), precision=precision, unclamped=unclamped)
+
+    whole = apply_filters(image, plan, precision=precision)
+    tiled = apply_filters(image, plan, precision=precision, tile_size=(64, 100))
+
+    np.testing.assert_array_equal(tiled, whole)
+
+
+@pytest.mark.parametrize('operations', CHAINS)
+def test_threads_match_whole_frame(operations):
+    image = np.random.default_rng(0).integers(0, 256, (300, 420, 3), dtype=np.uint8)
+    plan = validate_operations(operations)
+
+    np.testing.assert_array_equal(apply_filters(image, plan, tile_size=(32, 64), threads=4),
+                                  apply_filters(image, plan))
+
+
+@pytest.mark.parametrize('cache_bytes', [64 * 1024, 1024 * 1024])
+@pytest.mark.parametrize('operations', CHAINS)
+def test_depth_first_strips_match_whole_frame(operations, cache_bytes):
+    image = np.random.default_rng(0).integers(0, 256, (300, 420, 3), dtype=np.uint8)
+    plan = validate_operations(operations)
+
+    np.testing.assert_array_equal(apply_filters(image, plan, cache_bytes=cache_bytes), apply_filters(image, plan))
+
+
+@pytest.mark.parametrize('precision', ['uint8', 'float32'])
+def test_processes_match_whole_frame(monkeypatch, precision):
+    # Whole-frame Contrast between the tiled chains
+    operations = CHAINS[0] + [{'type': 'contrast', 'alpha': 1.5}] + CHAINS[1] + [{'type': 'contrast'}] + CHAINS[2]
+    image = np.random.default_rng(0).integers(0, 256, (300, 420, 3), dtype=np.uint8)
+    plan = validate_operations(operations)
+
+    created, unlinked = [], []
+    create, unlink = SharedFrame.create.__func__, SharedFrame.unlink
+    monkeypatch.setattr(SharedFrame, 'create', classmethod(lambda cls, *args: created.append(0) or create(cls, *args)))
+    monkeypatch.setattr(SharedFrame, 'unlink', lambda frame: unlinked.append(0) or unlink(frame))
+
+    tiled = apply_filters(image, plan, precision=precision, tile_size=(64, 420), processes=2)
+
+    np.testing.assert_array_equal(tiled, apply_filters(image, plan, precision=precision))
+    # Three chains, each with an input and an output frame; consumed frames are reused
+    assert len(created) < 6
+    assert len(unlinked) == len(created)
+
+
+class _Gradient(DynamicFilter):
+    # Adds the output column to the centre pixel
+    def __init__(self):
+        super().__init__(keep_dims=True)
+
+    def apply_region(self, region, y, x):
+        return region[self.radius_y, self.radius_x] + x
+
+
+@pytest.mark.parametrize('filter_class, params', [(_Gradient, {}), (Glow, {})])
+def test_dynamic_filters_match_whole_frame(filter_class, params):
+    image = np.random.default_rng(0).integers(0, 256, (40, 90, 3), dtype=np.uint8)
+    filters = [(filter_class, params)]
+
+    whole = apply_filters(image, filters)
+    tiled = apply_filters(image, filters, tile_size=(16, 32), threads=2)
+
+    np.testing.assert_array_equal(tiled, whole)
@@ -0,0 +1,53 @@
+"""
+test_watch.py
+-------------
+Incremental re-runs of watch mode.
+
+Run with 'python -m pytest' from the repository root.
+"""
+
+import os
+import numpy as np
+from PIL import Image
+
+from edit_image.watch import Session
+from edit_image.pipeline import validate_operations, apply_filters, load_image
+
+OPERATIONS = [{'type': 'box'}, {'type': 'saturation', 'alpha': 20}, {'type': 'sharpen'}]
+
+
+def _save_input(path, seed, mtime):
+    Image.fromarray(np.random.default_rng(seed).integers(0, 256, (30, 40, 3), dtype=np.uint8)).save(path)
+    os.utime(path, (mtime, mtime))
+
+
+def test_rerun_reuses_unchanged_prefix(tmp_path):
+    path = str(tmp_path / 'in.png')
+    _save_input(path, 0, 1000)
+    session = Session()
+
+    session.run(path, validate_operations(OPERATIONS))
+    before = list(session.results)
+
+    changed = OPERATIONS[:2] + [{'type': 'emboss'}]
+    result = session.run(path, validate_operations(changed))
+
+    assert all(new is old for new, old in zip(session.results[:2], before[:2]))
+    assert session.results[2] is not before[2]
+    np.testing.assert_array_equal(result, apply_filters(load_image(path), validate_operations(changed)))
+
+
+def test_changed_input_invalidates_everything(tmp_path):
+    path = str(tmp_path / 'in.png')
+    _save_input(path, 0, 1000)
+    session = Session()
+    filters = validate_operations(OPERATIONS)
+
+    session.run(path, filters)
+    first = session.results[0]
+
+    _save_input(path, 1, 2000)
+    result = session.run(path, filters)
+
+    assert session.results[0] is not first
+    np.testing.assert_array_equal(result, apply_filters(load_image(path), filters))